@@ -1,27 +1,154 @@
-import collections
+"""
+ROI별 신호 평활화 버퍼
+- 모든 ROI와 여러 신호(머리 각도, EAR, 가시성)를 미리 할당한 배열 하나에 보관하는 링 버퍼
+- 이동 평균은 누적 합으로 O(1) 갱신
+- 지수 이동 평균(EMA), 중앙값, One-Euro 필터 지원
+- 모든 ROI를 한 번의 배열 연산으로 갱신
+"""
+
 import numpy as np
 
+from detection import MOVING_AVERAGE_WINDOW, NUM_SIGNALS
+
+# 평활화 방식
+SMOOTH_MEAN = "mean"          # 최근 N개 이동 평균
+SMOOTH_EMA = "ema"            # 지수 이동 평균
+SMOOTH_MEDIAN = "median"      # 최근 N개 중앙값 (튀는 값에 강함)
+SMOOTH_ONE_EURO = "one_euro"  # 움직임이 작을 때는 강하게, 빠를 때는 약하게 평활화
+
+SMOOTHING_MODES = (SMOOTH_MEAN, SMOOTH_EMA, SMOOTH_MEDIAN, SMOOTH_ONE_EURO)
+
+EMA_ALPHA = 0.5                # EMA 갱신 비율
+ONE_EURO_MIN_CUTOFF = 1.0      # One-Euro 최소 차단 주파수 (Hz)
+ONE_EURO_BETA = 0.05           # 변화 속도에 따른 차단 주파수 증가율
+ONE_EURO_DERIVATIVE_CUTOFF = 1.0  # 변화 속도 평활화 차단 주파수 (Hz)
+
+
+def _one_euro_alpha(dt, cutoff):
+    tau = 1.0 / (2 * np.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class SignalBuffer:
+    """ROI × 신호 배열 단위로 값을 평활화하는 링 버퍼
+
+    update()에 NaN으로 전달한 값은 관측이 없는 것으로 보고 해당 ROI/신호는 갱신하지 않습니다.
+
+    Args:
+        num_rois: ROI 개수
+        num_signals: ROI별 신호 개수
+        size: 이동 평균/중앙값 창 크기
+        mode: 평활화 방식 (SMOOTHING_MODES)
+    """
+    def __init__(self, num_rois, num_signals=NUM_SIGNALS, size=MOVING_AVERAGE_WINDOW, mode=SMOOTH_MEAN):
+        if mode not in SMOOTHING_MODES:
+            raise ValueError(f"Unknown smoothing mode: {mode}")
+        self.size = size
+        self.mode = mode
+        shape = (num_rois, num_signals)
+
+        self.buffer = np.full((size,) + shape, np.nan)  # 링 버퍼 [위치, ROI, 신호]
+        self.position = np.zeros(shape, dtype=np.intp)  # 다음에 쓸 위치
+        self.count = np.zeros(shape, dtype=np.intp)     # 저장된 값 수 (최대 size)
+        self.total = np.zeros(shape)                    # 저장된 값의 합
+        self.smoothed = np.full(shape, np.nan)          # 마지막 평활화 결과
+
+        # One-Euro 상태
+        self.derivative = np.zeros(shape)
+        self.updated_at = np.full(shape, np.nan)
+
+    def update(self, values, now=None):
+        """모든 ROI의 새 값을 반영하고 평활화 결과 반환
+
+        Args:
+            values: (ROI 수, 신호 수) 배열, 관측이 없는 값은 NaN
+            now: 현재 시각 (초, One-Euro 방식에 필요)
+
+        Returns:
+            np.ndarray: (ROI 수, 신호 수) 평활화 값 (관측된 적 없는 값은 NaN)
+        """
+        values = np.asarray(values, dtype=float)
+        valid = ~np.isnan(values)
+        if not valid.any():
+            return self.smoothed
+        rois, signals = np.nonzero(valid)
+        new = values[rois, signals]
+
+        # 링 버퍼와 누적 합 갱신 (가득 찬 위치는 가장 오래된 값을 빼고 덮어씀)
+        position = self.position[rois, signals]
+        old = self.buffer[position, rois, signals]
+        full = self.count[rois, signals] == self.size
+        self.total[rois, signals] += new - np.where(full, old, 0.0)
+        self.buffer[position, rois, signals] = new
+        self.position[rois, signals] = (position + 1) % self.size
+        self.count[rois, signals] = np.minimum(self.count[rois, signals] + 1, self.size)
+
+        if self.mode == SMOOTH_MEAN:
+            self.smoothed[rois, signals] = self.total[rois, signals] / self.count[rois, signals]
+        elif self.mode == SMOOTH_EMA:
+            previous = self.smoothed[rois, signals]
+            self.smoothed[rois, signals] = np.where(
+                np.isnan(previous), new, previous + EMA_ALPHA * (new - previous)
+            )
+        elif self.mode == SMOOTH_MEDIAN:
+            self.smoothed[rois, signals] = self._median(rois, signals)
+        else:
+            self._one_euro(rois, signals, new, now)
+        return self.smoothed
+
+    def _median(self, rois, signals):
+        # NaN(빈 위치)은 정렬 시 뒤로 가므로 저장된 값 수 기준으로 가운데 값 선택
+        window = np.sort(self.buffer[:, rois, signals], axis=0)
+        count = self.count[rois, signals]
+        columns = np.arange(len(count))
+        return (window[(count - 1) // 2, columns] + window[count // 2, columns]) / 2
+
+    def _one_euro(self, rois, signals, new, now):
+        if now is None:
+            raise ValueError("One-Euro smoothing requires the current time")
+        previous = self.smoothed[rois, signals]
+        first = np.isnan(previous)
+        dt = now - self.updated_at[rois, signals]
+        dt = np.where(first | ~(dt > 0), np.inf, dt)  # 첫 값이나 같은 시각의 값은 그대로 사용
+
+        derivative = np.where(first, 0.0, (new - previous) / dt)
+        derivative_alpha = _one_euro_alpha(dt, ONE_EURO_DERIVATIVE_CUTOFF)
+        derivative = derivative_alpha * derivative + (1 - derivative_alpha) * self.derivative[rois, signals]
+        cutoff = ONE_EURO_MIN_CUTOFF + ONE_EURO_BETA * np.abs(derivative)
+        alpha = _one_euro_alpha(dt, cutoff)
+
+        self.smoothed[rois, signals] = np.where(first, new, alpha * new + (1 - alpha) * previous)
+        self.derivative[rois, signals] = derivative
+        self.updated_at[rois, signals] = now
+
+    def reset(self, rois):
+        """ROI의 저장된 값 초기화 (사람이 자리를 비운 경우 등)"""
+        self.buffer[:, rois] = np.nan
+        self.position[rois] = 0
+        self.count[rois] = 0
+        self.total[rois] = 0.0
+        self.smoothed[rois] = np.nan
+        self.derivative[rois] = 0.0
+        self.updated_at[rois] = np.nan
+
 
 class AngleBuffer:
     """
-    머리 각도 값의 이동 평균을 계산하는 버퍼 클래스
+    머리 각도 값의 이동 평균을 계산하는 버퍼 클래스 (단일 값용, SignalBuffer 사용)
     """
-    def __init__(self, size=3):
+    def __init__(self, size=MOVING_AVERAGE_WINDOW):
         self.size = size
-        self.buffer = []
-        
+        self.signals = SignalBuffer(1, 1, size)
+
     def add(self, angle):
         """
         새로운 각도 값을 버퍼에 추가
         """
-        self.buffer.append(angle)
-        if len(self.buffer) > self.size:
-            self.buffer.pop(0)
-            
+        self.signals.update([[angle]])
+
     def get_average(self):
         """
         버퍼에 있는 각도들의 평균 반환
         """
-        if not self.buffer:
-            return 0
-        return sum(self.buffer) / len(self.buffer)
\ No newline at end of file
+        average = self.signals.smoothed[0, 0]
+        return 0 if np.isnan(average) else float(average)
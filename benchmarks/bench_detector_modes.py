@@ -0,0 +1,150 @@
+"""
+ROI별 감지 모드와 전체 프레임 공용 감지 모드 비교 벤치마크
+- 각 모드를 별도 프로세스에서 실행하여 메모리 사용량을 분리 측정
+- 모델 초기화 시간, 프레임당 처리 시간, 최대 RSS 출력
+- Pose 모델은 패키지에 포함된 복잡도 1이 기본 (0/2는 처음 사용할 때 내려받아야 함)
+
+사용 예:
+    python benchmarks/bench_detector_modes.py video3.mp4 --rois rois.json --frames 200
+"""
+
+import argparse
+import json
+import multiprocessing as mproc
+import os
+import queue
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2 as cv
+
+from detection import QuadrantProcessor, detect_rois, pose_model_available, resize_to_target
+from roi_layout import load_roi_layout
+from shared_detector import SharedFrameDetector
+
+MODES = ("per_roi", "shared_frame")
+DEFAULT_POSE_COMPLEXITY = 1   # 패키지에 포함된 모델
+RESULT_POLL_SECONDS = 5.0     # 측정 프로세스 결과 대기 중 종료 여부를 확인하는 간격 (초)
+
+
+def load_frames(video_path, num_frames):
+    """벤치마크에 사용할 프레임을 미리 디코딩 (디코딩 시간 제외)"""
+    cap = cv.VideoCapture(video_path)
+    frames = []
+    while len(frames) < num_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(resize_to_target(frame))
+    cap.release()
+    if not frames:
+        raise IOError(f"Could not read frames from: {video_path}")
+    return frames
+
+def run_mode(mode, video_path, layout_path, num_frames, pose_complexity, result_queue):
+    """한 가지 모드를 측정하고 결과를 큐로 반환 (별도 프로세스에서 실행)"""
+    try:
+        result = measure_mode(mode, video_path, layout_path, num_frames, {'model_complexity': pose_complexity})
+    except Exception as e:
+        result = {"mode": mode, "error": f"{type(e).__name__}: {e}"}
+    result_queue.put(result)
+
+def measure_mode(mode, video_path, layout_path, num_frames, pose_config):
+    frames = load_frames(video_path, num_frames)
+    img_h, img_w = frames[0].shape[:2]
+    rois = load_roi_layout(layout_path, frame_size=(img_w, img_h))
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    if mode == "per_roi":
+        processors = [QuadrantProcessor(i, pose_config=pose_config) for i in range(len(rois))]
+        detect = lambda frame: detect_rois(frame, rois, processors)
+    else:
+        detector = SharedFrameDetector(rois, pose_config=pose_config)
+        detect = detector.detect
+    init_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    present = 0
+    for frame in frames:
+        for detection in detect(frame):
+            present += detection['face_landmarks'] is not None or detection['pose_landmarks'] is not None
+    elapsed = time.perf_counter() - start
+
+    if mode == "per_roi":
+        for processor in processors:
+            processor.close()
+    else:
+        detector.close()
+
+    rss_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "mode": mode,
+        "rois": len(rois),
+        "frames": len(frames),
+        "init_seconds": round(init_time, 3),
+        "ms_per_frame": round(elapsed / len(frames) * 1000, 2),
+        "fps": round(len(frames) / elapsed, 2) if elapsed > 0 else 0.0,
+        "model_rss_mb": round((rss_peak - rss_before) / 1024, 1),  # Linux ru_maxrss 단위: KB
+        "peak_rss_mb": round(rss_peak / 1024, 1),
+        "roi_detections": present,
+    }
+
+def wait_for_result(proc, result_queue, poll=RESULT_POLL_SECONDS):
+    """측정 프로세스의 결과 대기 (결과 없이 종료되면 오류 결과 반환)"""
+    while True:
+        try:
+            return result_queue.get(timeout=poll)
+        except queue.Empty:
+            if not proc.is_alive():
+                break
+    # 종료 직전에 넣은 결과가 늦게 도착했을 수 있음
+    try:
+        return result_queue.get(timeout=1.0)
+    except queue.Empty:
+        return {"error": f"Benchmark process exited without a result (exit code {proc.exitcode})"}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ROI별 감지와 전체 프레임 공용 감지 성능 비교")
+    parser.add_argument("video", help="입력 영상 경로")
+    parser.add_argument("--rois", required=True, help="ROI 레이아웃 파일 (.json / .yaml)")
+    parser.add_argument("--frames", type=int, default=100, help="측정할 프레임 수")
+    parser.add_argument("--pose-complexity", type=int, choices=(0, 1, 2), default=DEFAULT_POSE_COMPLEXITY,
+                        help="Pose 모델 복잡도 (기본 1: 패키지에 포함된 모델)")
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    if not pose_model_available(args.pose_complexity):
+        print(f"Error: Pose 모델 복잡도 {args.pose_complexity}의 모델 파일이 설치되어 있지 않습니다 "
+              f"(오프라인 실행은 --pose-complexity {DEFAULT_POSE_COMPLEXITY} 사용)")
+        return 1
+
+    ctx = mproc.get_context("spawn")
+    results = []
+    for mode in MODES:
+        result_queue = ctx.Queue()
+        proc = ctx.Process(target=run_mode, args=(
+            mode, args.video, args.rois, args.frames, args.pose_complexity, result_queue
+        ))
+        proc.start()
+        result = dict(wait_for_result(proc, result_queue), mode=mode)
+        proc.join()
+        results.append(result)
+        if "error" in result:
+            print(f"{mode:>12}: 실패 - {result['error']}")
+            continue
+        print(f"{mode:>12}: 초기화 {result['init_seconds']}초, {result['ms_per_frame']} ms/프레임, "
+              f"{result['fps']} FPS, 모델 메모리 {result['model_rss_mb']} MB")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
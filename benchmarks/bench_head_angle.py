@@ -0,0 +1,102 @@
+"""
+머리 각도 계산 마이크로벤치마크
+- ROI별 calculate_head_angle 반복 호출, 실제 처리 경로(head_pose_signals: 각도 + 가시성),
+  배열 변환 + calculate_head_angles 한 번 호출 비교
+- 임의로 만든 Pose 랜드마크를 사용하므로 영상이나 모델이 필요 없음
+- 세 방식의 결과가 같은지도 함께 확인
+
+사용 예:
+    python benchmarks/bench_head_angle.py --rois 1 10 50 --repeat 200
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+from detection import (
+    HEAD_POSE_INDICES, calculate_head_angle, calculate_head_angles, head_pose_signals, landmarks_to_array
+)
+
+POSE_LANDMARK_COUNT = 33
+
+
+def make_pose_landmarks(num_rois, seed=0):
+    """임의의 Pose 랜드마크 목록 생성 (일부 ROI는 가시성이 낮거나 사람이 없음)"""
+    rng = np.random.default_rng(seed)
+    landmark_lists = []
+    for roi_idx in range(num_rois):
+        if roi_idx % 7 == 6:
+            landmark_lists.append(None)
+            continue
+        landmark_list = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z, visibility in rng.random((POSE_LANDMARK_COUNT, 4)):
+            landmark_list.landmark.add(x=x, y=y, z=z, visibility=visibility * 0.4 + 0.6 * (roi_idx % 3 != 2))
+        landmark_lists.append(landmark_list)
+    return landmark_lists
+
+def time_call(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def run(num_rois, repeat):
+    landmark_lists = make_pose_landmarks(num_rois)
+
+    def scalar():
+        return [None if lms is None else calculate_head_angle(lms.landmark) for lms in landmark_lists]
+
+    def batched():
+        return calculate_head_angles(landmarks_to_array(landmark_lists, HEAD_POSE_INDICES))
+
+    def signals():
+        return head_pose_signals(landmark_lists)
+
+    expected = np.array([np.nan if angle is None else angle for angle in scalar()], dtype=float)
+    if not np.array_equal(expected, batched(), equal_nan=True):
+        raise AssertionError(f"Batched head angles differ for {num_rois} ROIs")
+    if not np.array_equal(expected, signals()[0], equal_nan=True):
+        raise AssertionError(f"head_pose_signals angles differ for {num_rois} ROIs")
+
+    head_array = landmarks_to_array(landmark_lists, HEAD_POSE_INDICES)
+    return {
+        "rois": num_rois,
+        "scalar_ms": round(time_call(scalar, repeat) * 1000, 4),
+        "signals_ms": round(time_call(signals, repeat) * 1000, 4),
+        "batched_ms": round(time_call(batched, repeat) * 1000, 4),
+        "convert_ms": round(time_call(lambda: landmarks_to_array(landmark_lists, HEAD_POSE_INDICES), repeat) * 1000, 4),
+        "compute_ms": round(time_call(lambda: calculate_head_angles(head_array), repeat) * 1000, 4),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ROI별 머리 각도 계산과 배열 일괄 계산 비교")
+    parser.add_argument("--rois", type=int, nargs="+", default=[1, 10, 50], help="측정할 ROI 수")
+    parser.add_argument("--repeat", type=int, default=200, help="측정 반복 횟수")
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    results = []
+    for num_rois in args.rois:
+        result = run(num_rois, args.repeat)
+        results.append(result)
+        print(f"ROI {num_rois:>3}개: ROI별 계산 {result['scalar_ms']} ms/프레임, "
+              f"처리 경로(각도 + 가시성) {result['signals_ms']} ms/프레임, 일괄 계산 {result['batched_ms']} ms/프레임 "
+              f"(변환 {result['convert_ms']} ms + 계산 {result['compute_ms']} ms)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""
+헤드리스 처리 파이프라인 벤치마크
+- 합성 교실 영상(synthetic_video.py)을 ROI 수별로 생성하여 헤드리스 처리 실행 (기본 1/4/9/16개)
+- 실행마다 별도 프로세스를 사용하여 최대 RSS와 모델 초기화 시간을 분리 측정
+- 처리 FPS, 단계별 지연 시간(p50/p95/p99), 최대 RSS, 모델 초기화 시간을 JSON 보고서로 저장
+- 보고서에 커밋 정보와 실행 환경을 함께 기록하고, --compare로 이전 보고서와 비교
+- 영상 입력 파일과 네트워크 없이 CPU만으로 실행 (Pose 모델은 패키지에 포함된 복잡도 1이 기본)
+
+사용 예:
+    python benchmarks/bench_pipeline.py --output bench.json
+    python benchmarks/bench_pipeline.py --rois 1 4 --modes sequential process_pool --compare bench.json
+"""
+
+import argparse
+import json
+import multiprocessing as mproc
+import os
+import platform
+import queue
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import cv2 as cv
+import mediapipe as mp
+
+from detection import pose_model_available
+from headless import run_headless
+from synthetic_video import (
+    DEFAULT_WIDTH, DEFAULT_HEIGHT, DEFAULT_FPS, DEFAULT_SECONDS, DEFAULT_MOTION, DEFAULT_NOISE,
+    generate_video
+)
+
+MODES = ("sequential", "process_pool", "shared_frame")
+DEFAULT_ROI_COUNTS = [1, 4, 9, 16]
+DEFAULT_POSE_COMPLEXITY = 1          # 패키지에 포함된 모델 (0/2는 처음 사용할 때 내려받아야 함)
+REPORT_VERSION = 1
+RESULT_POLL_SECONDS = 5.0            # 측정 프로세스 결과 대기 중 종료 여부를 확인하는 간격 (초)
+
+# 비교 시 표시할 단계 (p95 기준)
+COMPARE_STAGES = ("process", "pose.process", "face_mesh.process", "analyze")
+
+
+def git_info():
+    """현재 커밋과 작업 트리 변경 여부 (git이 없으면 None)"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_DIR,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return {"commit": commit, "dirty": bool(status.strip())}
+
+def environment_info():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "opencv": cv.__version__,
+        "mediapipe": getattr(mp, "__version__", "unknown"),
+    }
+
+def run_case(mode, video_path, layout_path, output_dir, workers, pose_complexity, result_queue):
+    """한 번의 헤드리스 처리를 측정하고 결과를 큐로 반환 (별도 프로세스에서 실행)"""
+    try:
+        summary = run_headless(
+            video_path, layout_path, output_dir,
+            workers=workers if mode == "process_pool" else 0,
+            shared_frame=mode == "shared_frame",
+            pose_complexity=pose_complexity
+        )
+    except Exception as e:
+        result_queue.put({"error": f"{type(e).__name__}: {e}"})
+        return
+    # Linux ru_maxrss 단위: KB (작업자 프로세스는 종료된 뒤 RUSAGE_CHILDREN에 반영)
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    result_queue.put({
+        "frames": summary["frames"],
+        "elapsed_seconds": summary["elapsed_seconds"],
+        "fps": summary["processing_fps"],
+        "init_seconds": summary["init_seconds"],
+        "peak_rss_mb": round(self_rss / 1024, 1),
+        "worker_peak_rss_mb": round(children_rss / 1024, 1) if mode == "process_pool" else None,
+        "stage_latency": summary["stage_latency"],
+        "detection_stages": summary["detection_stages"],
+    })
+
+def wait_for_result(proc, result_queue, poll=RESULT_POLL_SECONDS):
+    """측정 프로세스의 결과 대기 (결과 없이 종료되면 오류 결과 반환)"""
+    while True:
+        try:
+            return result_queue.get(timeout=poll)
+        except queue.Empty:
+            if not proc.is_alive():
+                break
+    # 종료 직전에 넣은 결과가 늦게 도착했을 수 있음
+    try:
+        return result_queue.get(timeout=1.0)
+    except queue.Empty:
+        return {"error": f"Benchmark process exited without a result (exit code {proc.exitcode})"}
+
+def run_benchmark(roi_counts, modes, work_dir, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT,
+                  fps=DEFAULT_FPS, seconds=DEFAULT_SECONDS, motion=DEFAULT_MOTION, noise=DEFAULT_NOISE,
+                  workers=None, pose_complexity=DEFAULT_POSE_COMPLEXITY, seed=0):
+    """ROI 수와 실행 방식별로 합성 영상을 처리하고 보고서 반환"""
+    ctx = mproc.get_context("spawn")
+    results = []
+    for num_rois in roi_counts:
+        video_path, layout_path = generate_video(
+            os.path.join(work_dir, f"classroom_{num_rois}.avi"), num_rois, width, height, fps, seconds,
+            motion, noise, seed=seed
+        )
+        for mode in modes:
+            result_queue = ctx.Queue()
+            proc = ctx.Process(target=run_case, args=(
+                mode, video_path, layout_path, os.path.join(work_dir, f"{mode}_{num_rois}"),
+                workers or min(num_rois, os.cpu_count() or 1), pose_complexity, result_queue
+            ))
+            proc.start()
+            result = wait_for_result(proc, result_queue)
+            proc.join()
+            result = dict(mode=mode, rois=num_rois, **result)
+            results.append(result)
+            if "error" in result:
+                print(f"{mode:>13} ROI {num_rois:>2}개: 실패 - {result['error']}")
+            else:
+                print(f"{mode:>13} ROI {num_rois:>2}개: {result['fps']} FPS, 초기화 {result['init_seconds']}초, "
+                      f"최대 RSS {result['peak_rss_mb']} MB")
+
+    return {
+        "version": REPORT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git": git_info(),
+        "environment": environment_info(),
+        "config": {
+            "width": width, "height": height, "fps": fps, "seconds": seconds,
+            "motion": motion, "noise": noise, "seed": seed, "pose_complexity": pose_complexity,
+        },
+        "results": results,
+    }
+
+def compare_reports(baseline, report):
+    """같은 실행 방식/ROI 수의 FPS와 주요 단계 p95를 기준 보고서와 비교하여 출력"""
+    baseline_results = {(r["mode"], r["rois"]): r for r in baseline["results"] if "error" not in r}
+    base_commit = (baseline.get("git") or {}).get("commit", "unknown")[:10]
+    print(f"기준 보고서 비교 (커밋 {base_commit})")
+    for result in report["results"]:
+        base = baseline_results.get((result["mode"], result["rois"]))
+        if base is None or "error" in result:
+            continue
+        change = (result["fps"] / base["fps"] - 1) * 100 if base["fps"] else 0.0
+        line = f"{result['mode']:>13} ROI {result['rois']:>2}개: FPS {base['fps']} → {result['fps']} ({change:+.1f}%)"
+        for stage in COMPARE_STAGES:
+            if stage in result["stage_latency"] and stage in base["stage_latency"]:
+                line += (f", {stage} p95 {base['stage_latency'][stage]['p95_ms']}"
+                         f" → {result['stage_latency'][stage]['p95_ms']} ms")
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="합성 영상으로 헤드리스 처리 성능 측정")
+    parser.add_argument("--rois", type=int, nargs="+", default=DEFAULT_ROI_COUNTS, help="측정할 ROI(좌석) 수")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=["sequential"], help="추론 실행 방식")
+    parser.add_argument("--width", type=int, default=DEFAULT_WIDTH, help="합성 영상 너비")
+    parser.add_argument("--height", type=int, default=DEFAULT_HEIGHT, help="합성 영상 높이")
+    parser.add_argument("--fps", type=float, default=DEFAULT_FPS, help="합성 영상 FPS")
+    parser.add_argument("--seconds", type=float, default=DEFAULT_SECONDS, help="합성 영상 길이 (초)")
+    parser.add_argument("--motion", type=float, default=DEFAULT_MOTION,
+                        help="머리 흔들림 크기 (좌석 높이 대비 비율, 0이면 정지)")
+    parser.add_argument("--noise", type=float, default=DEFAULT_NOISE, help="센서 잡음 표준편차")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="process_pool 작업자 수 (기본: ROI 수와 CPU 코어 수 중 작은 값)")
+    parser.add_argument("--pose-complexity", type=int, choices=(0, 1, 2), default=DEFAULT_POSE_COMPLEXITY,
+                        help="Pose 모델 복잡도 (기본 1: 패키지에 포함된 모델)")
+    parser.add_argument("--seed", type=int, default=0, help="합성 영상 난수 시드")
+    parser.add_argument("--work-dir", default=None, help="합성 영상과 처리 결과 폴더 (기본: 임시 폴더, 종료 시 삭제)")
+    parser.add_argument("--output", default=None, help="보고서 JSON 저장 경로")
+    parser.add_argument("--compare", default=None, help="비교할 이전 보고서 JSON 경로")
+    args = parser.parse_args(argv)
+
+    if not pose_model_available(args.pose_complexity):
+        print(f"Error: Pose 모델 복잡도 {args.pose_complexity}의 모델 파일이 설치되어 있지 않습니다 "
+              f"(오프라인 실행은 --pose-complexity {DEFAULT_POSE_COMPLEXITY} 사용)")
+        return 1
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="bench_pipeline_")
+    try:
+        report = run_benchmark(
+            args.rois, args.modes, work_dir, args.width, args.height, args.fps, args.seconds,
+            args.motion, args.noise, args.workers, args.pose_complexity, args.seed
+        )
+    finally:
+        if args.work_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"보고서 저장: {args.output}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare_reports(json.load(f), report)
+    return 1 if any("error" in result for result in report["results"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
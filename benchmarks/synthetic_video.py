@@ -0,0 +1,155 @@
+"""
+벤치마크용 합성 교실 영상 생성
+- 좌석을 격자로 배치하고 좌석마다 책상, 몸통, 얼굴(눈/입)을 그림
+- 머리 흔들림, 주기적인 머리 숙임, 센서 잡음으로 움직임 정도 조절
+- 같은 설정과 시드면 항상 같은 영상 생성 (커밋 간 비교용)
+- 좌석 위치를 ROI 레이아웃 파일로 함께 저장
+
+사용 예:
+    python benchmarks/synthetic_video.py output/bench/classroom.avi --seats 9 --seconds 4
+"""
+
+import argparse
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2 as cv
+import numpy as np
+
+from roi_layout import save_roi_layout
+
+DEFAULT_WIDTH = 1280
+DEFAULT_HEIGHT = 720
+DEFAULT_FPS = 30.0
+DEFAULT_SECONDS = 4.0
+DEFAULT_MOTION = 0.05     # 머리 흔들림 크기 (좌석 높이 대비 비율)
+DEFAULT_NOISE = 4.0       # 센서 잡음 표준편차 (화소값)
+HEAD_DOWN_PERIOD = 3.0    # 머리 숙임 주기 (초, 좌석마다 시작 시점이 다름)
+HEAD_DOWN_RATIO = 0.3     # 주기 중 머리를 숙이고 있는 비율
+
+VIDEO_CODEC = "MJPG"      # 추가 코덱 없이 OpenCV 기본 빌드에서 읽고 쓸 수 있는 코덱
+
+BACKGROUND_COLOR = (170, 180, 185)
+DESK_COLOR = (60, 90, 130)
+SKIN_COLOR = (150, 180, 225)
+EYE_COLOR = (40, 30, 30)
+
+
+def seat_grid(num_seats, width, height):
+    """좌석 수에 맞는 격자로 좌석 영역 계산
+
+    Returns:
+        list: [((x1, y1, x2, y2), name), ...] 형태의 ROI 목록
+    """
+    cols = math.ceil(math.sqrt(num_seats))
+    rows = math.ceil(num_seats / cols)
+    seat_w, seat_h = width // cols, height // rows
+    return [
+        ((col * seat_w, row * seat_h, (col + 1) * seat_w, (row + 1) * seat_h), f"ROI_{i + 1}")
+        for i, (row, col) in enumerate((i // cols, i % cols) for i in range(num_seats))
+    ]
+
+def draw_student(frame, rect, t, phase, motion):
+    """좌석 영역에 학생 한 명을 그림 (t: 영상 시각, phase: 좌석별 움직임 위상)"""
+    x1, y1, x2, y2 = rect
+    w, h = x2 - x1, y2 - y1
+    cx = x1 + w // 2
+
+    # 책상과 몸통
+    cv.rectangle(frame, (x1 + w // 10, y1 + h * 3 // 4), (x2 - w // 10, y2 - 1), DESK_COLOR, -1)
+    cv.ellipse(frame, (cx, y1 + h * 3 // 4), (w // 4, h // 4), 0, 180, 360, (90, 70, 60), -1)
+
+    # 머리: 좌우 흔들림 + 주기적으로 숙임
+    sway = motion * h * math.sin(2 * math.pi * (t / 2.0 + phase))
+    cycle = ((t + phase * HEAD_DOWN_PERIOD) % HEAD_DOWN_PERIOD) / HEAD_DOWN_PERIOD
+    nod = motion * h * 3 if cycle < HEAD_DOWN_RATIO else 0.0
+    head = (int(cx + sway), int(y1 + h * 0.38 + nod))
+    radius = max(4, int(min(w, h) * 0.14))
+    cv.circle(frame, head, radius, SKIN_COLOR, -1)
+
+    # 눈과 입 (숙이면 눈이 감긴 것처럼 가늘게)
+    eye_dx, eye_dy = radius // 3, radius // 5
+    eye_h = max(1, radius // 8 if nod else radius // 5)
+    for side in (-1, 1):
+        cv.ellipse(frame, (head[0] + side * eye_dx, head[1] - eye_dy), (max(1, radius // 6), eye_h),
+                   0, 0, 360, EYE_COLOR, -1)
+    cv.ellipse(frame, (head[0], head[1] + radius // 2), (radius // 4, max(1, radius // 10)),
+               0, 0, 360, (70, 70, 150), -1)
+
+def generate_video(path, seats=4, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, fps=DEFAULT_FPS,
+                   seconds=DEFAULT_SECONDS, motion=DEFAULT_MOTION, noise=DEFAULT_NOISE,
+                   layout_path=None, seed=0):
+    """합성 교실 영상과 좌석 ROI 레이아웃 생성
+
+    Args:
+        path: 저장할 영상 경로 (.avi)
+        seats: 좌석 수
+        width, height: 영상 해상도
+        fps: 영상 FPS
+        seconds: 영상 길이 (초)
+        motion: 머리 흔들림 크기 (좌석 높이 대비 비율, 0이면 정지)
+        noise: 센서 잡음 표준편차 (0이면 잡음 없음)
+        layout_path: ROI 레이아웃 저장 경로 (None이면 영상 경로의 확장자를 .json으로 바꾼 경로)
+        seed: 좌석별 움직임 위상과 잡음의 난수 시드
+
+    Returns:
+        tuple: (영상 경로, 레이아웃 경로)
+    """
+    rng = np.random.default_rng(seed)
+    rois = seat_grid(seats, width, height)
+    phases = rng.random(seats)
+    num_frames = max(1, int(round(seconds * fps)))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    writer = cv.VideoWriter(path, cv.VideoWriter_fourcc(*VIDEO_CODEC), fps, (width, height))
+    if not writer.isOpened():
+        raise IOError(f"Could not open video writer: {path}")
+
+    background = np.empty((height, width, 3), dtype=np.uint8)
+    background[:] = BACKGROUND_COLOR
+    try:
+        for frame_idx in range(num_frames):
+            t = frame_idx / fps
+            frame = background.copy()
+            for (rect, _), phase in zip(rois, phases):
+                draw_student(frame, rect, t, phase, motion)
+            if noise > 0:
+                frame = cv.add(frame, rng.normal(0, noise, frame.shape).astype(np.int16), dtype=cv.CV_8U)
+            writer.write(frame)
+    finally:
+        writer.release()
+
+    if layout_path is None:
+        layout_path = os.path.splitext(path)[0] + ".json"
+    save_roi_layout(layout_path, rois, (width, height))
+    return path, layout_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="벤치마크용 합성 교실 영상과 ROI 레이아웃 생성")
+    parser.add_argument("output", help="저장할 영상 경로 (.avi)")
+    parser.add_argument("--seats", type=int, default=4, help="좌석 수")
+    parser.add_argument("--width", type=int, default=DEFAULT_WIDTH, help="영상 너비")
+    parser.add_argument("--height", type=int, default=DEFAULT_HEIGHT, help="영상 높이")
+    parser.add_argument("--fps", type=float, default=DEFAULT_FPS, help="영상 FPS")
+    parser.add_argument("--seconds", type=float, default=DEFAULT_SECONDS, help="영상 길이 (초)")
+    parser.add_argument("--motion", type=float, default=DEFAULT_MOTION,
+                        help="머리 흔들림 크기 (좌석 높이 대비 비율, 0이면 정지)")
+    parser.add_argument("--noise", type=float, default=DEFAULT_NOISE, help="센서 잡음 표준편차")
+    parser.add_argument("--layout", default=None, help="ROI 레이아웃 저장 경로 (기본: 영상 이름.json)")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    args = parser.parse_args(argv)
+
+    video_path, layout_path = generate_video(
+        args.output, args.seats, args.width, args.height, args.fps, args.seconds,
+        args.motion, args.noise, args.layout, args.seed
+    )
+    print(f"영상: {video_path}, ROI 레이아웃: {layout_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+영상 캡처 모듈
+- 별도 스레드에서 프레임을 읽어 처리 루프와 분리
+- 라이브 소스(웹캠, RTSP)는 최신 프레임만 유지하여 지연이 쌓이지 않도록 함
+- 버퍼가 가득 찼을 때의 처리 정책과 버려진 프레임 수 제공
+- 프레임마다 번호, 캡처 시각, 영상 내 재생 위치 기록 (media_clock 참고)
+"""
+
+import collections
+import threading
+import time
+
+import cv2 as cv
+
+# 버퍼가 가득 찼을 때의 처리 정책
+DROP_OLDEST = "drop_oldest"  # 가장 오래된 프레임을 버리고 새 프레임 저장 (최신 프레임 우선)
+DROP_NEWEST = "drop_newest"  # 새로 읽은 프레임을 버림
+BLOCK = "block"              # 공간이 생길 때까지 대기 (파일 입력, 프레임 손실 없음)
+
+DROP_POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+
+def parse_source(source):
+    """명령행 소스 문자열을 VideoCapture 인자로 변환 ("0" -> 카메라 0)"""
+    if isinstance(source, str) and source.isdigit():
+        return int(source)
+    return source
+
+def is_live_source(source):
+    """카메라 번호 또는 스트림 URL이면 라이브 소스로 판단"""
+    if isinstance(source, int):
+        return True
+    return "://" in str(source)
+
+
+class FrameGrabber:
+    """스레드 기반 프레임 캡처기
+
+    cv.VideoCapture와 같은 read()/get()/isOpened()/release() 인터페이스를 제공합니다.
+
+    Args:
+        source: 영상 파일 경로, 카메라 번호 또는 스트림 URL
+        queue_size: 보관할 최대 프레임 수 (1이면 최신 프레임만 유지)
+        drop_policy: 버퍼가 가득 찼을 때의 정책 (DROP_OLDEST / DROP_NEWEST / BLOCK)
+    """
+    def __init__(self, source, queue_size=1, drop_policy=DROP_OLDEST):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+
+        self.source = source
+        self.queue_size = queue_size
+        self.drop_policy = drop_policy
+        self.cap = cv.VideoCapture(source)
+        self.live = is_live_source(source)
+        if self.live:
+            # 드라이버 내부 버퍼 최소화 (지원하지 않는 백엔드는 무시)
+            self.cap.set(cv.CAP_PROP_BUFFERSIZE, 1)
+
+        # 읽기 스레드 시작 전에 속성 캐시
+        self.properties = {}
+        for prop in (cv.CAP_PROP_FRAME_WIDTH, cv.CAP_PROP_FRAME_HEIGHT, cv.CAP_PROP_FPS,
+                     cv.CAP_PROP_FRAME_COUNT):
+            self.properties[prop] = self.cap.get(prop)
+
+        self.frames = collections.deque()
+        self.condition = threading.Condition()
+        self.running = False
+        self.finished = False
+        self.thread = None
+
+        # 통계
+        self.frames_read = 0
+        self.frames_dropped = 0
+        self.last_capture_time = None
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def get(self, prop):
+        if prop in self.properties:
+            return self.properties[prop]
+        return self.cap.get(prop)
+
+    def start(self):
+        """읽기 스레드 시작"""
+        if self.thread is not None:
+            return self
+        self.running = True
+        self.thread = threading.Thread(target=self._reader, name="FrameGrabber", daemon=True)
+        self.thread.start()
+        return self
+
+    def _reader(self):
+        while self.running:
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            captured_at = time.monotonic()
+            frame_info = {
+                'index': self.frames_read,
+                'captured_at': captured_at,
+                # 라이브 소스는 재생 위치가 의미 없음
+                'position_ms': None if self.live else self.cap.get(cv.CAP_PROP_POS_MSEC),
+            }
+
+            with self.condition:
+                self.frames_read += 1
+                if len(self.frames) >= self.queue_size:
+                    if self.drop_policy == DROP_OLDEST:
+                        self.frames.popleft()
+                        self.frames_dropped += 1
+                    elif self.drop_policy == DROP_NEWEST:
+                        self.frames_dropped += 1
+                        continue
+                    else:
+                        while self.running and len(self.frames) >= self.queue_size:
+                            self.condition.wait()
+                        if not self.running:
+                            break
+                self.frames.append((frame, frame_info))
+                self.last_capture_time = captured_at
+                self.condition.notify_all()
+
+        with self.condition:
+            self.finished = True
+            self.condition.notify_all()
+
+    def read(self, timeout=None):
+        """다음 프레임 반환
+
+        Returns:
+            tuple: (성공 여부, 프레임) - cv.VideoCapture.read()와 동일
+        """
+        ret, frame, _ = self.read_with_timestamp(timeout)
+        return ret, frame
+
+    def read_with_timestamp(self, timeout=None):
+        """다음 프레임과 캡처 시각(time.monotonic 기준) 반환"""
+        ret, frame, frame_info = self.read_frame(timeout)
+        return ret, frame, frame_info['captured_at'] if ret else None
+
+    def read_frame(self, timeout=None):
+        """다음 프레임과 프레임 정보 반환
+
+        Returns:
+            tuple: (성공 여부, 프레임, {'index', 'captured_at', 'position_ms'})
+        """
+        if self.thread is None:
+            self.start()
+        with self.condition:
+            ready = self.condition.wait_for(lambda: self.frames or self.finished, timeout)
+            if not ready or not self.frames:
+                return False, None, None
+            frame, frame_info = self.frames.popleft()
+            self.condition.notify_all()
+            return True, frame, frame_info
+
+    def queue_depth(self):
+        """현재 버퍼에 쌓인 프레임 수"""
+        with self.condition:
+            return len(self.frames)
+
+    def stats(self):
+        """캡처 통계 반환"""
+        with self.condition:
+            return {
+                "frames_read": self.frames_read,
+                "frames_dropped": self.frames_dropped,
+                "queue_depth": len(self.frames),
+            }
+
+    def release(self):
+        """읽기 스레드 종료 및 장치 해제"""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+            self.thread = None
+        self.cap.release()
+
+
+def open_capture(source, queue_size=1, drop_policy=None):
+    """소스 종류에 맞는 FrameGrabber 생성
+
+    라이브 소스는 최신 프레임 우선(DROP_OLDEST), 파일은 손실 없는 BLOCK 정책을 기본으로 사용합니다.
+    """
+    source = parse_source(source)
+    if drop_policy is None:
+        drop_policy = DROP_OLDEST if is_live_source(source) else BLOCK
+    return FrameGrabber(source, queue_size=queue_size, drop_policy=drop_policy)
@@ -0,0 +1,614 @@
+"""
+감지 로직 공통 모듈
+- MediaPipe 모델 설정 및 ROI별 처리기
+- 머리 숙임 각도 계산 및 상태 판단
+- 랜드마크를 NumPy 배열로 변환하여 모든 ROI의 머리 각도를 한 번에 계산
+- GUI(PyQt5) 없이도 사용할 수 있도록 분리
+"""
+
+import os
+import time
+
+import cv2 as cv
+import mediapipe as mp
+import numpy as np
+
+from structured_log import LOG
+
+#-------------------------------------------
+# 상수 정의
+#-------------------------------------------
+
+# MediaPipe 모델 설정 관련 상수
+MIN_DETECTION_CONFIDENCE = 0.5  # MediaPipe 모델의 최소 감지 신뢰도 (0.0 ~ 1.0)
+MIN_TRACKING_CONFIDENCE = 0.5   # MediaPipe 모델의 최소 추적 신뢰도 (0.0 ~ 1.0)
+BLINK_THRESHOLD = 0.51         # 눈 깜빡임 감지를 위한 임계값
+MOVING_AVERAGE_WINDOW = 3      # 움직임 평균을 계산하기 위한 윈도우 크기
+
+# 머리 숙임 감지 관련 상수
+HEAD_DOWN_ANGLE_THRESHOLD = 15  # 머리가 숙여졌다고 판단하는 각도 임계값 (도 단위)
+HEAD_DOWN_WARNING_TIME = 15     # '주의' 상태로 판단하는 머리 숙임 지속 시간 (초 단위)
+HEAD_DOWN_DROWSY_TIME = 60      # '졸음' 상태로 판단하는 머리 숙임 지속 시간 (초 단위)
+PERCLOS_WARNING_THRESHOLD = 0.15  # 최근 눈 감은 시간 비율(PERCLOS)이 이 값 이상이면 '주의'
+PERCLOS_DROWSY_THRESHOLD = 0.3    # PERCLOS가 이 값 이상이면 '졸음'
+HEAD_ANGLE_VISIBILITY_THRESHOLD = 0.3  # 머리 각도 계산에 필요한 랜드마크의 최소 가시성
+HEAD_ANGLE_REFERENCE_DIFF = 0.2        # 정상 자세일 때의 코/귀와 어깨의 y좌표 차이 기준값
+
+# Pose 모델 기본 설정 (지연 시간 제어기가 ROI별로 바꿀 수 있음)
+DEFAULT_POSE_CONFIG = {
+    'model_complexity': 2,
+    'min_detection_confidence': MIN_DETECTION_CONFIDENCE,
+    'min_tracking_confidence': MIN_TRACKING_CONFIDENCE,
+}
+
+# Pose 모델 복잡도별 모델 파일 (1만 패키지에 포함, 0/2는 처음 사용할 때 내려받음)
+POSE_MODEL_FILES = {0: "pose_landmark_lite.tflite", 1: "pose_landmark_full.tflite", 2: "pose_landmark_heavy.tflite"}
+
+# 감지 단계(cascade) 설정
+CASCADE_OFF = "off"                        # 항상 Face Mesh와 Pose 모두 실행
+CASCADE_FACE_MESH = "face_mesh"            # Pose 먼저, 부족할 때만 Face Mesh
+CASCADE_FACE_DETECTION = "face_detection"  # Pose 먼저, 부족할 때만 얼굴 검출기 (Face Mesh보다 가벼움)
+CASCADE_MODES = (CASCADE_OFF, CASCADE_FACE_MESH, CASCADE_FACE_DETECTION)
+CASCADE_VISIBILITY_THRESHOLD = 0.5         # 머리/어깨 랜드마크 가시성이 이 값 이상이면 Pose만으로 충분
+
+# 프레임 처리 관련 상수
+TARGET_FRAME_HEIGHT = 720       # 처리 전 프레임을 맞추는 높이 (ROI 좌표 기준)
+
+# Face Mesh 랜드마크 인덱스 (MediaPipe Face Mesh의 468개 랜드마크 중 주요 포인트)
+NOSE_TIP_INDEX = 1              # 코끝 위치
+CHIN_INDEX = 152                # 턱 위치
+LEFT_EYE_LEFT_CORNER_INDEX = 33    # 왼쪽 눈의 왼쪽 끝점
+RIGHT_EYE_RIGHT_CORNER_INDEX = 133  # 오른쪽 눈의 오른쪽 끝점
+LEFT_MOUTH_CORNER_INDEX = 61        # 입의 왼쪽 끝점
+RIGHT_MOUTH_CORNER_INDEX = 291      # 입의 오른쪽 끝점
+
+# 눈 감지를 위한 랜드마크 인덱스 그룹
+LEFT_EYE_POINTS = [362, 385, 386, 387, 263, 373, 374, 380]   # 왼쪽 눈 윤곽을 구성하는 점들
+RIGHT_EYE_POINTS = [33, 160, 159, 158, 133, 153, 145, 144]   # 오른쪽 눈 윤곽을 구성하는 점들
+
+# ROI 상태 표시 문자열
+STATE_NORMAL = "정상"
+STATE_WARNING = "주의"
+STATE_DROWSY = "졸음"
+STATE_ABSENT = ""
+
+# 머리 각도 계산에 사용하는 Pose 랜드마크 (코, 양쪽 어깨, 양쪽 귀)
+HEAD_POSE_LANDMARKS = (
+    mp.solutions.pose.PoseLandmark.NOSE,
+    mp.solutions.pose.PoseLandmark.LEFT_SHOULDER,
+    mp.solutions.pose.PoseLandmark.RIGHT_SHOULDER,
+    mp.solutions.pose.PoseLandmark.LEFT_EAR,
+    mp.solutions.pose.PoseLandmark.RIGHT_EAR,
+)
+HEAD_POSE_INDICES = [int(landmark) for landmark in HEAD_POSE_LANDMARKS]
+
+# 랜드마크 배열의 마지막 축 (x, y, z, visibility)
+LANDMARK_X, LANDMARK_Y, LANDMARK_Z, LANDMARK_VISIBILITY = range(4)
+
+# ROI별 평활화 신호 (AngleBuffer.SignalBuffer의 신호 축)
+SIGNAL_PITCH, SIGNAL_EAR, SIGNAL_VISIBILITY = range(3)  # 머리 숙임 각도, 눈 종횡비, 머리/어깨 가시성
+NUM_SIGNALS = 3
+
+# 처리하지 않은 ROI의 감지 결과
+EMPTY_DETECTION = {
+    'processed': False,
+    'face_landmarks': None,   # Face Mesh 랜드마크 (ROI 기준 정규화 좌표)
+    'face_detected': False,   # 얼굴 감지 여부 (얼굴 검출기는 랜드마크 없이 이 값만 설정)
+    'pose_landmarks': None,   # Pose 랜드마크
+    'face_ran': False,        # 이번 프레임에 얼굴 모델을 실행했는지
+    'pose_ran': False,        # 이번 프레임에 Pose 모델을 실행했는지
+    'latency': 0.0,           # ROI 추론에 걸린 시간 (초)
+    'stage_times': None,      # 단계별 소요 시간 {'cvtColor': 초, 'pose.process': 초, ...}
+    'reused': False,          # 추론을 생략하여 이전 감지 결과를 다시 사용했는지 (추론 주기 조절/움직임 게이트)
+}
+
+#-------------------------------------------
+# 유틸리티 함수
+#-------------------------------------------
+
+def create_pose(pose_config=None, static_image_mode=False):
+    """설정에 맞는 MediaPipe Pose 생성"""
+    config = dict(DEFAULT_POSE_CONFIG, **(pose_config or {}))
+    return mp.solutions.pose.Pose(
+        static_image_mode=static_image_mode,
+        model_complexity=config['model_complexity'],
+        smooth_landmarks=True,
+        enable_segmentation=False,
+        min_detection_confidence=config['min_detection_confidence'],
+        min_tracking_confidence=config['min_tracking_confidence']
+    )
+
+def pose_model_available(complexity):
+    """Pose 모델 파일이 설치되어 있는지 확인 (없으면 MediaPipe가 네트워크에서 내려받으려 함)"""
+    model_dir = os.path.join(os.path.dirname(mp.__file__), "modules", "pose_landmark")
+    return os.path.exists(os.path.join(model_dir, POSE_MODEL_FILES[complexity]))
+
+def calculate_head_angle(landmarks):
+    """머리 숙임 각도 계산
+
+    Args:
+        landmarks: MediaPipe Pose 랜드마크 데이터
+
+    Returns:
+        float: 머리 숙임 각도 (0~90도)
+    """
+    try:
+        # 필요한 랜드마크 추출
+        nose = landmarks[mp.solutions.pose.PoseLandmark.NOSE]
+        left_shoulder = landmarks[mp.solutions.pose.PoseLandmark.LEFT_SHOULDER]
+        right_shoulder = landmarks[mp.solutions.pose.PoseLandmark.RIGHT_SHOULDER]
+        left_ear = landmarks[mp.solutions.pose.PoseLandmark.LEFT_EAR]
+        right_ear = landmarks[mp.solutions.pose.PoseLandmark.RIGHT_EAR]
+
+        # 각 랜드마크의 가시성(visibility) 확인
+        visibility_threshold = HEAD_ANGLE_VISIBILITY_THRESHOLD
+        landmarks_visible = (
+            nose.visibility > visibility_threshold and
+            left_shoulder.visibility > visibility_threshold and
+            right_shoulder.visibility > visibility_threshold and
+            left_ear.visibility > visibility_threshold and
+            right_ear.visibility > visibility_threshold
+        )
+
+        if not landmarks_visible:
+            # 랜마크가 잘 이지 않으면 엎드린 것으로 간주
+            return 90  # 최대 각도 반환
+
+        # 어깨 중심점의 y좌표
+        shoulder_y = (left_shoulder.y + right_shoulder.y) / 2
+        ear_y = (left_ear.y + right_ear.y) / 2
+
+        # 머리 숙임 정도 계산
+        # 코와 어깨, 귀와 어깨의 y좌표 차이 모 려
+        nose_shoulder_diff = nose.y - shoulder_y
+        ear_shoulder_diff = ear_y - shoulder_y
+
+        #  큰 차이값 용
+        current_diff = max(nose_shoulder_diff, ear_shoulder_diff)
+
+        # 정상 자일 때의 기준값
+        reference_diff = HEAD_ANGLE_REFERENCE_DIFF
+
+        # 머 숙임 각도 계산
+        head_angle = (current_diff + reference_diff) * 100
+
+        # 디버깅용 기록 (디버그 수준이 아니면 필드도 만들지 않음)
+        if LOG.debug_enabled:
+            LOG.debug(
+                "head_angle", nose_y=nose.y, shoulder_y=shoulder_y, ear_y=ear_y,
+                nose_visibility=nose.visibility,
+                shoulder_visibility=(left_shoulder.visibility + right_shoulder.visibility) / 2,
+                head_angle=head_angle
+            )
+
+        return max(0, min(90, head_angle))  # 0~90도 범위로 제한
+
+    except Exception as e:
+        LOG.error("head_angle_error", error=f"{type(e).__name__}: {e}")
+        return 0
+
+def landmarks_to_array(landmark_lists, indices=None, num_landmarks=None):
+    """ROI별 랜드마크를 (ROI 수, 랜드마크 수, 4) 배열로 변환
+
+    protobuf 객체는 여기서 한 번만 읽고 이후 계산은 배열로 처리합니다.
+
+    Args:
+        landmark_lists: ROI별 NormalizedLandmarkList 또는 (랜드마크 수, 4) 배열 (없으면 None)
+        indices: 변환할 랜드마크 번호 목록 (None이면 전체)
+        num_landmarks: indices가 None일 때의 랜드마크 수 (None이면 가장 긴 랜드마크 목록 기준)
+
+    Returns:
+        np.ndarray: float64 배열 [..., (x, y, z, visibility)], 랜드마크가 없는 ROI는 NaN
+    """
+    present = [roi_idx for roi_idx, lms in enumerate(landmark_lists) if lms is not None]
+    if indices is not None:
+        num_landmarks = len(indices)
+    elif num_landmarks is None:
+        num_landmarks = max((len(_landmark_items(landmark_lists[i])) for i in present), default=0)
+
+    array = np.full((len(landmark_lists), num_landmarks, 4), np.nan)
+    proto_rois = []
+    for roi_idx in present:
+        landmarks = landmark_lists[roi_idx]
+        if isinstance(landmarks, np.ndarray):
+            # 기록에서 재생한 랜드마크는 이미 배열 (landmark_replay)
+            landmarks = landmarks[indices] if indices is not None else landmarks[:num_landmarks]
+            array[roi_idx, :len(landmarks)] = landmarks
+        elif indices is None:
+            points = landmarks.landmark[:num_landmarks]
+            _fill_landmarks(array[roi_idx, :len(points)], points)
+        else:
+            proto_rois.append(roi_idx)
+
+    if proto_rois:
+        # 필요한 번호의 랜드마크만 모든 ROI에서 모아 필드별로 한 번에 채움 (랜드마크별 튜플을 만들지 않음)
+        points = [
+            landmarks[i] for landmarks in [landmark_lists[roi_idx].landmark for roi_idx in proto_rois]
+            for i in indices
+        ]
+        block = np.empty((len(points), 4))
+        _fill_landmarks(block, points)
+        array[proto_rois] = block.reshape(len(proto_rois), num_landmarks, 4)
+    return array
+
+def _fill_landmarks(rows, points):
+    """(랜드마크 수, 4) 배열에 protobuf 랜드마크 값을 필드별로 채움"""
+    rows[:, LANDMARK_X] = [lm.x for lm in points]
+    rows[:, LANDMARK_Y] = [lm.y for lm in points]
+    rows[:, LANDMARK_Z] = [lm.z for lm in points]
+    rows[:, LANDMARK_VISIBILITY] = [lm.visibility for lm in points]
+
+def _landmark_items(landmarks):
+    return landmarks if isinstance(landmarks, np.ndarray) else landmarks.landmark
+
+def calculate_head_angles(head_array, visibility_threshold=HEAD_ANGLE_VISIBILITY_THRESHOLD,
+                          reference_diff=HEAD_ANGLE_REFERENCE_DIFF):
+    """모든 ROI의 머리 숙임 각도를 한 번에 계산 (calculate_head_angle과 같은 결과)
+
+    Args:
+        head_array: (ROI 수, 5, 4) 배열. 랜드마크 순서는 HEAD_POSE_LANDMARKS
+            (전체 Pose 배열은 pose_array[:, HEAD_POSE_INDICES]로 변환)
+        visibility_threshold: 랜드마크 최소 가시성 (임계값 조정용, 기본 HEAD_ANGLE_VISIBILITY_THRESHOLD)
+        reference_diff: 정상 자세 y좌표 차이 기준값 (기본 HEAD_ANGLE_REFERENCE_DIFF)
+
+    Returns:
+        np.ndarray: ROI별 머리 숙임 각도 (0~90도), 랜드마크가 없는 ROI는 NaN
+    """
+    y = head_array[:, :, LANDMARK_Y]
+    nose_y, left_shoulder_y, right_shoulder_y, left_ear_y, right_ear_y = y.T
+
+    # 하나라도 잘 보이지 않으면 엎드린 것으로 간주 (NaN 비교는 False)
+    visible = (head_array[:, :, LANDMARK_VISIBILITY] > visibility_threshold).all(axis=1)
+
+    shoulder_y = (left_shoulder_y + right_shoulder_y) / 2
+    ear_y = (left_ear_y + right_ear_y) / 2
+    current_diff = np.maximum(nose_y - shoulder_y, ear_y - shoulder_y)
+    head_angles = np.clip((current_diff + reference_diff) * 100, 0, 90)
+
+    head_angles = np.where(visible, head_angles, 90.0)
+    head_angles[np.isnan(nose_y)] = np.nan
+    return head_angles
+
+def head_pose_signals(pose_lists):
+    """ROI별 머리 숙임 각도와 머리/어깨 랜드마크 평균 가시성
+
+    MediaPipe 결과(protobuf)는 ROI별로 필요한 10개 값(y, visibility)만 읽어 calculate_head_angle과 같은
+    계산을 합니다. 배열로 옮기는 비용이 계산보다 커서 benchmarks/bench_head_angle.py 기준 모든 ROI 수에서
+    일괄 계산보다 빠릅니다. 기록에서 재생한 랜드마크(배열)는 calculate_head_angles로 한 번에 계산합니다.
+
+    Args:
+        pose_lists: ROI별 NormalizedLandmarkList 또는 (랜드마크 수, 4) 배열 (없으면 None)
+
+    Returns:
+        tuple: (머리 각도 배열, 평균 가시성 배열), Pose가 없는 ROI는 NaN
+    """
+    num_rois = len(pose_lists)
+    head_angles = np.full(num_rois, np.nan)
+    visibility = np.full(num_rois, np.nan)
+    array_rois = []
+    for roi_idx, pose in enumerate(pose_lists):
+        if pose is None:
+            continue
+        if isinstance(pose, np.ndarray):
+            array_rois.append(roi_idx)
+            continue
+        landmarks = pose.landmark
+        nose, left_shoulder, right_shoulder, left_ear, right_ear = [landmarks[i] for i in HEAD_POSE_INDICES]
+        visibilities = (
+            nose.visibility, left_shoulder.visibility, right_shoulder.visibility,
+            left_ear.visibility, right_ear.visibility
+        )
+        visibility[roi_idx] = sum(visibilities) / len(visibilities)
+        if min(visibilities) <= HEAD_ANGLE_VISIBILITY_THRESHOLD:
+            head_angles[roi_idx] = 90  # 하나라도 잘 보이지 않으면 엎드린 것으로 간주
+            continue
+        shoulder_y = (left_shoulder.y + right_shoulder.y) / 2
+        ear_y = (left_ear.y + right_ear.y) / 2
+        current_diff = max(nose.y - shoulder_y, ear_y - shoulder_y)
+        head_angle = max(0, min(90, (current_diff + HEAD_ANGLE_REFERENCE_DIFF) * 100))
+        head_angles[roi_idx] = head_angle
+        if LOG.debug_enabled:
+            LOG.debug(
+                "head_angle", roi=roi_idx, nose_y=nose.y, shoulder_y=shoulder_y, ear_y=ear_y,
+                nose_visibility=nose.visibility,
+                shoulder_visibility=(left_shoulder.visibility + right_shoulder.visibility) / 2,
+                head_angle=head_angle
+            )
+
+    if array_rois:
+        head_array = landmarks_to_array([pose_lists[i] for i in array_rois], HEAD_POSE_INDICES)
+        head_angles[array_rois] = calculate_head_angles(head_array)
+        visibility[array_rois] = head_array[:, :, LANDMARK_VISIBILITY].mean(axis=1)
+        if LOG.debug_enabled:
+            _log_head_angles(head_array, head_angles[array_rois], array_rois)
+    return head_angles, visibility
+
+def _log_head_angles(head_array, head_angles, rois):
+    """배열로 계산한 머리 각도 값을 디버그 로그로 기록 (calculate_head_angle의 기록과 같은 필드)"""
+    y = head_array[:, :, LANDMARK_Y]
+    visibility = head_array[:, :, LANDMARK_VISIBILITY]
+    for row in np.flatnonzero(~np.isnan(head_angles)):
+        LOG.debug(
+            "head_angle", roi=int(rois[row]),
+            nose_y=float(y[row, 0]),
+            shoulder_y=float((y[row, 1] + y[row, 2]) / 2),
+            ear_y=float((y[row, 3] + y[row, 4]) / 2),
+            nose_visibility=float(visibility[row, 0]),
+            shoulder_visibility=float((visibility[row, 1] + visibility[row, 2]) / 2),
+            head_angle=float(head_angles[row])
+        )
+
+def head_direction(head_angle, duration):
+    """머리 각도와 머리 숙임 지속 시간으로 자세 설명 문자열 생성
+
+    Returns:
+        tuple: (자세 설명 문자열, 머리 숙임으로 인한 졸음 여부)
+    """
+    if head_angle <= HEAD_DOWN_ANGLE_THRESHOLD:
+        return "정상", False
+    if duration >= HEAD_DOWN_DROWSY_TIME:
+        return "졸음 감지", True
+    elif duration >= HEAD_DOWN_WARNING_TIME:
+        return f"주의 ({int(duration)}초)", False
+    return f"머리 숙임 감지 ({int(duration)}초)", False
+
+def classify_roi_state(person_present, head_down_duration, perclos=None):
+    """ROI 상태 문자열 반환 (정상/주의/졸음, 부재 시 빈 문자열)
+
+    머리 숙임 지속 시간과 눈 감은 시간 비율(PERCLOS) 중 더 심각한 쪽을 따릅니다.
+    """
+    if not person_present:
+        return STATE_ABSENT
+    perclos = perclos or 0.0
+    if head_down_duration >= HEAD_DOWN_DROWSY_TIME or perclos >= PERCLOS_DROWSY_THRESHOLD:
+        return STATE_DROWSY
+    if head_down_duration >= HEAD_DOWN_WARNING_TIME or perclos >= PERCLOS_WARNING_THRESHOLD:
+        return STATE_WARNING
+    return STATE_NORMAL
+
+def detect_rois(frame, rois, processors, active=None):
+    """모든 ROI에 대해 Face Mesh / Pose 감지
+
+    Args:
+        frame: 전체 프레임 (BGR)
+        rois: [((x1, y1, x2, y2), name), ...] 형태의 ROI 목록
+        processors: ROI별 QuadrantProcessor 목록
+        active: ROI별 처리 여부 목록 (None이면 모두 처리)
+
+    Returns:
+        list: ROI별 감지 결과 딕셔너리 (EMPTY_DETECTION 참고).
+            active에서 제외된 ROI는 None
+    """
+    detections = []
+    for roi_idx, (roi, _) in enumerate(rois):
+        if active is not None and not active[roi_idx]:
+            detections.append(None)
+            continue
+        x1, y1, x2, y2 = roi
+        roi_frame = frame[y1:y2, x1:x2]
+        if roi_frame.size == 0:
+            detections.append(EMPTY_DETECTION)
+            continue
+        detections.append(processors[roi_idx].detect(roi_frame))
+    return detections
+
+def pose_is_sufficient(pose_landmarks, threshold=CASCADE_VISIBILITY_THRESHOLD):
+    """머리 각도 계산에 필요한 Pose 랜드마크가 모두 충분히 보이는지 확인"""
+    if pose_landmarks is None:
+        return False
+    landmarks = pose_landmarks.landmark
+    return all(landmarks[idx].visibility >= threshold for idx in HEAD_POSE_LANDMARKS)
+
+def analyze_detections(detections, states, now, smoother=None, eyes=None):
+    """감지 결과로 사람 유무와 머리 숙임 상태 갱신
+
+    Args:
+        detections: detect_rois() 형태의 ROI별 감지 결과
+        states: ROI 상태 저장소 (roi_state.RoiStateStore), 머리 숙임 타이머는 모든 ROI를 한 번에 갱신
+        now: 현재 시각 (초 단위)
+        smoother: ROI × NUM_SIGNALS 신호를 평활화하는 AngleBuffer.SignalBuffer
+            (지정하면 평활화된 머리 각도로 머리 숙임 상태 판단)
+        eyes: Face Mesh 랜드마크로 눈 감김을 판단하는 eye_closure.EyeClosureEngine
+            (지정하면 PERCLOS도 주의/졸음 판단에 사용, 다시 사용한 감지 결과는 눈 감김 표본으로 세지 않음)
+
+    Returns:
+        list: ROI별 결과 딕셔너리
+    """
+    detections = [EMPTY_DETECTION if detection is None else detection for detection in detections]
+    num_rois = len(detections)
+    processed = np.array([detection['processed'] for detection in detections], dtype=bool)
+
+    # 머리 각도와 가시성 (Pose가 없는 ROI는 NaN)
+    pose_lists = [
+        detection['pose_landmarks'] if detection['processed'] else None for detection in detections
+    ]
+    has_pose = np.array([pose_list is not None for pose_list in pose_lists], dtype=bool)
+    present = processed & (has_pose | np.array([d['face_detected'] for d in detections], dtype=bool))
+    head_angles, head_visibility = head_pose_signals(pose_lists)
+
+    # 모든 ROI의 눈 종횡비와 PERCLOS를 한 번에 계산
+    ears = perclos = None
+    if eyes is not None:
+        face_lists = [
+            detection['face_landmarks'] if detection['processed'] else None for detection in detections
+        ]
+        fresh = np.array([not detection['reused'] for detection in detections], dtype=bool)
+        ears, perclos = eyes.update(face_lists, now, fresh)
+
+    # 모든 ROI의 신호를 한 번에 평활화 (관측이 없는 값은 NaN)
+    pitch = head_angles
+    if smoother is not None:
+        signals = np.full((num_rois, NUM_SIGNALS), np.nan)
+        if has_pose.any():
+            signals[:, SIGNAL_PITCH] = head_angles
+            signals[:, SIGNAL_VISIBILITY] = head_visibility
+        if ears is not None:
+            signals[:, SIGNAL_EAR] = ears
+        pitch = np.where(has_pose, smoother.update(signals, now)[:, SIGNAL_PITCH], np.nan)
+
+    # 머리 숙임 타이머와 상태는 모든 ROI를 한 번에 갱신
+    states.update(now, processed, present, pitch, perclos)
+    durations = states.head_down_duration
+
+    results = []
+    for roi_idx, detection in enumerate(detections):
+        result = {
+            'processed': detection['processed'],   # ROI 영역이 비어 있으면 False
+            'person_present': bool(present[roi_idx]),
+            'drowsy': False,
+            'head_angle': None,        # 머리 숙임 판단에 사용한 각도 (평활화 사용 시 평활화 값)
+            'raw_head_angle': None,    # 이번 프레임 랜드마크로 계산한 각도
+            'head_direction': None,
+            'eye_aspect_ratio': None,  # 양쪽 눈 평균 종횡비 (Face Mesh 랜드마크가 없으면 None)
+            'perclos': None,           # 최근 눈 감은 시간 비율 (표본이 부족하면 None)
+            'face_landmarks': detection['face_landmarks'],
+            'pose_landmarks': detection['pose_landmarks'],
+        }
+        results.append(result)
+        if not result['processed']:
+            continue
+
+        if eyes is not None:
+            if not np.isnan(ears[roi_idx]):
+                result['eye_aspect_ratio'] = float(ears[roi_idx])
+            if not np.isnan(perclos[roi_idx]):
+                result['perclos'] = float(perclos[roi_idx])
+
+        if has_pose[roi_idx]:
+            result['raw_head_angle'] = float(head_angles[roi_idx])
+            result['head_angle'] = head_angle = float(pitch[roi_idx])
+            result['head_direction'], result['drowsy'] = head_direction(head_angle, durations[roi_idx])
+        if result['person_present'] and (result['perclos'] or 0.0) >= PERCLOS_DROWSY_THRESHOLD:
+            result['drowsy'] = True  # 눈 감김으로 졸음 판단
+
+    # 자리를 비운 ROI는 이전 사람의 값이 섞이지 않도록 평활화/눈 감김 기록 초기화
+    absent = np.flatnonzero(processed & ~present)
+    if len(absent):
+        if smoother is not None:
+            smoother.reset(absent)
+        if eyes is not None:
+            eyes.reset(absent)
+    return results
+
+def resize_to_target(frame, target_height=TARGET_FRAME_HEIGHT):
+    """프레임을 목표 높이에 맞춰 비율 유지 리사이즈"""
+    h, w = frame.shape[:2]
+    target_width = int(w * (target_height / h))
+    return cv.resize(frame, (target_width, target_height))
+
+#-------------------------------------------
+# 처리 클래스
+#-------------------------------------------
+
+class QuadrantProcessor:
+    """ROI별 MediaPipe 처리기
+
+    Args:
+        quadrant_id: ROI 번호
+        cascade: 감지 단계 설정 (CASCADE_OFF / CASCADE_FACE_MESH / CASCADE_FACE_DETECTION)
+        pose_config: Pose 모델 설정 (None이면 DEFAULT_POSE_CONFIG)
+    """
+    def __init__(self, quadrant_id, cascade=CASCADE_OFF, pose_config=None):
+        if cascade not in CASCADE_MODES:
+            raise ValueError(f"Unknown cascade mode: {cascade}")
+        self.quadrant_id = quadrant_id
+        self.cascade = cascade
+        self.face_mesh = None
+        self.face_detection = None
+        if cascade == CASCADE_FACE_DETECTION:
+            self.face_detection = mp.solutions.face_detection.FaceDetection(
+                model_selection=0,
+                min_detection_confidence=MIN_DETECTION_CONFIDENCE
+            )
+        else:
+            self.face_mesh = mp.solutions.face_mesh.FaceMesh(
+                max_num_faces=1,
+                refine_landmarks=True,
+                min_detection_confidence=MIN_DETECTION_CONFIDENCE,
+                min_tracking_confidence=MIN_TRACKING_CONFIDENCE,
+                static_image_mode=False
+            )
+        self.pose_config = dict(DEFAULT_POSE_CONFIG, **(pose_config or {}))
+        self.pose = create_pose(self.pose_config)
+        self.mp_drawing = mp.solutions.drawing_utils
+        self.mp_pose = mp.solutions.pose
+        self.head_down_duration = 0
+
+    def detect(self, roi_frame):
+        """ROI 영상에 Pose와 얼굴 모델 적용
+
+        cascade가 켜져 있으면 Pose가 사람을 충분히 찾지 못했을 때만 얼굴 모델을 실행합니다.
+
+        Returns:
+            dict: 감지 결과 (EMPTY_DETECTION 참고)
+        """
+        start = time.perf_counter()
+        rgb_roi = cv.cvtColor(roi_frame, cv.COLOR_BGR2RGB)
+        rgb_roi.flags.writeable = False
+        stage_times = {}
+        detection = dict(EMPTY_DETECTION, processed=True, pose_ran=True, stage_times=stage_times)
+        pose_start = time.perf_counter()
+        stage_times['cvtColor'] = pose_start - start
+
+        pose_results = self.pose.process(rgb_roi)
+        if pose_results.pose_landmarks:
+            detection['pose_landmarks'] = pose_results.pose_landmarks
+        face_start = time.perf_counter()
+        stage_times['pose.process'] = face_start - pose_start
+
+        if self.cascade == CASCADE_OFF or not pose_is_sufficient(detection['pose_landmarks']):
+            detection['face_ran'] = True
+            if self.face_mesh is not None:
+                face_results = self.face_mesh.process(rgb_roi)
+                if face_results.multi_face_landmarks:
+                    detection['face_landmarks'] = face_results.multi_face_landmarks[0]
+                    detection['face_detected'] = True
+                stage = 'face_mesh.process'
+            else:
+                face_results = self.face_detection.process(rgb_roi)
+                detection['face_detected'] = bool(face_results.detections)
+                stage = 'face_detection.process'
+            stage_times[stage] = time.perf_counter() - face_start
+        detection['latency'] = time.perf_counter() - start
+        return detection
+
+    def set_pose_config(self, pose_config):
+        """Pose 모델 설정 변경 (새 모델을 만든 뒤 교체, 생성에 실패하면 기존 모델 유지하고 예외 전달)"""
+        config = dict(self.pose_config, **pose_config)
+        if config == self.pose_config:
+            return
+        pose = create_pose(config)
+        self.pose.close()
+        self.pose = pose
+        self.pose_config = config
+
+    def close(self):
+        """MediaPipe 리소스 해제"""
+        if self.face_mesh is not None:
+            self.face_mesh.close()
+        if self.face_detection is not None:
+            self.face_detection.close()
+        self.pose.close()
+
+
+class PerRoiDetector:
+    """ROI마다 QuadrantProcessor를 두는 기본 감지기
+
+    ShardedInferencePool, SharedFrameDetector와 같은 detect()/close() 인터페이스를 제공합니다.
+    """
+    def __init__(self, rois, cascade=CASCADE_OFF, pose_config=None):
+        self.rois = rois
+        self.processors = [QuadrantProcessor(i, cascade, pose_config) for i in range(len(rois))]
+
+    def detect(self, frame, active=None):
+        """프레임의 모든 ROI 감지 (ROI 순서대로 결과 반환)"""
+        return detect_rois(frame, self.rois, self.processors, active)
+
+    def set_pose_config(self, roi_idx, pose_config):
+        """ROI의 Pose 모델 설정 변경"""
+        self.processors[roi_idx].set_pose_config(pose_config)
+
+    def close(self):
+        for processor in self.processors:
+            processor.close()
+        self.processors = []
@@ -0,0 +1,378 @@
+"""
+ROI 상태 이벤트 저장소
+- ROI별 상태 전환(부재/정상/주의/졸음)과 주기적인 머리 각도 표본을 추가 전용으로 기록
+- 미리 할당한 열(column)별 NumPy 버퍼에 모았다가 블록 단위로 파일에 기록
+- 블록마다 시간 범위와 ROI 범위를 담은 작은 색인을 두어, 조회 시 해당 블록만 읽음 (memmap)
+- 여러 실행(수업)의 기록을 같은 폴더에 이어서 저장
+
+파일 구성:
+    meta.json    열 이름/형식, 상태 이름
+    events.bin   블록 데이터 (블록 안에서는 열마다 연속 저장)
+    events.idx   블록 색인 (INDEX_DTYPE 레코드)
+
+사용 예:
+    python event_log.py output/events --roi 4 --state 졸음 --days 7
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from detection import STATE_ABSENT, STATE_NORMAL, STATE_WARNING, STATE_DROWSY
+
+ABSENT_NAME = "부재"   # 부재 상태의 표시/조회용 이름 (STATE_ABSENT는 빈 문자열)
+STATE_NAMES = [ABSENT_NAME, STATE_NORMAL, STATE_WARNING, STATE_DROWSY]   # 상태 코드 순서
+STATE_CODES = {None: 0, STATE_ABSENT: 0, ABSENT_NAME: 0, STATE_NORMAL: 1, STATE_WARNING: 2, STATE_DROWSY: 3}
+STATE_UNKNOWN = 255    # 기록 종료 레코드의 상태 코드 (다음 기록까지 상태를 알 수 없음)
+
+# 이벤트 종류
+EVENT_TRANSITION = 1   # 상태 전환
+EVENT_SAMPLE = 2       # 주기적 표본 (현재 상태와 머리 각도)
+EVENT_END = 3          # 기록 종료 (이후 상태는 알 수 없음)
+
+COLUMNS = [
+    ("time", "<f8"),        # 시각 (Unix 시간, 초)
+    ("roi", "<u2"),         # ROI 번호 (0부터)
+    ("kind", "u1"),         # 이벤트 종류
+    ("state", "u1"),        # 상태 코드 (STATE_NAMES 순서, 종료 레코드는 STATE_UNKNOWN)
+    ("prev_state", "u1"),   # 직전 상태 코드
+    ("head_angle", "<f4"),  # 머리 각도 (없으면 NaN)
+    ("duration", "<f4"),    # 머리 숙임 지속 시간 (초)
+    ("perclos", "<f4"),     # 눈 감김 비율 (없으면 NaN)
+]
+
+INDEX_DTYPE = np.dtype([
+    ("offset", "<u8"),      # events.bin 안의 블록 시작 위치
+    ("count", "<u4"),       # 블록의 레코드 수
+    ("time_min", "<f8"),
+    ("time_max", "<f8"),
+    ("roi_min", "<u2"),
+    ("roi_max", "<u2"),
+    ("roi_mask", "<u8"),    # 블록에 포함된 ROI (번호 % 64 비트)
+])
+
+BLOCK_SIZE = 4096          # 블록당 최대 레코드 수
+SAMPLE_INTERVAL = 1.0      # 머리 각도 표본 기록 간격 (초)
+FLUSH_INTERVAL = 10.0      # 블록이 차지 않아도 파일에 기록하는 간격 (초)
+COLUMN_ALIGN = 8           # 블록 안 열 시작 위치 정렬 (바이트)
+
+DATA_FILE = "events.bin"
+INDEX_FILE = "events.idx"
+META_FILE = "meta.json"
+FORMAT_VERSION = 1
+
+
+def _column_layout(count):
+    """블록 안 열별 (이름, 형식, 시작 위치)와 블록 크기"""
+    layout = []
+    offset = 0
+    for name, dtype in COLUMNS:
+        dtype = np.dtype(dtype)
+        layout.append((name, dtype, offset))
+        offset += -(-count * dtype.itemsize // COLUMN_ALIGN) * COLUMN_ALIGN
+    return layout, offset
+
+def _roi_mask(rois):
+    return int(np.bitwise_or.reduce(np.left_shift(np.uint64(1), (rois % 64).astype(np.uint64))))
+
+def _check_meta(directory):
+    path = os.path.join(directory, META_FILE)
+    meta = {"version": FORMAT_VERSION, "columns": COLUMNS, "states": STATE_NAMES}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("version") != FORMAT_VERSION or [tuple(c) for c in saved.get("columns", [])] != COLUMNS:
+            raise ValueError(f"Event log format does not match: {directory}")
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+
+class EventLog:
+    """ROI 상태 이벤트 기록기
+
+    Args:
+        directory: 저장 폴더 (이미 기록이 있으면 이어서 저장)
+        num_rois: ROI 개수
+        sample_interval: 머리 각도 표본 기록 간격 (초, None이면 표본 없음)
+        block_size: 블록당 최대 레코드 수
+        flush_interval: 블록이 차지 않아도 파일에 기록하는 간격 (초)
+        time_offset: update()의 now에 더해 Unix 시간으로 만드는 값
+            (None이면 첫 update() 시점의 time.time() - now)
+    """
+    def __init__(self, directory, num_rois, sample_interval=SAMPLE_INTERVAL, block_size=BLOCK_SIZE,
+                 flush_interval=FLUSH_INTERVAL, time_offset=None):
+        os.makedirs(directory, exist_ok=True)
+        _check_meta(directory)
+        self.directory = directory
+        self.num_rois = num_rois
+        self.sample_interval = sample_interval
+        self.block_size = max(block_size, num_rois)
+        self.flush_interval = flush_interval
+        self.time_offset = time_offset
+
+        # 열별 버퍼 (미리 할당)
+        self.columns = {name: np.empty(self.block_size, dtype=dtype) for name, dtype in COLUMNS}
+        self.count = 0
+
+        # ROI별 마지막 상태 코드 (처음에는 알 수 없음이므로 첫 관측이 전환으로 기록됨)
+        self.states = np.full(num_rois, STATE_UNKNOWN, dtype=np.uint8)
+        self.last_sample = None
+        self.last_flush = None
+
+        # 통계
+        self.records = 0
+        self.blocks = 0
+
+    def update(self, now, states, head_angles, durations, perclos, observed=None):
+        """이번 프레임의 ROI별 상태 반영 (전환과 표본만 기록)
+
+        Args:
+            now: 현재 시각 (초, 처리 시계 기준)
+            states: ROI별 상태 (classify_roi_state() 결과, None이면 부재)
+            head_angles: ROI별 머리 각도 (없으면 None)
+            durations: ROI별 머리 숙임 지속 시간 (초)
+            perclos: ROI별 눈 감김 비율 (없으면 None)
+            observed: 이번 프레임에 관측한 ROI (None이면 모두), 관측하지 않은 ROI는 기록하지 않음
+        """
+        if self.time_offset is None:
+            self.time_offset = time.time() - now
+        if self.last_flush is None:
+            self.last_flush = now
+        timestamp = now + self.time_offset
+
+        codes = np.fromiter((STATE_CODES[state] for state in states), dtype=np.uint8, count=self.num_rois)
+        angles = np.array([np.nan if angle is None else angle for angle in head_angles], dtype=np.float32)
+        durations = np.asarray(durations, dtype=np.float32)
+        perclos = np.array([np.nan if value is None else value for value in perclos], dtype=np.float32)
+        observed = np.ones(self.num_rois, dtype=bool) if observed is None else np.asarray(observed, dtype=bool)
+
+        changed = np.flatnonzero(observed & (codes != self.states))
+        if len(changed):
+            self._append(timestamp, changed, EVENT_TRANSITION, codes[changed], self.states[changed],
+                         angles[changed], durations[changed], perclos[changed])
+            self.states[changed] = codes[changed]
+
+        if self.sample_interval is not None and (
+                self.last_sample is None or now - self.last_sample >= self.sample_interval):
+            self.last_sample = now
+            rois = np.flatnonzero(observed)
+            self._append(timestamp, rois, EVENT_SAMPLE, codes[rois], self.states[rois],
+                         angles[rois], durations[rois], perclos[rois])
+
+        if now - self.last_flush >= self.flush_interval:
+            self.flush()
+            self.last_flush = now
+
+    def _append(self, timestamp, rois, kind, states, prev_states, angles, durations, perclos):
+        n = len(rois)
+        if not n:
+            return
+        if self.count + n > self.block_size:
+            self.flush()
+        start, end = self.count, self.count + n
+        columns = self.columns
+        columns["time"][start:end] = timestamp
+        columns["roi"][start:end] = rois
+        columns["kind"][start:end] = kind
+        columns["state"][start:end] = states
+        columns["prev_state"][start:end] = prev_states
+        columns["head_angle"][start:end] = angles
+        columns["duration"][start:end] = durations
+        columns["perclos"][start:end] = perclos
+        self.count = end
+        self.records += n
+
+    def flush(self):
+        """버퍼의 레코드를 블록 하나로 기록 (데이터를 먼저 쓰고 색인 추가)"""
+        count = self.count
+        if not count:
+            return
+        layout, block_bytes = _column_layout(count)
+        block = bytearray(block_bytes)
+        for name, dtype, offset in layout:
+            data = self.columns[name][:count].tobytes()
+            block[offset:offset + len(data)] = data
+
+        rois = self.columns["roi"][:count]
+        times = self.columns["time"][:count]
+        entry = np.zeros(1, dtype=INDEX_DTYPE)
+        entry["count"] = count
+        entry["time_min"] = times.min()
+        entry["time_max"] = times.max()
+        entry["roi_min"] = rois.min()
+        entry["roi_max"] = rois.max()
+        entry["roi_mask"] = _roi_mask(rois)
+
+        with open(os.path.join(self.directory, DATA_FILE), "ab") as f:
+            entry["offset"] = f.tell()
+            f.write(block)
+        with open(os.path.join(self.directory, INDEX_FILE), "ab") as f:
+            f.write(entry.tobytes())
+        self.count = 0
+        self.blocks += 1
+
+    def close(self, now=None):
+        """종료 레코드를 추가하고 남은 레코드 기록"""
+        if self.time_offset is not None:
+            timestamp = time.time() if now is None else now + self.time_offset
+            rois = np.arange(self.num_rois)
+            nan = np.full(self.num_rois, np.nan, dtype=np.float32)
+            self._append(timestamp, rois, EVENT_END, np.full(self.num_rois, STATE_UNKNOWN, dtype=np.uint8), self.states,
+                         nan, np.zeros(self.num_rois, dtype=np.float32), nan)
+        self.flush()
+
+    def stats(self):
+        return {"records": self.records, "blocks": self.blocks}
+
+
+class EventStore:
+    """기록된 이벤트 조회
+
+    Args:
+        directory: EventLog 저장 폴더
+    """
+    def __init__(self, directory):
+        if not os.path.exists(os.path.join(directory, META_FILE)):
+            raise IOError(f"Event log not found: {directory}")
+        _check_meta(directory)
+        self.directory = directory
+        index_path = os.path.join(directory, INDEX_FILE)
+        self.index = np.fromfile(index_path, dtype=INDEX_DTYPE) if os.path.exists(index_path) else \
+            np.zeros(0, dtype=INDEX_DTYPE)
+        data_path = os.path.join(directory, DATA_FILE)
+        self.data = np.memmap(data_path, dtype=np.uint8, mode="r") if len(self.index) else None
+
+    def blocks(self, start=None, end=None, roi=None):
+        """조건에 맞는 레코드가 있을 수 있는 블록 색인"""
+        index = self.index
+        selected = np.ones(len(index), dtype=bool)
+        if start is not None:
+            selected &= index["time_max"] >= start
+        if end is not None:
+            selected &= index["time_min"] <= end
+        if roi is not None:
+            selected &= (index["roi_min"] <= roi) & (index["roi_max"] >= roi)
+            selected &= (index["roi_mask"] & np.uint64(1 << (roi % 64))) != 0
+        return index[selected]
+
+    def _read_block(self, entry, columns):
+        layout, _ = _column_layout(int(entry["count"]))
+        block_start = int(entry["offset"])
+        return {
+            name: np.frombuffer(self.data, dtype=dtype, count=int(entry["count"]), offset=block_start + offset)
+            for name, dtype, offset in layout if name in columns
+        }
+
+    def query(self, start=None, end=None, roi=None, kinds=None, columns=None):
+        """조건에 맞는 레코드를 열별 배열로 반환 (시간순)
+
+        Args:
+            start, end: 시간 범위 (Unix 시간, None이면 제한 없음)
+            roi: ROI 번호 (0부터, None이면 모두)
+            kinds: 이벤트 종류 목록 (None이면 모두)
+            columns: 읽을 열 이름 목록 (None이면 모두)
+        """
+        columns = [name for name, _ in COLUMNS] if columns is None else list(columns)
+        needed = set(columns) | {"time", "roi", "kind"}
+        parts = {name: [] for name in columns}
+        for entry in self.blocks(start, end, roi):
+            block = self._read_block(entry, needed)
+            mask = np.ones(int(entry["count"]), dtype=bool)
+            if start is not None:
+                mask &= block["time"] >= start
+            if end is not None:
+                mask &= block["time"] <= end
+            if roi is not None:
+                mask &= block["roi"] == roi
+            if kinds is not None:
+                mask &= np.isin(block["kind"], kinds)
+            for name in columns:
+                parts[name].append(block[name][mask])
+
+        result = {
+            name: np.concatenate(arrays) if arrays else np.zeros(0, dtype=dict(COLUMNS)[name])
+            for name, arrays in parts.items()
+        }
+        if "time" in result and len(result["time"]):
+            order = np.argsort(result["time"], kind="stable")
+            result = {name: values[order] for name, values in result.items()}
+        return result
+
+    def intervals(self, roi, state, start=None, end=None):
+        """ROI가 해당 상태였던 구간 목록
+
+        구간은 조회 범위로 잘리며, 기록이 끝날 때까지 이어진 구간은 마지막으로 관측된 시각에서 끝납니다.
+        종료 레코드에서 열린 구간을 닫고, 다음 실행의 첫 레코드까지(기록이 없는 동안)는 어느 상태로도 보지 않습니다.
+
+        Args:
+            roi: ROI 번호 (0부터)
+            state: 상태 이름 (STATE_NAMES)
+            start, end: 시간 범위 (Unix 시간)
+
+        Returns:
+            list: [(시작 시각, 끝 시각), ...]
+        """
+        target = STATE_CODES[state]
+        records = self.query(start, end, roi, columns=["time", "kind", "state", "prev_state"])
+        intervals = []
+        if not len(records["time"]):
+            return intervals
+
+        # 종료 레코드는 상태 코드와 관계없이 알 수 없음으로 처리 (이전 형식은 부재 코드로 기록)
+        codes = np.where(records["kind"] == EVENT_END, STATE_UNKNOWN, records["state"])
+
+        # 조회 범위 시작 시점의 상태 (첫 레코드가 전환이면 직전 상태가 범위 시작부터 이어진 것으로 봄)
+        began = records["time"][0]
+        if records["kind"][0] == EVENT_TRANSITION:
+            current = records["prev_state"][0]
+            if start is not None:
+                began = start
+        else:
+            current = codes[0]
+
+        for timestamp, code in zip(records["time"], codes):
+            if code == target and current != target:
+                began = timestamp
+            elif code != target and current == target:
+                intervals.append((float(began), float(timestamp)))
+            current = code
+        if current == target:
+            # 조회 범위 뒤에도 기록이 있으면 범위 끝까지, 아니면 마지막 관측 시각까지
+            ended = records["time"][-1]
+            if end is not None and len(self.blocks(start=end, roi=roi)):
+                ended = end
+            intervals.append((float(began), float(ended)))
+        return intervals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ROI 상태 이벤트 기록에서 상태 구간 조회")
+    parser.add_argument("directory", help="이벤트 기록 폴더")
+    parser.add_argument("--roi", type=int, required=True, help="ROI(좌석) 번호 (1부터)")
+    parser.add_argument("--state", choices=STATE_NAMES, default=STATE_DROWSY, help="조회할 상태")
+    parser.add_argument("--days", type=float, default=None, help="최근 N일만 조회 (기본: 전체)")
+    args = parser.parse_args(argv)
+
+    try:
+        store = EventStore(args.directory)
+    except (IOError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    start = time.time() - args.days * 86400 if args.days else None
+    intervals = store.intervals(args.roi - 1, args.state, start)
+    total = 0.0
+    for began, ended in intervals:
+        total += ended - began
+        print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(began))} ~ "
+              f"{time.strftime('%H:%M:%S', time.localtime(ended))} ({ended - began:.1f}초)")
+    print(f"ROI {args.roi} {args.state}: {len(intervals)}회, 총 {total:.1f}초")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+눈 감김(EAR / PERCLOS) 판단
+- 이미 실행 중인 Face Mesh 랜드마크에서 모든 ROI의 눈 윤곽점을 한 번에 모아 눈 종횡비(EAR) 계산
+- 사람마다 다른 눈 모양과 카메라 각도를 고려하여 ROI별 뜬 눈 기준값 대비 비율로 감김 판단 (BLINK_THRESHOLD)
+- 최근 PERCLOS_WINDOW초 동안 눈을 감은 비율(PERCLOS)을 ROI별 고정 크기 시간 구간 배열로 관리
+- 관측한 시간 칸이 PERCLOS_MIN_COVERAGE초 이상일 때만 PERCLOS를 판단에 사용 (프레임 수가 아닌 시간 기준)
+"""
+
+import numpy as np
+
+from detection import (
+    LEFT_EYE_POINTS, RIGHT_EYE_POINTS, BLINK_THRESHOLD, LANDMARK_X, LANDMARK_Y, landmarks_to_array
+)
+
+PERCLOS_WINDOW = 60.0       # PERCLOS 계산 구간 (초)
+PERCLOS_BINS = 60           # 구간을 나누는 시간 칸 수 (칸마다 감은/전체 프레임 수만 보관)
+PERCLOS_MIN_COVERAGE = 20.0  # PERCLOS를 판단에 사용하기 위한 최소 관측 시간 (관측이 있는 시간 칸 합계, 초)
+
+EAR_BASELINE_RISE = 0.1     # 뜬 눈 기준값이 큰 EAR을 따라가는 비율
+EAR_BASELINE_FALL = 0.002   # 뜬 눈 기준값이 작은 EAR을 따라가는 비율 (눈을 감아도 천천히만 내려감)
+
+# 눈 윤곽점 순서: [끝점, 위 3개, 반대쪽 끝점, 아래 3개 (역순)]
+EYE_INDICES = LEFT_EYE_POINTS + RIGHT_EYE_POINTS
+EYE_CORNERS = (0, 4)
+EYE_UPPER = [1, 2, 3]
+EYE_LOWER = [7, 6, 5]
+
+
+def eye_aspect_ratios(eye_array, aspects):
+    """모든 ROI의 양쪽 눈 평균 종횡비 계산
+
+    Args:
+        eye_array: (ROI 수, 16, 4) 배열, 랜드마크 순서는 EYE_INDICES
+        aspects: ROI별 가로/세로 비율 (정규화 좌표를 실제 비율로 맞추는 데 사용)
+
+    Returns:
+        np.ndarray: ROI별 EAR (랜드마크가 없으면 NaN)
+    """
+    points = eye_array[:, :, [LANDMARK_X, LANDMARK_Y]].reshape(len(eye_array), 2, 8, 2)
+    points = points * np.stack([aspects, np.ones_like(aspects)], axis=-1)[:, None, None, :]
+
+    vertical = np.linalg.norm(points[:, :, EYE_UPPER] - points[:, :, EYE_LOWER], axis=-1).mean(axis=-1)
+    horizontal = np.linalg.norm(points[:, :, EYE_CORNERS[0]] - points[:, :, EYE_CORNERS[1]], axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = vertical / horizontal
+    ratios[~np.isfinite(ratios)] = np.nan
+    return ratios.mean(axis=1)
+
+
+class EyeClosureEngine:
+    """ROI별 눈 감김 여부와 PERCLOS 계산
+
+    Args:
+        rois: [((x1, y1, x2, y2), name), ...] 형태의 ROI 목록
+        window: PERCLOS 계산 구간 (초)
+        bins: 구간을 나누는 시간 칸 수
+    """
+    def __init__(self, rois, window=PERCLOS_WINDOW, bins=PERCLOS_BINS):
+        num_rois = len(rois)
+        self.aspects = np.array([
+            (x2 - x1) / (y2 - y1) if y2 > y1 else 1.0 for (x1, y1, x2, y2), _ in rois
+        ], dtype=float)
+        self.bins = bins
+        self.bin_width = window / bins
+
+        self.baseline = np.full(num_rois, np.nan)              # 뜬 눈 EAR 기준값
+        self.closed_counts = np.zeros((num_rois, bins), dtype=np.int32)
+        self.total_counts = np.zeros((num_rois, bins), dtype=np.int32)
+        self.bin_epochs = np.full((num_rois, bins), -1, dtype=np.int64)  # 칸이 나타내는 시간 번호
+
+        self.ear = np.full(num_rois, np.nan)
+        self.closed = np.zeros(num_rois, dtype=bool)
+        self.perclos = np.full(num_rois, np.nan)
+
+    def update(self, face_lists, now, fresh=None):
+        """이번 프레임의 Face Mesh 랜드마크로 EAR, 감김 여부, PERCLOS 갱신
+
+        Args:
+            face_lists: ROI별 Face Mesh 랜드마크 (없으면 None)
+            now: 현재 시각 (초)
+            fresh: ROI별 새 추론 결과 여부 (False인 ROI는 EAR만 계산하고 기준값과 감김 표본은 갱신하지 않음,
+                None이면 모두 새 결과)
+
+        Returns:
+            tuple: (EAR 배열, PERCLOS 배열), 관측이 없는 ROI의 EAR과 표본이 부족한 ROI의 PERCLOS는 NaN
+        """
+        if any(face_list is not None for face_list in face_lists):
+            self.ear = eye_aspect_ratios(landmarks_to_array(face_lists, EYE_INDICES), self.aspects)
+        else:
+            self.ear = np.full(len(face_lists), np.nan)
+        valid = ~np.isnan(self.ear)
+        rois = np.flatnonzero(valid if fresh is None else valid & fresh)
+
+        if len(rois):
+            ear = self.ear[rois]
+            # 기준값은 큰 EAR은 빠르게, 작은 EAR은 천천히 따라감
+            baseline = self.baseline[rois]
+            rate = np.where(ear > baseline, EAR_BASELINE_RISE, EAR_BASELINE_FALL)
+            baseline = np.where(np.isnan(baseline), ear, baseline + rate * (ear - baseline))
+            self.baseline[rois] = baseline
+            closed = ear < baseline * BLINK_THRESHOLD
+            self.closed[rois] = closed
+
+            # 현재 시간 칸이 오래된 기록이면 비우고 다시 셈
+            epoch = int(now // self.bin_width)
+            column = epoch % self.bins
+            stale = rois[self.bin_epochs[rois, column] != epoch]
+            self.closed_counts[stale, column] = 0
+            self.total_counts[stale, column] = 0
+            self.bin_epochs[stale, column] = epoch
+            self.total_counts[rois, column] += 1
+            self.closed_counts[rois, column] += closed
+        self.closed[~valid] = False
+
+        # 계산 구간 안의 칸만 합산
+        recent = self.bin_epochs > int(now // self.bin_width) - self.bins
+        totals = (self.total_counts * recent).sum(axis=1)
+        closed_totals = (self.closed_counts * recent).sum(axis=1)
+        coverage = ((self.total_counts > 0) & recent).sum(axis=1) * self.bin_width
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.perclos = np.where(coverage >= PERCLOS_MIN_COVERAGE, closed_totals / totals, np.nan)
+        return self.ear, self.perclos
+
+    def reset(self, rois):
+        """ROI의 기준값과 감김 기록 초기화 (사람이 자리를 비운 경우 등)"""
+        self.baseline[rois] = np.nan
+        self.closed_counts[rois] = 0
+        self.total_counts[rois] = 0
+        self.bin_epochs[rois] = -1
+        self.ear[rois] = np.nan
+        self.closed[rois] = False
+        self.perclos[rois] = np.nan
@@ -0,0 +1,445 @@
+"""
+헤드리스 일괄 처리 모드
+- GUI 없이 녹화된 영상을 최대 속도로 처리
+- 저장된 ROI 레이아웃(JSON/YAML) 사용
+- ROI별 결과를 CSV로, 전체 요약을 JSON으로 저장
+- 랜드마크 기록(--record-landmarks)과 기록 재생(--replay)으로 모델 없이 상태 판단만 다시 실행
+
+사용 예:
+    python headless.py video3.mp4 --rois rois.json --output results/
+    python headless.py --replay output/landmarks --output results/replay
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import cv2 as cv
+
+from capture import open_capture, BLOCK
+from detection import (
+    CASCADE_OFF, CASCADE_MODES,
+    resize_to_target, STATE_NORMAL, STATE_WARNING, STATE_DROWSY
+)
+from AngleBuffer import SMOOTH_MEAN, SMOOTHING_MODES
+from media_clock import MediaClock, PACE_FAST, PACING_MODES
+from inference import (
+    create_roi_detector, RoiInference, MODE_SEQUENTIAL, MODE_PROCESS_POOL, MODE_SHARED_FRAME
+)
+from pipeline import Pipeline
+from event_log import EventLog, ABSENT_NAME
+from landmark_replay import (
+    LandmarkRecorder, LandmarkRecording, ReplayDetector, DEFAULT_DTYPE, RECORD_DTYPES,
+    POINTS_MINIMAL, POINT_SETS
+)
+from profiler import PROFILER
+from roi_state import RoiStateStore, CODE_STATES
+import structured_log
+from roi_layout import load_roi_layout
+
+PIPELINE_QUEUE_SIZE = 4  # 디코딩 스레드가 미리 읽어 둘 최대 프레임 수
+
+# CSV 출력 컬럼
+RESULT_COLUMNS = [
+    "frame", "time_sec", "person_present", "head_angle",
+    "head_down_duration", "eye_aspect_ratio", "perclos", "state"
+]
+
+
+class ResultWriter:
+    """ROI별 결과 CSV 기록기"""
+    def __init__(self, output_dir, roi_names):
+        os.makedirs(output_dir, exist_ok=True)
+        self.files = []
+        self.writers = []
+        for name in roi_names:
+            f = open(os.path.join(output_dir, f"{name}.csv"), "w", newline="", encoding="utf-8")
+            writer = csv.writer(f)
+            writer.writerow(RESULT_COLUMNS)
+            self.files.append(f)
+            self.writers.append(writer)
+
+    def write(self, roi_idx, row):
+        self.writers[roi_idx].writerow(row)
+
+    def close(self):
+        for f in self.files:
+            f.close()
+
+
+class ResultCollector:
+    """프레임별 ROI 결과를 CSV, 상태별 누적 시간, 상태 기록(event_log)에 반영
+
+    Args:
+        output_dir: CSV 저장 폴더
+        roi_names: ROI 이름 목록
+        fps: 영상 FPS (처리한 프레임마다 1 / fps초를 상태별 시간에 더함)
+        events_dir: 상태 전환/머리 각도 표본 기록 폴더 (None이면 기록 안 함)
+    """
+    def __init__(self, output_dir, roi_names, fps, events_dir=None):
+        self.writer = ResultWriter(output_dir, roi_names)
+        self.event_log = EventLog(events_dir, len(roi_names)) if events_dir else None
+        self.roi_names = roi_names
+        self.frame_seconds = 1.0 / fps
+        self.observed = [False] * len(roi_names)
+        self.roi_states = [None] * len(roi_names)
+        self.last_time = None
+
+        # 상태별 누적 시간 (초)
+        self.state_seconds = [
+            {STATE_NORMAL: 0.0, STATE_WARNING: 0.0, STATE_DROWSY: 0.0, ABSENT_NAME: 0.0}
+            for _ in roi_names
+        ]
+
+    def add(self, frame_idx, now, results, states, seconds=None):
+        """프레임 결과 반영
+
+        Args:
+            states: 이번 프레임까지 반영된 ROI 상태 (RoiStateStore 또는 snapshot())
+            seconds: 상태별 시간에 더할 시간 (초, None이면 1 / fps, 프레임을 건너뛰며 처리할 때 사용)
+        """
+        self.last_time = now
+        seconds = self.frame_seconds if seconds is None else seconds
+        for roi_idx, result in enumerate(results):
+            self.observed[roi_idx] = result['processed']
+            if not result['processed']:
+                continue
+            person_detected = result['person_present']
+            head_angle = result['head_angle']
+            duration = float(states.head_down_duration[roi_idx])
+            perclos = result['perclos']
+            ear = result['eye_aspect_ratio']
+            state = CODE_STATES[states.state[roi_idx]]
+            self.roi_states[roi_idx] = state
+            self.state_seconds[roi_idx][state or ABSENT_NAME] += seconds
+            self.writer.write(roi_idx, [
+                frame_idx, f"{now:.3f}", int(person_detected),
+                "" if head_angle is None else f"{head_angle:.1f}",
+                f"{duration:.2f}",
+                "" if ear is None else f"{ear:.3f}",
+                "" if perclos is None else f"{perclos:.3f}",
+                state
+            ])
+        if self.event_log is not None:
+            self.event_log.update(
+                now, self.roi_states, [result['head_angle'] for result in results],
+                states.head_down_duration,
+                [result['perclos'] for result in results], self.observed
+            )
+
+    def state_summary(self):
+        return {
+            name: {state: round(sec, 2) for state, sec in self.state_seconds[i].items()}
+            for i, name in enumerate(self.roi_names)
+        }
+
+    def close(self):
+        self.writer.close()
+        if self.event_log is not None:
+            self.event_log.close(self.last_time)
+
+
+def run_headless(video_path, layout_path, output_dir, max_frames=None, workers=0,
+                 shared_frame=False, adaptive=False, cascade=CASCADE_OFF,
+                 latency_target_ms=None, motion_gate=False, pacing=PACE_FAST,
+                 smoothing=SMOOTH_MEAN, eye_closure=True, profile_dir=None, pose_complexity=None,
+                 events_dir=None, landmarks_dir=None, landmark_dtype=DEFAULT_DTYPE,
+                 landmark_points=POINTS_MINIMAL):
+    """영상을 GUI 없이 처리하고 결과를 저장
+
+    Args:
+        video_path: 입력 영상 경로
+        layout_path: ROI 레이아웃 파일 경로
+        output_dir: 결과 저장 폴더
+        max_frames: 처리할 최대 프레임 수 (None이면 끝까지)
+        workers: ROI 추론 작업 프로세스 수 (0이면 메인 프로세스에서 순차 처리)
+        shared_frame: True면 전체 프레임 공용 Face Mesh 감지기 사용
+        adaptive: True면 ROI 상태에 따라 추론 주기 조절
+        cascade: 감지 단계 설정 (detection.CASCADE_MODES)
+        latency_target_ms: 프레임당 추론 시간 목표 (ms), 지정하면 ROI별 Pose 복잡도 자동 조정
+        motion_gate: True면 변화가 없는 ROI는 추론을 생략하고 마지막 결과 재사용
+        pacing: 처리 속도 (media_clock.PACE_FAST: 최대 속도, PACE_REALTIME: 재생 속도)
+        smoothing: 머리 각도 평활화 방식 (AngleBuffer.SMOOTHING_MODES, None이면 사용 안 함)
+        eye_closure: True면 눈 감김 비율(PERCLOS)도 주의/졸음 판단에 사용
+        profile_dir: 단계별 지연 시간 CSV/JSON 스냅샷 저장 폴더 (None이면 요약에만 포함)
+        pose_complexity: Pose 모델 복잡도 (0/1/2, None이면 DEFAULT_POSE_CONFIG)
+        events_dir: ROI 상태 전환/머리 각도 표본 기록 폴더 (event_log, None이면 기록 안 함)
+        landmarks_dir: 프레임별 ROI 랜드마크 기록 폴더 (landmark_replay, None이면 기록 안 함)
+        landmark_dtype: 랜드마크 저장 형식 ("float16" / "float32")
+        landmark_points: 기록할 랜드마크 범위 (landmark_replay.POINT_SETS)
+
+    Returns:
+        dict: 처리 요약 정보
+    """
+    PROFILER.reset()
+    PROFILER.configure_snapshots(profile_dir)
+
+    # 디코딩은 캡처 스레드에서 진행 (파일이므로 프레임 손실 없는 BLOCK 정책)
+    cap = open_capture(video_path, queue_size=PIPELINE_QUEUE_SIZE, drop_policy=BLOCK)
+    if not cap.isOpened():
+        raise IOError(f"Could not open video file: {video_path}")
+
+    # 파일 메타데이터의 FPS가 없으면 30으로 가정
+    fps = cap.get(cv.CAP_PROP_FPS) or 30.0
+
+    ret, frame, frame_info = cap.read_frame()
+    if not ret:
+        cap.release()
+        raise IOError("Could not read first frame")
+
+    frame = resize_to_target(frame)
+    img_h, img_w = frame.shape[:2]
+    rois = load_roi_layout(layout_path, frame_size=(img_w, img_h))
+    roi_names = [name for _, name in rois]
+
+    if shared_frame:
+        mode = MODE_SHARED_FRAME
+    elif workers > 0:
+        mode = MODE_PROCESS_POOL
+    else:
+        mode = MODE_SEQUENTIAL
+    states = RoiStateStore(len(rois))
+    pose_config = None if pose_complexity is None else {'model_complexity': pose_complexity}
+    init_start = time.perf_counter()
+    detector = create_roi_detector(mode, rois, frame.shape, workers or None, cascade, pose_config)
+    init_seconds = time.perf_counter() - init_start
+    roi_inference = RoiInference(
+        detector, states, adaptive,
+        latency_target=latency_target_ms / 1000 if latency_target_ms else None,
+        motion_gate=motion_gate, smoothing=smoothing, eye_closure=eye_closure, pose_config=pose_config
+    )
+    collector = ResultCollector(output_dir, roi_names, fps, events_dir)
+    landmark_recorder = None
+    if landmarks_dir:
+        landmark_recorder = LandmarkRecorder(
+            landmarks_dir, rois, fps, (img_w, img_h), landmark_dtype, landmark_points, source=video_path
+        )
+
+    # 머리 숙임 시간은 처리 속도와 무관하게 영상 시간 기준으로 계산
+    clock = MediaClock(fps, pacing)
+
+    # 첫 프레임을 포함하여 프레임 번호와 영상 시각을 붙이는 디코딩 단계
+    pending = [(frame, frame_info)]
+
+    def decode_frame():
+        if pending:
+            frame, frame_info = pending.pop()
+        else:
+            start = time.perf_counter()
+            ret, frame, frame_info = cap.read_frame()
+            if not ret:
+                return None
+            resize_start = time.perf_counter()
+            frame = resize_to_target(frame)
+            PROFILER.record('cap.read', resize_start - start)
+            PROFILER.record('resize', time.perf_counter() - resize_start)
+        frame_idx = frame_info['index']
+        if max_frames is not None and frame_idx >= max_frames:
+            return None
+        return frame_idx, frame, clock.tick(frame_info)
+
+    pipeline = Pipeline(decode_frame, [], queue_size=PIPELINE_QUEUE_SIZE).start()
+
+    frames_processed = 0
+    start_time = time.perf_counter()
+    try:
+        while True:
+            item = pipeline.get()
+            if item is None:
+                break
+            frame_idx, frame, now = item
+            frames_processed += 1
+
+            start = time.perf_counter()
+            results = roi_inference.process(frame, now)
+            write_start = time.perf_counter()
+            PROFILER.record('process', write_start - start)
+
+            collector.add(frame_idx, now, results, states)
+            if landmark_recorder is not None:
+                landmark_recorder.write(now, roi_inference.last_detections)
+            PROFILER.record('write_results', time.perf_counter() - write_start)
+            PROFILER.tick_frame()
+            PROFILER.maybe_dump()
+    finally:
+        pipeline.stop()
+        cap.release()
+        collector.close()
+        if landmark_recorder is not None:
+            landmark_recorder.close()
+        roi_inference.close()
+
+    elapsed = time.perf_counter() - start_time
+    summary = {
+        "video": video_path,
+        "layout": layout_path,
+        "frames": frames_processed,
+        "video_seconds": round(frames_processed / fps, 3),
+        "elapsed_seconds": round(elapsed, 3),
+        "init_seconds": round(init_seconds, 3),
+        "processing_fps": round(frames_processed / elapsed, 2) if elapsed > 0 else 0.0,
+        "rois": collector.state_summary(),
+    }
+    if landmark_recorder is not None:
+        summary["landmarks"] = dict(directory=landmarks_dir, **landmark_recorder.stats())
+    summary["stage_latency"] = PROFILER.snapshot()["stages"]
+    if profile_dir:
+        PROFILER.dump(profile_dir)
+    summary["detection_stages"] = {
+        key: round(value, 3) for key, value in roi_inference.stage_stats().items()
+    }
+    if roi_inference.controller is not None:
+        summary["pose_complexity"] = dict(zip(roi_names, roi_inference.controller.current_levels()))
+        summary["pose_switches"] = roi_inference.controller.switch_log
+    skip_ratios = roi_inference.skip_ratios()
+    if skip_ratios is not None:
+        summary["skip_ratios"] = {name: round(ratio, 3) for name, ratio in zip(roi_names, skip_ratios)}
+    motion_skip_ratios = roi_inference.motion_skip_ratios()
+    if motion_skip_ratios is not None:
+        summary["motion_skip_ratios"] = {
+            name: round(ratio, 3) for name, ratio in zip(roi_names, motion_skip_ratios)
+        }
+    with open(os.path.join(output_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
+
+
+def run_replay(recording_dir, output_dir, max_frames=None, smoothing=SMOOTH_MEAN, eye_closure=True,
+               events_dir=None):
+    """기록된 랜드마크로 상태 판단만 다시 실행하고 결과 저장 (MediaPipe와 영상 디코딩 없음)
+
+    현재 detection.py의 임계값이 적용되므로, 임계값을 바꾼 뒤 영상 처리 없이 결과를 다시 확인할 수 있습니다.
+
+    Args:
+        recording_dir: 랜드마크 기록 폴더 (run_headless의 landmarks_dir)
+        output_dir: 결과 저장 폴더 (run_headless와 같은 CSV/summary.json 형식)
+        max_frames: 처리할 최대 프레임 수 (None이면 끝까지)
+        smoothing: 머리 각도 평활화 방식 (AngleBuffer.SMOOTHING_MODES, None이면 사용 안 함)
+        eye_closure: True면 눈 감김 비율(PERCLOS)도 주의/졸음 판단에 사용
+        events_dir: ROI 상태 전환/머리 각도 표본 기록 폴더 (None이면 기록 안 함)
+
+    Returns:
+        dict: 처리 요약 정보
+    """
+    PROFILER.reset()
+    recording = LandmarkRecording(recording_dir)
+    num_frames = len(recording) if max_frames is None else min(max_frames, len(recording))
+    rois = recording.rois
+    roi_names = [name for _, name in rois]
+
+    states = RoiStateStore(len(rois))
+    roi_inference = RoiInference(
+        ReplayDetector(recording), states, smoothing=smoothing, eye_closure=eye_closure
+    )
+    collector = ResultCollector(output_dir, roi_names, recording.fps, events_dir)
+
+    start_time = time.perf_counter()
+    try:
+        for frame_idx in range(num_frames):
+            now = float(recording.times[frame_idx])
+            start = time.perf_counter()
+            results = roi_inference.process(None, now)
+            write_start = time.perf_counter()
+            PROFILER.record('process', write_start - start)
+            collector.add(frame_idx, now, results, states)
+            PROFILER.record('write_results', time.perf_counter() - write_start)
+            PROFILER.tick_frame()
+    finally:
+        collector.close()
+        roi_inference.close()
+
+    elapsed = time.perf_counter() - start_time
+    summary = {
+        "recording": recording_dir,
+        "video": recording.meta.get("source"),
+        "frames": num_frames,
+        "video_seconds": round(num_frames / recording.fps, 3),
+        "elapsed_seconds": round(elapsed, 3),
+        "processing_fps": round(num_frames / elapsed, 2) if elapsed > 0 else 0.0,
+        "rois": collector.state_summary(),
+        "stage_latency": PROFILER.snapshot()["stages"],
+    }
+    with open(os.path.join(output_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="GUI 없이 녹화 영상의 졸음 상태를 일괄 분석합니다.")
+    parser.add_argument("video", nargs="?", help="입력 영상 경로 (--replay를 사용하면 생략)")
+    parser.add_argument("--rois", default=None, help="ROI 레이아웃 파일 (.json / .yaml)")
+    parser.add_argument("--output", default="output/headless", help="결과 저장 폴더")
+    parser.add_argument("--max-frames", type=int, default=None, help="처리할 최대 프레임 수")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="ROI 추론 작업 프로세스 수 (0: 메인 프로세스에서 순차 처리)")
+    parser.add_argument("--shared-frame", action="store_true",
+                        help="전체 프레임에 다중 얼굴 Face Mesh를 한 번만 실행")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="ROI 상태에 따라 추론 주기 조절 (정상/빈 자리는 낮은 주기)")
+    parser.add_argument("--latency-target-ms", type=float, default=None,
+                        help="프레임당 추론 시간 목표 (ms), 지정하면 ROI별 Pose 복잡도 자동 조정")
+    parser.add_argument("--motion-gate", action="store_true",
+                        help="변화가 없는 ROI는 추론을 생략하고 마지막 결과 재사용")
+    parser.add_argument("--pacing", choices=PACING_MODES, default=PACE_FAST,
+                        help="fast: 최대 속도로 처리, realtime: 영상 재생 속도에 맞춰 처리")
+    parser.add_argument("--smoothing", choices=SMOOTHING_MODES + ("off",), default=SMOOTH_MEAN,
+                        help="머리 각도 평활화 방식 (off: 사용 안 함)")
+    parser.add_argument("--no-eye-closure", action="store_true",
+                        help="눈 감김 비율(PERCLOS)을 주의/졸음 판단에 사용하지 않음")
+    parser.add_argument("--pose-complexity", type=int, choices=(0, 1, 2), default=None,
+                        help="Pose 모델 복잡도 (기본: 2, 0/2 모델은 처음 사용할 때 내려받음)")
+    parser.add_argument("--events", default=None, metavar="DIR",
+                        help="ROI 상태 전환/머리 각도 표본 기록 폴더 (event_log.py로 조회)")
+    parser.add_argument("--record-landmarks", default=None, metavar="DIR",
+                        help="프레임별 ROI Pose/Face Mesh 랜드마크 기록 폴더 (--replay, landmark_replay.py에서 사용)")
+    parser.add_argument("--landmark-dtype", choices=RECORD_DTYPES, default=DEFAULT_DTYPE,
+                        help="랜드마크 저장 형식")
+    parser.add_argument("--landmark-points", choices=POINT_SETS, default=POINTS_MINIMAL,
+                        help="기록할 랜드마크 (minimal: 상태 판단에 필요한 점만, full: 전체)")
+    parser.add_argument("--replay", default=None, metavar="DIR",
+                        help="영상 대신 기록된 랜드마크로 상태 판단만 다시 실행")
+    parser.add_argument("--profile", default=None, metavar="DIR",
+                        help="단계별/ROI별 지연 시간 CSV/JSON 스냅샷 저장 폴더")
+    parser.add_argument("--log-level", choices=structured_log.LEVELS, default="info",
+                        help="로그 수준 (debug면 ROI별 머리 각도 계산 값 기록)")
+    parser.add_argument("--log-sample", type=int, default=1,
+                        help="디버그 로그를 이벤트별로 N개 중 1개만 기록")
+    parser.add_argument("--log-file", default=None, help="JSON Lines 로그 파일 경로 (기본: stderr)")
+    parser.add_argument("--cascade", choices=CASCADE_MODES, default=CASCADE_OFF,
+                        help="Pose를 먼저 실행하고 부족할 때만 얼굴 모델 실행 (off: 항상 둘 다 실행)")
+    args = parser.parse_args(argv)
+    if args.replay is None and (args.video is None or args.rois is None):
+        parser.error("--replay를 사용하지 않으면 영상 경로와 --rois가 필요합니다")
+    if args.shared_frame and args.cascade != CASCADE_OFF:
+        parser.error("--shared-frame은 얼굴을 전체 프레임에서 먼저 찾으므로 --cascade와 함께 사용할 수 없습니다")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    structured_log.configure(args.log_level, args.log_sample, args.log_file)
+    smoothing = None if args.smoothing == "off" else args.smoothing
+    try:
+        if args.replay:
+            summary = run_replay(args.replay, args.output, args.max_frames, smoothing,
+                                 not args.no_eye_closure, args.events)
+        else:
+            summary = run_headless(args.video, args.rois, args.output, args.max_frames, args.workers,
+                                   args.shared_frame, args.adaptive, args.cascade,
+                                   args.latency_target_ms, args.motion_gate, args.pacing,
+                                   smoothing, not args.no_eye_closure, args.profile,
+                                   args.pose_complexity, args.events, args.record_landmarks,
+                                   args.landmark_dtype, args.landmark_points)
+    except (IOError, ValueError, RuntimeError) as e:
+        print(f"Error: {e}")
+        return 1
+    print(f"처리 완료: {summary['frames']} 프레임, {summary['processing_fps']} FPS")
+    print(f"결과 저장 위치: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+ROI 추론 실행 구성
+- 실행 방식(순차/프로세스 풀/전체 프레임 공용)에 맞는 감지기 생성
+- 프레임마다 감지 → 상태 갱신 과정을 GUI와 헤드리스 모드에서 공통으로 사용
+"""
+
+import time
+
+from AngleBuffer import SignalBuffer, SMOOTH_MEAN
+from detection import CASCADE_OFF, PerRoiDetector, analyze_detections
+from eye_closure import EyeClosureEngine
+from latency_controller import LatencyController
+from motion_gate import MotionGate
+from profiler import PROFILER
+from roi_state import RoiStateStore
+from pool_inference import ShardedInferencePool
+from scheduler import AdaptiveScheduler
+from shared_detector import SharedFrameDetector
+from structured_log import LOG
+
+# 추론 실행 방식
+MODE_SEQUENTIAL = "sequential"      # ROI마다 Face Mesh/Pose 순차 처리
+MODE_PROCESS_POOL = "process_pool"  # ROI 묶음을 작업 프로세스에 분산
+MODE_SHARED_FRAME = "shared_frame"  # 전체 프레임 다중 얼굴 Face Mesh + 필요한 ROI에만 Pose
+
+INFERENCE_MODES = (MODE_SEQUENTIAL, MODE_PROCESS_POOL, MODE_SHARED_FRAME)
+
+
+def create_roi_detector(mode, rois, frame_shape, workers=None, cascade=CASCADE_OFF, pose_config=None):
+    """실행 방식에 맞는 감지기 생성
+
+    Args:
+        mode: 추론 실행 방식
+        rois: [((x1, y1, x2, y2), name), ...] 형태의 ROI 목록
+        frame_shape: 처리할 프레임 크기 (height, width, 3)
+        workers: process_pool 작업자 수 (None이면 CPU 코어 수에 맞춤)
+        cascade: ROI별 감지 단계 설정 (shared_frame 모드는 얼굴을 먼저 찾으므로 사용하지 않고 경고만 기록)
+        pose_config: 처음 사용할 Pose 모델 설정 (None이면 DEFAULT_POSE_CONFIG)
+    """
+    if mode == MODE_PROCESS_POOL:
+        return ShardedInferencePool(rois, frame_shape, workers, cascade, pose_config)
+    if mode == MODE_SHARED_FRAME:
+        if cascade != CASCADE_OFF:
+            LOG.warning("cascade_ignored", mode=mode, cascade=cascade)
+        return SharedFrameDetector(rois, pose_config=pose_config)
+    if mode == MODE_SEQUENTIAL:
+        return PerRoiDetector(rois, cascade, pose_config)
+    raise ValueError(f"Unknown inference mode: {mode}")
+
+
+class RoiInference:
+    """감지기와 ROI 상태를 묶어 프레임 단위로 처리
+
+    Args:
+        detector: detect(frame, active)/close()를 제공하는 감지기
+        states: ROI 상태 저장소 (roi_state.RoiStateStore, None이면 ROI 수에 맞게 생성)
+        adaptive: True면 상태 기반 추론 주기 조절 사용
+        rate_policy: 상태별 추론 주기 (Hz, scheduler.DEFAULT_RATE_POLICY 참고)
+        latency_target: 프레임당 추론 시간 목표 (초). 지정하면 ROI별 Pose 설정을 자동 조정
+        motion_gate: True면 변화가 없는 ROI는 추론을 생략하고 마지막 결과 재사용
+        smoothing: 머리 각도 등 ROI 신호 평활화 방식 (AngleBuffer.SMOOTHING_MODES, None이면 사용하지 않음)
+        eye_closure: True면 Face Mesh 랜드마크로 눈 감김 비율(PERCLOS)을 계산하여 주의/졸음 판단에 사용
+        pose_config: 감지기를 만들 때 사용한 Pose 설정 (지연 시간 제어기의 시작/최고 단계, None이면 기본 설정)
+    """
+    def __init__(self, detector, states=None, adaptive=False, rate_policy=None, latency_target=None,
+                 motion_gate=False, smoothing=SMOOTH_MEAN, eye_closure=True, pose_config=None):
+        self.detector = detector
+        self.rois = detector.rois
+        self.states = RoiStateStore(len(self.rois)) if states is None else states
+        self.scheduler = AdaptiveScheduler(len(self.rois), rate_policy) if adaptive else None
+        self.motion_gate = MotionGate(self.rois) if motion_gate else None
+        self.smoother = SignalBuffer(len(self.rois), mode=smoothing) if smoothing else None
+        self.eyes = EyeClosureEngine(self.rois) if eye_closure else None
+        self.controller = None
+        if latency_target:
+            self.controller = LatencyController(
+                len(self.rois), latency_target, (pose_config or {}).get('model_complexity')
+            )
+
+        self.last_detections = [None] * len(self.rois)
+
+        # 감지 단계별 실행/적중 횟수
+        self.stage_counts = {
+            'roi_frames': 0,   # 모델을 실행한 ROI-프레임 수
+            'pose_runs': 0,
+            'pose_hits': 0,    # Pose가 사람을 찾은 횟수
+            'face_runs': 0,
+            'face_hits': 0,    # 얼굴 모델이 얼굴을 찾은 횟수
+        }
+
+    def process(self, frame, now):
+        """프레임의 모든 ROI 감지 및 머리 숙임 상태 갱신
+
+        Returns:
+            list: ROI별 결과 딕셔너리 (detection.analyze_detections 참고)
+        """
+        active = self.scheduler.select(now) if self.scheduler is not None else None
+        if self.motion_gate is not None:
+            active = self.motion_gate.select(frame, now, active)
+        start = time.perf_counter()
+        if active is not None and not any(active):
+            detections = [None] * len(self.rois)  # 이번 프레임은 모든 ROI 생략
+        else:
+            detections = self.detector.detect(frame, active)
+        detect_time = time.perf_counter() - start
+        PROFILER.record('detect', detect_time)
+        for roi_idx, detection in enumerate(detections):
+            PROFILER.record_detection(roi_idx, detection)
+
+        self._count_stages(detections)
+        fresh_detections = detections
+        if self.motion_gate is not None:
+            detections = self.motion_gate.merge(detections)
+        if self.scheduler is not None:
+            detections = self.scheduler.merge(detections)
+        self.last_detections = detections   # 상태 판단에 사용한 감지 결과 (랜드마크 기록용)
+
+        analyze_start = time.perf_counter()
+        results = analyze_detections(detections, self.states, now, self.smoother, self.eyes)
+        PROFILER.record('analyze', time.perf_counter() - analyze_start)
+
+        if self.scheduler is not None:
+            self.scheduler.update(results, self.states)
+        if self.controller is not None:
+            changes = self.controller.update(detect_time, fresh_detections, results, self.states)
+            for roi_idx, pose_config in changes:
+                try:
+                    self.detector.set_pose_config(roi_idx, pose_config)
+                except (OSError, RuntimeError) as e:
+                    # 모델 파일을 내려받지 못한 경우 등: 기존 모델로 계속 처리
+                    self.controller.switch_failed(roi_idx, e)
+        return results
+
+    def _count_stages(self, detections):
+        counts = self.stage_counts
+        for detection in detections:
+            if detection is None or not detection['processed']:
+                continue
+            counts['roi_frames'] += 1
+            if detection['pose_ran']:
+                counts['pose_runs'] += 1
+                counts['pose_hits'] += detection['pose_landmarks'] is not None
+            if detection['face_ran']:
+                counts['face_runs'] += 1
+                counts['face_hits'] += detection['face_detected']
+
+    def stage_stats(self):
+        """감지 단계별 실행 비율과 적중률
+
+        Returns:
+            dict: pose_run_rate / face_run_rate (ROI-프레임 대비 실행 비율),
+                pose_hit_rate / face_hit_rate (실행 대비 감지 비율)
+        """
+        counts = self.stage_counts
+        total = counts['roi_frames']
+        return {
+            'roi_frames': total,
+            'pose_run_rate': counts['pose_runs'] / total if total else 0.0,
+            'pose_hit_rate': counts['pose_hits'] / counts['pose_runs'] if counts['pose_runs'] else 0.0,
+            'face_run_rate': counts['face_runs'] / total if total else 0.0,
+            'face_hit_rate': counts['face_hits'] / counts['face_runs'] if counts['face_runs'] else 0.0,
+        }
+
+    def skip_ratios(self):
+        """ROI별 추론 생략 비율 (주기 조절을 사용하지 않으면 None)"""
+        return self.scheduler.skip_ratios() if self.scheduler is not None else None
+
+    def motion_skip_ratios(self):
+        """ROI별 변화 없음으로 추론을 생략한 비율 (움직임 게이트를 사용하지 않으면 None)"""
+        return self.motion_gate.skip_ratios() if self.motion_gate is not None else None
+
+    def close(self):
+        self.detector.close()
@@ -0,0 +1,541 @@
+"""
+랜드마크 기록/재생
+- 프레임마다 ROI별 Pose/Face Mesh 랜드마크와 시각을 고정 크기 float16/float32 배열로 파일에 추가 기록
+- 기록은 memmap으로 바로 읽어, MediaPipe 없이 상태 판단(평활화, 머리 숙임 타이머, PERCLOS)과 UI에 다시 공급
+- 임계값 조정(HEAD_DOWN_ANGLE_THRESHOLD, HEAD_DOWN_WARNING_TIME, 가시성 기준, reference_diff)은
+  기록 전체를 배열 연산으로 한 번에 다시 판단하여 추론보다 수천 배 빠르게 비교
+
+파일 구성:
+    meta.json    ROI 목록, FPS, 배열 형식, 기록한 랜드마크 번호
+    times.bin    프레임 시각 (float64, 처리 시계 기준 초)
+    flags.bin    ROI별 처리/감지 여부 (uint8, FLAG_* 비트)
+    pose.bin     Pose 랜드마크 [프레임, ROI, 랜드마크, (x, y, z, visibility)]
+    face.bin     Face Mesh 랜드마크 [프레임, ROI, 랜드마크, (x, y, z, visibility)]
+
+사용 예:
+    python headless.py video3.mp4 --rois rois.json --record-landmarks output/landmarks
+    python headless.py --replay output/landmarks --output output/replay
+    python landmark_replay.py output/landmarks --angle 10 15 20 --warning-time 10 15 --output sweep.csv
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from AngleBuffer import SignalBuffer, SMOOTH_MEAN, SMOOTHING_MODES
+from detection import (
+    EMPTY_DETECTION, HEAD_POSE_INDICES, HEAD_DOWN_ANGLE_THRESHOLD, HEAD_DOWN_WARNING_TIME,
+    HEAD_DOWN_DROWSY_TIME, HEAD_ANGLE_VISIBILITY_THRESHOLD, HEAD_ANGLE_REFERENCE_DIFF,
+    STATE_NORMAL, STATE_WARNING, STATE_DROWSY, calculate_head_angles, landmarks_to_array
+)
+from event_log import ABSENT_NAME
+from eye_closure import EYE_INDICES, EyeClosureEngine
+from roi_state import CODE_DROWSY, classify_states
+from structured_log import LOG
+
+POSE_LANDMARK_COUNT = 33     # MediaPipe Pose 랜드마크 수
+FACE_LANDMARK_COUNT = 478    # refine_landmarks=True인 Face Mesh 랜드마크 수
+
+# 기록할 랜드마크 범위
+POINTS_MINIMAL = "minimal"   # 상태 판단에 필요한 점만 (머리/어깨 5개 + 눈 윤곽 16개)
+POINTS_FULL = "full"         # 전체 랜드마크 (재생 시 랜드마크 전체를 그릴 수 있음)
+POINT_SETS = (POINTS_MINIMAL, POINTS_FULL)
+
+RECORD_DTYPES = ("float16", "float32")
+DEFAULT_DTYPE = "float16"
+WRITE_BLOCK_FRAMES = 256     # 파일에 한 번에 기록하는 프레임 수
+
+# flags.bin 비트
+FLAG_PROCESSED = 1           # ROI를 처리함 (EMPTY_DETECTION이 아님)
+FLAG_FACE_DETECTED = 2       # 얼굴 감지됨
+FLAG_POSE = 4                # Pose 랜드마크 있음
+FLAG_FACE = 8                # Face Mesh 랜드마크 있음
+FLAG_REUSED = 16             # 추론을 생략하여 이전 감지 결과를 다시 사용함 (눈 감김 표본에서 제외)
+
+TIMES_FILE = "times.bin"
+FLAGS_FILE = "flags.bin"
+POSE_FILE = "pose.bin"
+FACE_FILE = "face.bin"
+META_FILE = "meta.json"
+FORMAT_VERSION = 1
+
+CODE_NAMES = [ABSENT_NAME, STATE_NORMAL, STATE_WARNING, STATE_DROWSY]   # 상태 코드별 요약 표시 이름
+
+
+def _point_indices(points):
+    """기록 범위별 (Pose 랜드마크 번호, Face Mesh 랜드마크 번호)"""
+    if points == POINTS_MINIMAL:
+        return list(HEAD_POSE_INDICES), list(EYE_INDICES)
+    if points == POINTS_FULL:
+        return list(range(POSE_LANDMARK_COUNT)), list(range(FACE_LANDMARK_COUNT))
+    raise ValueError(f"Unknown landmark point set: {points}")
+
+
+class LandmarkRecorder:
+    """프레임별 ROI 랜드마크 기록기
+
+    Args:
+        directory: 저장 폴더 (이미 기록이 있으면 덮어씀)
+        rois: [((x1, y1, x2, y2), name), ...] 형태의 ROI 목록
+        fps: 입력 영상 FPS
+        frame_size: ROI 좌표 기준 프레임 크기 (width, height)
+        dtype: 랜드마크 저장 형식 ("float16" / "float32")
+        points: 기록할 랜드마크 범위 (POINT_SETS)
+        block_frames: 파일에 한 번에 기록하는 프레임 수
+        source: 입력 영상 경로 (meta.json에 함께 기록)
+    """
+    def __init__(self, directory, rois, fps, frame_size=None, dtype=DEFAULT_DTYPE, points=POINTS_MINIMAL,
+                 block_frames=WRITE_BLOCK_FRAMES, source=None):
+        if dtype not in RECORD_DTYPES:
+            raise ValueError(f"Unknown landmark dtype: {dtype}")
+        self.pose_indices, self.face_indices = _point_indices(points)
+        self.directory = directory
+        self.num_rois = len(rois)
+        self.block_frames = max(1, block_frames)
+
+        os.makedirs(directory, exist_ok=True)
+        meta = {
+            "version": FORMAT_VERSION,
+            "rois": [{"name": name, "rect": [int(v) for v in roi]} for roi, name in rois],
+            "frame_size": [int(v) for v in frame_size] if frame_size else None,
+            "fps": float(fps),
+            "dtype": dtype,
+            "points": points,
+            "pose_indices": self.pose_indices,
+            "face_indices": self.face_indices,
+            "source": source,
+        }
+        with open(os.path.join(directory, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+        # 블록 버퍼 (미리 할당)
+        shape = (self.block_frames, self.num_rois)
+        self.times = np.empty(self.block_frames, dtype=np.float64)
+        self.flags = np.zeros(shape, dtype=np.uint8)
+        self.pose = np.empty(shape + (len(self.pose_indices), 4), dtype=dtype)
+        self.face = np.empty(shape + (len(self.face_indices), 4), dtype=dtype)
+        self.count = 0
+
+        # times.bin은 마지막에 기록하여 중간에 종료되어도 프레임 수가 다른 파일보다 크지 않게 함
+        self.files = [
+            open(os.path.join(directory, name), "wb")
+            for name in (FLAGS_FILE, POSE_FILE, FACE_FILE, TIMES_FILE)
+        ]
+
+        # 통계
+        self.frames = 0
+        self.bytes_written = 0
+
+    def write(self, now, detections):
+        """이번 프레임의 감지 결과 기록
+
+        Args:
+            now: 현재 시각 (초, 처리 시계 기준)
+            detections: ROI별 감지 결과 (RoiInference.last_detections, 없으면 None)
+        """
+        detections = [EMPTY_DETECTION if d is None else d for d in detections]
+        pose_lists = [d['pose_landmarks'] if d['processed'] else None for d in detections]
+        face_lists = [d['face_landmarks'] if d['processed'] else None for d in detections]
+
+        row = self.count
+        self.times[row] = now
+        self.flags[row] = [
+            d['processed'] * FLAG_PROCESSED | d['face_detected'] * FLAG_FACE_DETECTED
+            | (pose is not None) * FLAG_POSE | (face is not None) * FLAG_FACE | d['reused'] * FLAG_REUSED
+            for d, pose, face in zip(detections, pose_lists, face_lists)
+        ]
+        self.pose[row] = landmarks_to_array(pose_lists, self.pose_indices)
+        self.face[row] = landmarks_to_array(face_lists, self.face_indices)
+        self.count += 1
+        self.frames += 1
+        if self.count == self.block_frames:
+            self.flush()
+
+    def flush(self):
+        """버퍼의 프레임을 파일에 기록"""
+        if self.count == 0 or self.files is None:
+            return
+        for f, array in zip(self.files, (self.flags, self.pose, self.face, self.times)):
+            data = array[:self.count].tobytes()
+            f.write(data)
+            f.flush()
+            self.bytes_written += len(data)
+        self.count = 0
+
+    def close(self):
+        if self.files is None:
+            return
+        self.flush()
+        for f in self.files:
+            f.close()
+        self.files = None
+        LOG.info("landmarks_recorded", directory=self.directory, frames=self.frames, bytes=self.bytes_written)
+
+    def stats(self):
+        return {"frames": self.frames, "bytes": self.bytes_written}
+
+
+class LandmarkRecording:
+    """기록된 랜드마크 (memmap, 읽기 전용)
+
+    Attributes:
+        rois: [((x1, y1, x2, y2), name), ...] 형태의 ROI 목록
+        times: (프레임 수,) 시각
+        flags: (프레임 수, ROI 수) FLAG_* 비트
+        pose, face: (프레임 수, ROI 수, 기록한 랜드마크 수, 4) 배열
+    """
+    def __init__(self, directory):
+        path = os.path.join(directory, META_FILE)
+        if not os.path.exists(path):
+            raise IOError(f"Landmark recording not found: {directory}")
+        with open(path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Landmark recording format does not match: {directory}")
+
+        self.directory = directory
+        self.meta = meta
+        self.rois = [(tuple(roi["rect"]), roi["name"]) for roi in meta["rois"]]
+        self.fps = meta["fps"]
+        self.frame_size = tuple(meta["frame_size"]) if meta["frame_size"] else None
+        self.pose_indices = meta["pose_indices"]
+        self.face_indices = meta["face_indices"]
+        num_rois = len(self.rois)
+        dtype = np.dtype(meta["dtype"])
+
+        # 파일마다 완전히 기록된 프레임 수 중 가장 작은 값 사용
+        specs = [
+            (TIMES_FILE, np.float64, ()),
+            (FLAGS_FILE, np.uint8, (num_rois,)),
+            (POSE_FILE, dtype, (num_rois, len(self.pose_indices), 4)),
+            (FACE_FILE, dtype, (num_rois, len(self.face_indices), 4)),
+        ]
+        sizes = [
+            os.path.getsize(os.path.join(directory, name)) // (np.dtype(dt).itemsize * int(np.prod(shape)))
+            for name, dt, shape in specs
+        ]
+        self.num_frames = min(sizes)
+        self.times, self.flags, self.pose, self.face = [
+            np.memmap(os.path.join(directory, name), dtype=dt, mode="r", shape=(self.num_frames,) + shape)
+            if self.num_frames else np.empty((0,) + shape, dtype=dt)
+            for name, dt, shape in specs
+        ]
+
+        # 전체 번호 기준 배열에서 기록한 랜드마크 위치
+        self.pose_size = max(self.pose_indices, default=-1) + 1
+        self.face_size = max(self.face_indices, default=-1) + 1
+        self.head_positions = [self.pose_indices.index(i) for i in HEAD_POSE_INDICES]
+
+    def __len__(self):
+        return self.num_frames
+
+    def head_array(self, stop=None):
+        """모든 프레임의 머리/어깨 랜드마크 (calculate_head_angles 입력 형식)
+
+        Returns:
+            np.ndarray: (프레임 수, ROI 수, 5, 4) float64 배열, Pose가 없으면 NaN
+        """
+        head = self.pose[:stop, :, self.head_positions].astype(np.float64)
+        head[(self.flags[:stop] & FLAG_POSE) == 0] = np.nan
+        return head
+
+    def frame_detections(self, frame_idx, active=None):
+        """기록된 프레임을 감지 결과 형식으로 변환 (랜드마크는 전체 번호 기준 배열)
+
+        Returns:
+            list: ROI별 감지 결과 딕셔너리 (EMPTY_DETECTION 참고), active에서 제외된 ROI는 None
+        """
+        flags = self.flags[frame_idx]
+        num_rois = len(self.rois)
+        pose = np.full((num_rois, self.pose_size, 4), np.nan)
+        pose[:, self.pose_indices] = self.pose[frame_idx]
+        face = np.full((num_rois, self.face_size, 4), np.nan)
+        face[:, self.face_indices] = self.face[frame_idx]
+
+        detections = []
+        for roi_idx, flag in enumerate(flags):
+            if active is not None and not active[roi_idx]:
+                detections.append(None)
+            elif not flag & FLAG_PROCESSED:
+                detections.append(EMPTY_DETECTION)
+            else:
+                detections.append(dict(
+                    EMPTY_DETECTION, processed=True,
+                    face_detected=bool(flag & FLAG_FACE_DETECTED),
+                    pose_landmarks=pose[roi_idx] if flag & FLAG_POSE else None,
+                    face_landmarks=face[roi_idx] if flag & FLAG_FACE else None,
+                    reused=bool(flag & FLAG_REUSED),
+                ))
+        return detections
+
+
+class ReplayDetector:
+    """기록된 랜드마크를 프레임 순서대로 내보내는 감지기 (RoiInference에 그대로 사용)
+
+    detect()를 호출할 때마다 다음 프레임의 기록을 반환하며, 모델은 실행하지 않습니다.
+    """
+    def __init__(self, recording):
+        self.recording = recording
+        self.rois = recording.rois
+        self.frame_idx = 0
+
+    @property
+    def finished(self):
+        return self.frame_idx >= len(self.recording)
+
+    def next_time(self):
+        """다음에 재생할 프레임의 기록 시각 (기록이 끝났으면 None)"""
+        return None if self.finished else float(self.recording.times[self.frame_idx])
+
+    def detect(self, frame=None, active=None):
+        if self.finished:
+            if self.frame_idx == len(self.recording):
+                LOG.warning("replay_finished", frames=self.frame_idx)
+                self.frame_idx += 1
+            return [None if active is not None and not active[i] else EMPTY_DETECTION
+                    for i in range(len(self.rois))]
+        detections = self.recording.frame_detections(self.frame_idx, active)
+        self.frame_idx += 1
+        return detections
+
+    def set_pose_config(self, roi_idx, pose_config):
+        pass  # 재생 중에는 모델을 실행하지 않음
+
+    def close(self):
+        pass
+
+#-------------------------------------------
+# 임계값 비교
+#-------------------------------------------
+
+def head_down_durations(times, down, reset):
+    """머리 숙임 타이머(RoiStateStore.update)를 모든 프레임에 대해 한 번에 계산
+
+    Args:
+        times: (프레임 수,) 시각
+        down: (프레임 수, ROI 수) 머리 숙임 판단 프레임 (타이머 진행)
+        reset: (프레임 수, ROI 수) 타이머 초기화 프레임 (자세 정상 또는 부재)
+            둘 다 아닌 프레임은 직전 값을 유지
+
+    Returns:
+        np.ndarray: (프레임 수, ROI 수) 머리 숙임 지속 시간 (초)
+    """
+    frame_idx = np.arange(len(times))[:, None]
+    last_event = np.maximum.accumulate(np.where(down | reset, frame_idx, -1), axis=0)
+    has_event = last_event >= 0
+    last_event = np.maximum(last_event, 0)
+
+    # 숙임 구간의 시작: 직전 갱신이 없거나 초기화였던 숙임 프레임
+    prev_event = np.vstack([np.zeros((1, down.shape[1]), dtype=last_event.dtype), last_event[:-1]])
+    prev_down = np.take_along_axis(down, prev_event, axis=0)
+    prev_down[0] = False
+    prev_down &= np.vstack([np.zeros((1, down.shape[1]), dtype=bool), has_event[:-1]])
+    start = np.maximum.accumulate(np.where(down & ~prev_down, frame_idx, -1), axis=0)
+
+    last_down = has_event & np.take_along_axis(down, last_event, axis=0)
+    return np.where(last_down, times[last_event] - times[np.maximum(start, 0)], 0.0)
+
+class ThresholdSweep:
+    """기록된 랜드마크로 임계값 조합별 ROI 상태를 다시 판단
+
+    관측 신호(평활화 전 머리 각도, 사람 유무, PERCLOS)는 기록에서 한 번만 계산하고,
+    임계값 조합마다 머리 숙임 타이머와 상태 분류를 전체 프레임 배열 연산으로 수행합니다.
+    평활화는 analyze_detections와 같은 SignalBuffer를 가시성 기준/reference_diff 조합마다 한 번씩 적용합니다.
+
+    Args:
+        recording: LandmarkRecording
+        smoothing: 머리 각도 평활화 방식 (AngleBuffer.SMOOTHING_MODES, None이면 사용 안 함)
+        eye_closure: True면 PERCLOS도 주의/졸음 판단에 사용
+        max_frames: 사용할 최대 프레임 수 (None이면 전체)
+    """
+    def __init__(self, recording, smoothing=SMOOTH_MEAN, eye_closure=True, max_frames=None):
+        self.recording = recording
+        self.smoothing = smoothing
+        self.num_frames = len(recording) if max_frames is None else min(max_frames, len(recording))
+        stop = self.num_frames
+
+        self.times = np.asarray(recording.times[:stop], dtype=np.float64)
+        flags = np.asarray(recording.flags[:stop])
+        self.processed = (flags & FLAG_PROCESSED) != 0
+        self.has_pose = self.processed & ((flags & FLAG_POSE) != 0)
+        self.present = self.processed & ((flags & (FLAG_POSE | FLAG_FACE_DETECTED)) != 0)
+        self.absent = self.processed & ~self.present
+        self.head = recording.head_array(stop)
+        self.perclos = self._perclos(flags) if eye_closure else np.full(self.processed.shape, np.nan)
+        self._angles = {}
+
+    def _perclos(self, flags):
+        """analyze_detections와 같은 순서로 EyeClosureEngine을 적용한 프레임별 PERCLOS"""
+        recording = self.recording
+        num_rois = len(recording.rois)
+        eyes = EyeClosureEngine(recording.rois)
+        eye_positions = [recording.face_indices.index(i) for i in EYE_INDICES]
+        has_face = self.processed & ((flags & FLAG_FACE) != 0)
+        fresh = (flags & FLAG_REUSED) == 0
+        face = np.full((num_rois, recording.face_size, 4), np.nan)
+        perclos = np.full(self.processed.shape, np.nan)
+        for frame_idx in range(self.num_frames):
+            face[:, EYE_INDICES] = recording.face[frame_idx][:, eye_positions]
+            face_lists = [face[r] if has_face[frame_idx, r] else None for r in range(num_rois)]
+            perclos[frame_idx] = eyes.update(face_lists, self.times[frame_idx], fresh[frame_idx])[1]
+            absent = np.flatnonzero(self.absent[frame_idx])
+            if len(absent):
+                eyes.reset(absent)
+        return perclos
+
+    def head_angles(self, visibility_threshold, reference_diff):
+        """가시성 기준/reference_diff 조합의 프레임별 머리 각도 (평활화 적용, Pose가 없으면 NaN)"""
+        key = (visibility_threshold, reference_diff)
+        if key in self._angles:
+            return self._angles[key]
+        frames, num_rois = self.processed.shape
+        angles = calculate_head_angles(
+            self.head.reshape(-1, *self.head.shape[2:]), visibility_threshold, reference_diff
+        ).reshape(frames, num_rois)
+        angles[~self.has_pose] = np.nan
+
+        if self.smoothing:
+            smoother = SignalBuffer(num_rois, num_signals=1, mode=self.smoothing)
+            for frame_idx in range(frames):
+                angles[frame_idx] = smoother.update(angles[frame_idx, :, None], self.times[frame_idx])[:, 0]
+                absent = np.flatnonzero(self.absent[frame_idx])
+                if len(absent):
+                    smoother.reset(absent)
+            angles[~self.has_pose] = np.nan
+        self._angles = {key: angles}   # 같은 조합을 연속으로 평가하므로 마지막 결과만 보관
+        return angles
+
+    def evaluate(self, angle_threshold=HEAD_DOWN_ANGLE_THRESHOLD, warning_time=HEAD_DOWN_WARNING_TIME,
+                 drowsy_time=HEAD_DOWN_DROWSY_TIME, visibility_threshold=HEAD_ANGLE_VISIBILITY_THRESHOLD,
+                 reference_diff=HEAD_ANGLE_REFERENCE_DIFF):
+        """임계값 조합 하나로 모든 프레임의 ROI 상태 판단
+
+        Returns:
+            np.ndarray: (프레임 수, ROI 수) CODE_* 상태 코드 (처리하지 않은 프레임은 CODE_ABSENT)
+        """
+        angles = self.head_angles(visibility_threshold, reference_diff)
+        with np.errstate(invalid='ignore'):
+            down = self.has_pose & (angles > angle_threshold)
+            normal = self.has_pose & (angles <= angle_threshold)
+        durations = head_down_durations(self.times, down, normal | self.absent)
+        return classify_states(self.present, durations, self.perclos, warning_time, drowsy_time)
+
+    def summarize(self, codes):
+        """상태 코드로 ROI별 상태별 누적 시간(초)과 졸음 진입 횟수 계산 (헤드리스 요약과 같은 기준)"""
+        frame_seconds = 1.0 / self.recording.fps
+        rois = {}
+        for roi_idx, (_, name) in enumerate(self.recording.rois):
+            states = codes[self.processed[:, roi_idx], roi_idx]
+            counts = np.bincount(states, minlength=len(CODE_NAMES))
+            drowsy = states == CODE_DROWSY
+            rois[name] = dict(
+                {CODE_NAMES[code]: round(float(count) * frame_seconds, 2) for code, count in enumerate(counts)},
+                drowsy_episodes=int(np.count_nonzero(drowsy[1:] & ~drowsy[:-1]) + drowsy[:1].sum()),
+            )
+        return rois
+
+    def run(self, angle_thresholds, warning_times, drowsy_times, visibility_thresholds, reference_diffs):
+        """모든 임계값 조합 평가
+
+        Returns:
+            list: 조합별 {"params": {...}, "rois": summarize() 결과}
+        """
+        results = []
+        # 머리 각도는 가시성 기준/reference_diff 조합마다 한 번만 계산되도록 바깥쪽에서 반복
+        for visibility_threshold, reference_diff in itertools.product(visibility_thresholds, reference_diffs):
+            for angle_threshold, warning_time, drowsy_time in itertools.product(
+                    angle_thresholds, warning_times, drowsy_times):
+                params = {
+                    "angle_threshold": angle_threshold, "warning_time": warning_time,
+                    "drowsy_time": drowsy_time, "visibility_threshold": visibility_threshold,
+                    "reference_diff": reference_diff,
+                }
+                codes = self.evaluate(**params)
+                results.append({"params": params, "rois": self.summarize(codes)})
+        return results
+
+
+def write_sweep_csv(path, results, roi_names):
+    """임계값 조합별 ROI 주의/졸음 시간과 졸음 진입 횟수를 CSV로 저장"""
+    param_names = list(results[0]["params"]) if results else []
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            param_names + ["warning_seconds", "drowsy_seconds", "drowsy_episodes"]
+            + [f"{name}_{column}" for name in roi_names for column in ("warning", "drowsy")]
+        )
+        for result in results:
+            rois = result["rois"]
+            writer.writerow(
+                [result["params"][name] for name in param_names]
+                + [round(sum(r[STATE_WARNING] for r in rois.values()), 2),
+                   round(sum(r[STATE_DROWSY] for r in rois.values()), 2),
+                   sum(r["drowsy_episodes"] for r in rois.values())]
+                + [rois[name][state] for name in roi_names for state in (STATE_WARNING, STATE_DROWSY)]
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="기록된 랜드마크로 머리 숙임 임계값 조합을 비교합니다.")
+    parser.add_argument("recording", help="랜드마크 기록 폴더 (headless.py --record-landmarks)")
+    parser.add_argument("--angle", type=float, nargs="+", default=[HEAD_DOWN_ANGLE_THRESHOLD],
+                        help="머리 숙임 각도 임계값 (도)")
+    parser.add_argument("--warning-time", type=float, nargs="+", default=[HEAD_DOWN_WARNING_TIME],
+                        help="'주의' 판단 머리 숙임 지속 시간 (초)")
+    parser.add_argument("--drowsy-time", type=float, nargs="+", default=[HEAD_DOWN_DROWSY_TIME],
+                        help="'졸음' 판단 머리 숙임 지속 시간 (초)")
+    parser.add_argument("--visibility", type=float, nargs="+", default=[HEAD_ANGLE_VISIBILITY_THRESHOLD],
+                        help="머리 각도 계산 랜드마크의 최소 가시성")
+    parser.add_argument("--reference-diff", type=float, nargs="+", default=[HEAD_ANGLE_REFERENCE_DIFF],
+                        help="정상 자세의 코/귀와 어깨 y좌표 차이 기준값")
+    parser.add_argument("--smoothing", choices=SMOOTHING_MODES + ("off",), default=SMOOTH_MEAN,
+                        help="머리 각도 평활화 방식 (off: 사용 안 함)")
+    parser.add_argument("--no-eye-closure", action="store_true",
+                        help="눈 감김 비율(PERCLOS)을 주의/졸음 판단에 사용하지 않음")
+    parser.add_argument("--max-frames", type=int, default=None, help="사용할 최대 프레임 수")
+    parser.add_argument("--output", default=None, help="조합별 결과 CSV 저장 경로")
+    args = parser.parse_args(argv)
+
+    try:
+        recording = LandmarkRecording(args.recording)
+    except (IOError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    if not len(recording):
+        print(f"Error: 기록된 프레임이 없습니다: {args.recording}")
+        return 1
+
+    start = time.perf_counter()
+    sweep = ThresholdSweep(
+        recording, None if args.smoothing == "off" else args.smoothing, not args.no_eye_closure, args.max_frames
+    )
+    results = sweep.run(args.angle, args.warning_time, args.drowsy_time, args.visibility, args.reference_diff)
+    elapsed = time.perf_counter() - start
+
+    roi_names = [name for _, name in recording.rois]
+    for result in results:
+        params = result["params"]
+        rois = result["rois"]
+        print(
+            f"각도 {params['angle_threshold']:g}도, 주의 {params['warning_time']:g}초, "
+            f"졸음 {params['drowsy_time']:g}초, 가시성 {params['visibility_threshold']:g}, "
+            f"기준 {params['reference_diff']:g} → 주의 {sum(r[STATE_WARNING] for r in rois.values()):.1f}초, "
+            f"졸음 {sum(r[STATE_DROWSY] for r in rois.values()):.1f}초 "
+            f"({sum(r['drowsy_episodes'] for r in rois.values())}회)"
+        )
+    video_seconds = sweep.num_frames / recording.fps
+    print(f"{len(results)}개 조합, 영상 {video_seconds:.1f}초 × ROI {len(roi_names)}개를 {elapsed:.2f}초에 비교")
+    if args.output:
+        write_sweep_csv(args.output, results, roi_names)
+        print(f"결과 저장: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
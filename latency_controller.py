@@ -0,0 +1,208 @@
+"""
+지연 시간 목표 기반 Pose 모델 설정 제어
+- 프레임당 추론 시간과 ROI별 추론 시간을 측정
+- 목표 시간을 넘으면 우선순위가 낮은 ROI부터 Pose 모델 복잡도를 낮추고, 여유가 생기면 다시 높임
+- 주의/졸음 상태 ROI는 가능한 한 높은 정밀도 유지
+- 시작 설정보다 높은 단계로는 올리지 않고, 설치되지 않았거나 불러오지 못한 모델 단계는 건너뜀
+- 모든 모델 변경은 기록
+"""
+
+import time
+
+from detection import DEFAULT_POSE_CONFIG, MIN_DETECTION_CONFIDENCE, pose_model_available
+from structured_log import LOG
+from scheduler import (
+    schedule_state, SCHED_ABSENT, SCHED_NORMAL, SCHED_HEAD_DOWN, SCHED_WARNING, SCHED_DROWSY
+)
+
+# 비용이 낮은 순서의 Pose 설정 단계 (마지막 단계가 기본 설정)
+POSE_LEVELS = [
+    {'model_complexity': 0, 'min_detection_confidence': MIN_DETECTION_CONFIDENCE, 'min_tracking_confidence': 0.3},
+    {'model_complexity': 1, 'min_detection_confidence': MIN_DETECTION_CONFIDENCE, 'min_tracking_confidence': 0.5},
+    dict(DEFAULT_POSE_CONFIG),
+]
+
+# 상태별 우선순위 (높을수록 높은 정밀도 유지)
+STATE_PRIORITY = {
+    SCHED_ABSENT: 0,
+    SCHED_NORMAL: 1,
+    SCHED_HEAD_DOWN: 2,
+    SCHED_WARNING: 3,
+    SCHED_DROWSY: 4,
+}
+HIGH_PRIORITY = STATE_PRIORITY[SCHED_WARNING]
+
+EWMA_ALPHA = 0.2             # 지연 시간 평균의 갱신 비율
+UPGRADE_MARGIN = 0.7         # 평균 추론 시간이 목표의 이 비율 미만이면 설정 상향 시도
+SWITCH_COOLDOWN_FRAMES = 15  # 설정 변경 후 다음 변경까지 기다리는 프레임 수
+
+
+def _ewma(previous, value):
+    return value if previous is None else previous + EWMA_ALPHA * (value - previous)
+
+
+class LatencyController:
+    """ROI별 Pose 모델 설정을 추론 시간 목표에 맞춰 조정
+
+    Args:
+        num_rois: ROI 개수
+        target_frame_time: 프레임당 추론 시간 목표 (초)
+        initial_complexity: 감지기를 만들 때 사용한 Pose model_complexity (None이면 DEFAULT_POSE_CONFIG)
+        levels: 비용이 낮은 순서의 Pose 설정 목록
+        log: 설정 변경을 기록할 로거 (structured_log.StructuredLogger)
+    """
+    def __init__(self, num_rois, target_frame_time, initial_complexity=None, levels=POSE_LEVELS, log=LOG):
+        if initial_complexity is None:
+            initial_complexity = DEFAULT_POSE_CONFIG['model_complexity']
+        self.target = target_frame_time
+        # 시작 설정보다 높은 단계는 사용하지 않음 (시작 단계는 사용자가 고른 설정)
+        self.levels = [level for level in levels if level['model_complexity'] <= initial_complexity]
+        self.log = log
+        self.disabled = set()   # 사용할 수 없는 단계 번호
+        for level_idx, level in enumerate(self.levels[:-1]):
+            if not pose_model_available(level['model_complexity']):
+                self.disabled.add(level_idx)
+                log.warning("pose_level_unavailable", complexity=level['model_complexity'])
+        self.roi_levels = [len(self.levels) - 1] * num_rois
+        self.previous_levels = list(self.roi_levels)   # 마지막 변경 전 단계 (모델 교체 실패 시 되돌림)
+        self.priorities = [STATE_PRIORITY[SCHED_ABSENT]] * num_rois
+
+        self.frame_time = None
+        self.roi_latency = [None] * num_rois
+        # ROI별, 단계별 추론 시간 추정치 (상향 시 예상 비용 계산용)
+        self.level_latency = [[None] * len(self.levels) for _ in range(num_rois)]
+        self.cooldown = 0
+        self.switch_log = []
+
+    def update(self, frame_time, detections, results, states):
+        """측정값을 반영하고 필요한 설정 변경 목록 반환
+
+        Args:
+            frame_time: 이번 프레임의 추론 시간 (초)
+            detections: 감지기 결과 (생략된 ROI는 None)
+            results: analyze_detections() 결과
+            states: ROI 상태 저장소 (roi_state.RoiStateStore)
+
+        Returns:
+            list: [(roi_idx, pose_config), ...] 적용할 설정 변경
+        """
+        self.frame_time = _ewma(self.frame_time, frame_time)
+        for roi_idx, detection in enumerate(detections):
+            if detection is not None and detection['pose_ran']:
+                latency = detection['latency']
+                self.roi_latency[roi_idx] = _ewma(self.roi_latency[roi_idx], latency)
+                level = self.roi_levels[roi_idx]
+                self.level_latency[roi_idx][level] = _ewma(self.level_latency[roi_idx][level], latency)
+        for roi_idx, result in enumerate(results):
+            if result['processed']:
+                self.priorities[roi_idx] = STATE_PRIORITY[schedule_state(result, states, roi_idx)]
+
+        if self.cooldown > 0:
+            self.cooldown -= 1
+            return []
+
+        changes = []
+        if self.frame_time > self.target:
+            roi_idx = self._downgrade_candidate()
+            if roi_idx is not None:
+                changes.append(self._switch(roi_idx, self._next_level(roi_idx, -1), "목표 초과"))
+        elif self.frame_time < self.target * UPGRADE_MARGIN:
+            roi_idx = self._upgrade_candidate()
+            if roi_idx is not None:
+                changes.append(self._switch(roi_idx, self._next_level(roi_idx, +1), "여유"))
+        else:
+            # 목표 범위 안: 주의/졸음 ROI가 낮은 설정이면 우선순위가 낮은 ROI와 맞바꿈
+            changes.extend(self._rebalance())
+
+        if changes:
+            self.cooldown = SWITCH_COOLDOWN_FRAMES
+        return changes
+
+    def _latency(self, roi_idx):
+        return self.roi_latency[roi_idx] or 0.0
+
+    def _next_level(self, roi_idx, step):
+        """사용할 수 없는 단계를 건너뛴 다음 단계 (없으면 None)"""
+        level = self.roi_levels[roi_idx] + step
+        while 0 <= level < len(self.levels) and level in self.disabled:
+            level += step
+        return level if 0 <= level < len(self.levels) else None
+
+    def _downgrade_candidate(self):
+        candidates = [i for i in range(len(self.roi_levels)) if self._next_level(i, -1) is not None]
+        if not candidates:
+            return None
+        # 우선순위가 낮고 비용이 큰 ROI부터
+        return min(candidates, key=lambda i: (self.priorities[i], -self._latency(i)))
+
+    def _upgrade_candidate(self):
+        candidates = []
+        for roi_idx, level in enumerate(self.roi_levels):
+            next_level = self._next_level(roi_idx, +1)
+            if next_level is None:
+                continue
+            # 상향 후 예상 추론 시간이 목표를 넘지 않는 경우만
+            current = self.level_latency[roi_idx][level]
+            upgraded = self.level_latency[roi_idx][next_level]
+            if current is not None and upgraded is not None:
+                if self.frame_time + (upgraded - current) > self.target:
+                    continue
+            candidates.append(roi_idx)
+        if not candidates:
+            return None
+        # 우선순위가 높고 비용이 작은 ROI부터
+        return max(candidates, key=lambda i: (self.priorities[i], -self._latency(i)))
+
+    def _rebalance(self):
+        needy = [
+            i for i in range(len(self.roi_levels))
+            if self.priorities[i] >= HIGH_PRIORITY and self._next_level(i, +1) is not None
+        ]
+        if not needy:
+            return []
+        high = max(needy, key=lambda i: self.priorities[i])
+        donors = [
+            i for i in range(len(self.roi_levels))
+            if self.priorities[i] < HIGH_PRIORITY and self._next_level(i, -1) is not None
+        ]
+        if not donors:
+            return []
+        low = min(donors, key=lambda i: (self.priorities[i], -self._latency(i)))
+        return [
+            self._switch(low, self._next_level(low, -1), "주의/졸음 ROI 우선"),
+            self._switch(high, self._next_level(high, +1), "주의/졸음 ROI 우선"),
+        ]
+
+    def _switch(self, roi_idx, new_level, reason):
+        old_level = self.roi_levels[roi_idx]
+        self.previous_levels[roi_idx] = old_level
+        self.roi_levels[roi_idx] = new_level
+        config = self.levels[new_level]
+        event = {
+            'time': time.time(),
+            'roi': roi_idx,
+            'from_complexity': self.levels[old_level]['model_complexity'],
+            'to_complexity': config['model_complexity'],
+            'frame_ms': round(self.frame_time * 1000, 1),
+            'target_ms': round(self.target * 1000, 1),
+            'reason': reason,
+        }
+        self.switch_log.append(event)
+        self.log.info("pose_switch", **event)
+        return roi_idx, config
+
+    def switch_failed(self, roi_idx, error):
+        """감지기가 모델을 불러오지 못한 경우: ROI 단계를 되돌리고 그 단계는 더 이상 사용하지 않음"""
+        failed_level = self.roi_levels[roi_idx]
+        self.disabled.add(failed_level)
+        self.roi_levels[roi_idx] = self.previous_levels[roi_idx]
+        if self.switch_log and self.switch_log[-1]['roi'] == roi_idx:
+            self.switch_log[-1]['failed'] = True
+        self.log.warning(
+            "pose_switch_failed", roi=roi_idx,
+            complexity=self.levels[failed_level]['model_complexity'], error=f"{type(error).__name__}: {error}"
+        )
+
+    def current_levels(self):
+        """ROI별 현재 Pose model_complexity"""
+        return [self.levels[level]['model_complexity'] for level in self.roi_levels]
@@ -0,0 +1,82 @@
+"""
+프레임 시각 기준(clock)
+- 머리 숙임 시간을 처리 속도와 무관하게 계산하기 위한 시각 기준
+- 라이브 소스: 프레임을 캡처한 실제 시각 (WallClock)
+- 영상 파일: 영상 내 재생 위치(CAP_PROP_POS_MSEC, 없으면 프레임 번호 / FPS) 기준 (MediaClock)
+- 영상 파일은 실시간 재생 속도 또는 최대 속도로 처리 가능
+"""
+
+import time
+
+from capture import is_live_source, parse_source
+
+# 영상 파일 처리 속도
+PACE_REALTIME = "realtime"  # 영상 재생 속도에 맞춰 대기
+PACE_FAST = "fast"          # 대기 없이 최대 속도로 처리
+
+PACING_MODES = (PACE_REALTIME, PACE_FAST)
+
+
+class WallClock:
+    """실제 시각 기준 (라이브 소스용)
+
+    캡처 스레드가 기록한 time.monotonic 시각을 그대로 사용하며, 라이브 소스는 대기하지 않습니다.
+    """
+    def tick(self, frame_info):
+        """프레임 시각(초) 반환"""
+        return frame_info['captured_at']
+
+
+class MediaClock:
+    """영상 재생 위치 기준 (영상 파일용)
+
+    처리 속도와 관계없이 같은 영상은 같은 프레임 시각을 가지므로 주의/졸음 판정 결과가 같습니다.
+
+    Args:
+        fps: 영상 FPS (재생 위치를 알 수 없을 때 프레임 번호로 시각 계산)
+        pacing: PACE_REALTIME이면 재생 속도에 맞춰 대기, PACE_FAST면 대기 없음
+    """
+    def __init__(self, fps, pacing=PACE_REALTIME):
+        if pacing not in PACING_MODES:
+            raise ValueError(f"Unknown pacing mode: {pacing}")
+        self.fps = fps or 30.0
+        self.pacing = pacing
+        self.last_time = None
+        # 실시간 재생 기준점 (첫 프레임의 영상 시각과 실제 시각)
+        self.start_media = None
+        self.start_wall = None
+
+    def frame_time(self, frame_info):
+        """프레임의 영상 내 시각(초)
+
+        일부 백엔드는 재생 위치를 0으로만 반환하거나 되돌아가는 값을 주므로, 그런 경우 프레임 번호를 사용합니다.
+        """
+        position_ms = frame_info.get('position_ms')
+        by_index = frame_info['index'] / self.fps
+        if position_ms is None or (position_ms <= 0 and frame_info['index'] > 0):
+            media_time = by_index
+        else:
+            media_time = position_ms / 1000.0
+        if self.last_time is not None and media_time < self.last_time:
+            media_time = by_index
+        self.last_time = media_time
+        return media_time
+
+    def tick(self, frame_info):
+        """프레임 시각(초) 반환 (실시간 재생이면 해당 시각까지 대기)"""
+        media_time = self.frame_time(frame_info)
+        if self.pacing == PACE_REALTIME:
+            if self.start_wall is None:
+                self.start_media = media_time
+                self.start_wall = time.monotonic()
+            delay = (media_time - self.start_media) - (time.monotonic() - self.start_wall)
+            if delay > 0:
+                time.sleep(delay)
+        return media_time
+
+
+def create_clock(source, fps, pacing=PACE_REALTIME):
+    """소스 종류에 맞는 시각 기준 생성 (라이브 소스는 항상 WallClock)"""
+    if is_live_source(parse_source(source)):
+        return WallClock()
+    return MediaClock(fps, pacing)
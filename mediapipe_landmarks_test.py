@@ -14,128 +14,192 @@ import cv2 as cv
 import numpy as np
 import mediapipe as mp
 import time
-from datetime import datetime
+import math
 import os
 import sys
-from AngleBuffer import AngleBuffer
+import threading
+from detection import (
+    HEAD_DOWN_ANGLE_THRESHOLD, HEAD_DOWN_WARNING_TIME, HEAD_DOWN_DROWSY_TIME, TARGET_FRAME_HEIGHT,
+    PERCLOS_WARNING_THRESHOLD, PERCLOS_DROWSY_THRESHOLD
+)
+from roi_layout import save_roi_layout
+from capture import open_capture
+from media_clock import create_clock
+import structured_log
+from profiler import PROFILER
+from pipeline import Pipeline
+from inference import create_roi_detector, RoiInference, MODE_PROCESS_POOL
+from view_model import ViewModel
+from recorder import VideoRecorder
+from event_log import EventLog
+from landmark_replay import LandmarkRecorder, LandmarkRecording, ReplayDetector
+from roi_state import RoiStateStore
+from multi_stream import MultiStreamMonitor, tile_frames
 
 # PyQt 관련 임포트
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QLabel, 
     QVBoxLayout, QHBoxLayout, QFrame, QScrollArea,
-    QPushButton, QSpinBox
+    QPushButton
 )
-from PyQt5.QtCore import Qt, QRectF
+from PyQt5.QtCore import Qt, QRectF, QSize, QObject, QTimer, QEvent, QEventLoop, pyqtSignal
 from PyQt5.QtGui import (
     QImage, QPixmap, QPainter, QColor, QFont,
     QBrush, QPen, QLinearGradient
 )
 
 #-------------------------------------------
-# 상수 정의
+# 전역 변수
 #-------------------------------------------
 
-# MediaPipe 모델 설정 관련 상수
-MIN_DETECTION_CONFIDENCE = 0.5  # MediaPipe 모델의 최소 감지 신뢰도 (0.0 ~ 1.0)
-MIN_TRACKING_CONFIDENCE = 0.5   # MediaPipe 모델의 최소 추적 신뢰도 (0.0 ~ 1.0)
-BLINK_THRESHOLD = 0.51         # 눈 깜빡임 감지를 위한 임계값
-MOVING_AVERAGE_WINDOW = 3      # 움직임 평균을 계산하기 위한 윈도우 크기
-
-# 머리 숙임 감지 관련 상수
-HEAD_DOWN_ANGLE_THRESHOLD = 15  # 머리가 숙여졌다고 판단하는 각도 임계값 (도 단위)
-HEAD_DOWN_WARNING_TIME = 15     # '주의' 상태로 판단하는 머리 숙임 지속 시간 (초 단위)
-HEAD_DOWN_DROWSY_TIME = 60      # '졸음' 상태로 판단하는 머리 숙임 지속 시간 (초 단위)
-
-# Face Mesh 랜드마크 인덱스 (MediaPipe Face Mesh의 468개 랜드마크 중 주요 포인트)
-NOSE_TIP_INDEX = 1              # 코끝 위치
-CHIN_INDEX = 152                # 턱 위치
-LEFT_EYE_LEFT_CORNER_INDEX = 33    # 왼쪽 눈의 왼쪽 끝점
-RIGHT_EYE_RIGHT_CORNER_INDEX = 133  # 오른쪽 눈의 오른쪽 끝점
-LEFT_MOUTH_CORNER_INDEX = 61        # 입의 왼쪽 끝점
-RIGHT_MOUTH_CORNER_INDEX = 291      # 입의 오른쪽 끝점
-
-# 눈 감지를 위한 랜드마크 인덱스 그룹
-LEFT_EYE_POINTS = [362, 385, 386, 387, 263, 373, 374, 380]   # 왼쪽 눈 윤곽을 구성하는 점들
-RIGHT_EYE_POINTS = [33, 160, 159, 158, 133, 153, 145, 144]   # 오른쪽 눈 윤곽을 구성하는 점들
-
 # 비디오 처리 관련 변수
 frame_count = 0     # 처리된 프레임 수를 추적
-quad_data = {}      # 각 ROI(관심 영역)의 상태 데이터를 저장하는 딕셔너리
 roi_selector = None # ROI 선택 도구 인스턴스
 
+ROI_LAYOUT_PATH = "rois.json"  # 's' 키로 저장하는 ROI 레이아웃 파일 (headless.py에서 사용)
+
+# 영상 입력 설정
+VIDEO_SOURCE = "video3.mp4"    # 영상 파일 경로, 카메라 번호("0") 또는 스트림 URL
+CAPTURE_QUEUE_SIZE = 1         # 캡처 스레드가 보관할 최대 프레임 수
+CAPTURE_DROP_POLICY = None     # None이면 라이브 소스는 drop_oldest, 파일은 block
+PIPELINE_QUEUE_SIZE = 2        # 디코딩/추론/렌더링 단계 사이 큐의 최대 크기
+
+# 다중 카메라 모니터링 (multi_stream, 지정하면 VIDEO_SOURCE와 ROI 선택 대신 사용)
+# 예: [{"source": "0", "layout": "rois_front.json", "fps": 10},
+#      {"source": "rtsp://cam2/stream", "layout": "rois_back.json", "fps": 5, "weight": 1.0, "name": "back"}]
+# fps: 스트림별 목표 처리 FPS (생략하면 제한 없음), weight: 추론 시간 배분 가중치 (기본 1)
+MULTI_STREAMS = None
+
+# 추론 실행 방식
+# "sequential": ROI마다 Face Mesh/Pose 순차 처리, "process_pool": 작업 프로세스에 분산,
+# "shared_frame": 전체 프레임에 다중 얼굴 Face Mesh 한 번 + 필요한 ROI에만 Pose
+INFERENCE_MODE = "sequential"
+INFERENCE_WORKERS = None       # process_pool 작업자 수 (None이면 CPU 코어 수에 맞춤)
+ADAPTIVE_INFERENCE = False     # True면 ROI 상태에 따라 추론 주기 조절 (정상/빈 자리는 낮은 주기)
+INFERENCE_RATE_POLICY = None   # 상태별 추론 주기 (Hz), None이면 scheduler.DEFAULT_RATE_POLICY
+DETECTION_CASCADE = "off"      # "off": Face Mesh+Pose 항상 실행, "face_mesh"/"face_detection": Pose가 부족할 때만 얼굴 모델
+PLAYBACK_PACING = "realtime"   # 영상 파일 처리 속도 ("realtime": 재생 속도, "fast": 최대 속도), 라이브 소스는 무시
+LATENCY_TARGET_MS = None       # 프레임당 추론 시간 목표 (ms), 지정하면 ROI별 Pose 복잡도 자동 조정
+MOTION_GATING = False          # True면 변화가 없는 ROI는 추론을 생략하고 마지막 결과 재사용
+ANGLE_SMOOTHING = "mean"       # 머리 각도 평활화 ("mean"/"ema"/"median"/"one_euro", None이면 사용 안 함)
+
+# 결과 영상 녹화 (recorder)
+RECORD_VIDEO = True            # 랜드마크/ROI가 그려진 영상 저장
+RECORD_DIR = "output"          # 저장 폴더
+RECORD_CODEC = "XVID"          # FourCC 코덱
+RECORD_RESOLUTION = None       # 저장 해상도 (width, height), None이면 처리 프레임 크기
+RECORD_DECIMATION = 1          # N프레임마다 1프레임만 저장
+RECORD_QUEUE_SIZE = 8          # 인코딩 대기 최대 프레임 수
+RECORD_DROP_POLICY = "drop_oldest"  # 인코딩이 밀릴 때: "drop_oldest"/"drop_newest" 버림, "block" 대기
+RECORD_SEGMENT_SECONDS = 600   # 파일을 나누는 영상 길이 (초), None이면 한 파일로 저장
+
+# ROI 상태 전환/머리 각도 표본 기록 (event_log, python event_log.py로 조회)
+EVENT_LOG_DIR = "output/events"  # 기록 폴더 (여러 수업을 이어서 저장), None이면 기록 안 함
+
+# 랜드마크 기록/재생 (landmark_replay, 모델을 다시 실행하지 않고 임계값 조정)
+LANDMARK_RECORD_DIR = None     # ROI별 Pose/Face Mesh 랜드마크 기록 폴더, None이면 기록 안 함
+LANDMARK_RECORD_DTYPE = "float16"  # 저장 형식 ("float16"/"float32")
+LANDMARK_RECORD_POINTS = "full"    # "minimal": 상태 판단에 필요한 점만, "full": 재생 시 전체 랜드마크 표시
+LANDMARK_REPLAY_DIR = None     # 지정하면 모델 대신 기록된 랜드마크로 상태 판단 (VIDEO_SOURCE는 기록한 영상과 같아야 함)
+
+# 상태 창 갱신
+RELAY_POLL_INTERVAL = 0.1      # 결과 전달 스레드가 종료 요청을 확인하는 간격 (초)
+UI_TEXT_REFRESH_RATE = 5.0     # 상태가 그대로일 때 상태 창 텍스트 갱신 주기 (Hz), 상태 전환은 즉시 반영
+DISPLAY_REFRESH_RATE = 30.0    # 메인 화면 영상 갱신 주기 (Hz, 처리 속도와 별개), None이면 처리한 프레임마다 갱신
+
+# 처리 단계별 지연 시간 측정 (profiler)
+PROFILING = True               # 단계별/ROI별 지연 시간 측정
+PROFILE_OVERLAY = False        # 시작 시 FPS/단계별 지연 시간 표시 여부 (p 키로 전환)
+PROFILE_SNAPSHOT_DIR = "output/profile"  # 주기적 CSV/JSON 스냅샷 저장 폴더 (None이면 저장 안 함)
+PROFILE_SNAPSHOT_INTERVAL = 10.0         # 스냅샷 저장 간격 (초)
+
+# 로그 설정 (structured_log)
+LOG_LEVEL = "info"             # "debug"면 ROI별 머리 각도 계산 값 기록
+LOG_SAMPLE_EVERY = 1           # 디버그 로그를 이벤트별로 N개 중 1개만 기록
+LOG_PATH = None                # JSON Lines 로그 파일 경로 (None이면 stderr)
+
 #-------------------------------------------
-# 유틸리티 함수
+# 상태 창 스타일 (상태가 바뀔 때만 적용)
 #-------------------------------------------
 
-def create_quad_data(num_rois):
-    """ROI 개수에 따라 상태 추적 데이터 초기화"""
-    quad_data = {}
-    for i in range(num_rois):
-        quad_data[i] = {
-            'head_down_start': None,  # 머리 숙임 시작 시간
-            'head_down_duration': 0,   # 머리 숙임 지속 시간
-        }
-    return quad_data
-
-def calculate_head_angle(landmarks):
-    """머리 숙임 각도 계산
-    
-    Args:
-        landmarks: MediaPipe Pose 랜드마크 데이터
-        
-    Returns:
-        float: 머리 숙임 각도 (0~90도)
-    """
-    try:
-        # 필요한 랜드마크 추출
-        nose = landmarks[mp.solutions.pose.PoseLandmark.NOSE]
-        left_shoulder = landmarks[mp.solutions.pose.PoseLandmark.LEFT_SHOULDER]
-        right_shoulder = landmarks[mp.solutions.pose.PoseLandmark.RIGHT_SHOULDER]
-        left_ear = landmarks[mp.solutions.pose.PoseLandmark.LEFT_EAR]
-        right_ear = landmarks[mp.solutions.pose.PoseLandmark.RIGHT_EAR]
-
-        # 각 랜드마크의 가시성(visibility) 확인
-        visibility_threshold = 0.3
-        landmarks_visible = (
-            nose.visibility > visibility_threshold and
-            left_shoulder.visibility > visibility_threshold and
-            right_shoulder.visibility > visibility_threshold and
-            left_ear.visibility > visibility_threshold and
-            right_ear.visibility > visibility_threshold
-        )
-
-        if not landmarks_visible:
-            # 랜마크가 잘 이지 않으면 엎드린 것으로 간주
-            return 90  # 최대 각도 반환
-
-        # 어깨 중심점의 y좌표
-        shoulder_y = (left_shoulder.y + right_shoulder.y) / 2
-        ear_y = (left_ear.y + right_ear.y) / 2
-
-        # 머리 숙임 정도 계산
-        # 코와 어깨, 귀와 어깨의 y좌표 차이 모 려
-        nose_shoulder_diff = nose.y - shoulder_y
-        ear_shoulder_diff = ear_y - shoulder_y
-        
-        #  큰 차이값 용
-        current_diff = max(nose_shoulder_diff, ear_shoulder_diff)
-        
-        # 정상 자일 때의 기준값
-        reference_diff = 0.2
-
-        # 머 숙임 각도 계산
-        head_angle = (current_diff + reference_diff) * 100
-
-        # 디버깅용 출력
-        print(f"Nose Y: {nose.y:.3f}, Shoulder Y: {shoulder_y:.3f}, Ear Y: {ear_y:.3f}")
-        print(f"Visibility - Nose: {nose.visibility:.2f}, Shoulders: {(left_shoulder.visibility + right_shoulder.visibility)/2:.2f}")
-        print(f"Head angle: {head_angle:.1f}")
-
-        return max(0, min(90, head_angle))  # 0~90도 범위로 제한
-
-    except Exception as e:
-        print(f"Error calculating head angle: {e}")
-        return 0
+# 학생별 상태 창 라벨
+INFO_LABEL_STYLES = {
+    "drowsy": """
+        font-size: 20px;
+        font-weight: bold;
+        color: #ffffff;
+        background-color: #ff4444;
+        border-radius: 10px;
+        padding: 15px;
+        margin: 5px;
+    """,
+    "warning": """
+        font-size: 20px;
+        font-weight: bold;
+        color: #000000;
+        background-color: #ffff44;
+        border-radius: 10px;
+        padding: 15px;
+        margin: 5px;
+    """,
+    "normal": """
+        font-size: 20px;
+        font-weight: bold;
+        color: #ffffff;
+        background-color: #44aa44;
+        border-radius: 10px;
+        padding: 15px;
+        margin: 5px;
+    """,
+    "absent": """
+        font-size: 20px;
+        font-weight: bold;
+        color: #888888;
+        background-color: #2d2d2d;
+        border-radius: 10px;
+        padding: 15px;
+        margin: 5px;
+    """,
+}
+
+# 모니터링 창 전체 상태 라벨
+STATUS_MESSAGE_STYLES = {
+    "drowsy": """
+        font-size: 22px;
+        font-weight: bold;
+        color: #ffffff;
+        background-color: #ff4444;
+        border-radius: 10px;
+        padding: 20px;
+        margin: 5px;
+    """,
+    "warning": """
+        font-size: 22px;
+        font-weight: bold;
+        color: #000000;
+        background-color: #ffff44;
+        border-radius: 10px;
+        padding: 20px;
+        margin: 5px;
+    """,
+    "normal": """
+        font-size: 22px;
+        font-weight: bold;
+        color: #ffffff;
+        background-color: #44aa44;
+        border-radius: 10px;
+        padding: 20px;
+        margin: 5px;
+    """,
+}
+
+INFO_STATUS_STYLES = {"졸음 감지": "drowsy", "주의": "warning", "정상": "normal"}
+
+# 위치별 상태 격자 칸
+ROI_GRID_BACKGROUND = "#2d2d2d"
+ROI_TILE_COLORS = {"drowsy": "#ff4444", "warning": "#ffff44", "normal": "#28a745", "absent": "#666666"}
+ROI_TILE_LABELS = {"drowsy": "졸음", "warning": "주의", "normal": "정상", "absent": ""}
+ROI_TILE_STATES = ["absent", "normal", "warning", "drowsy"]   # 상태 코드(roi_state.CODE_*) 순서
 
 #-------------------------------------------
 # UI 컴포넌트 클래스
@@ -206,11 +270,7 @@ class ROISelector:
             self.drawing = False
             self.current_roi = None
             self.current_name = None
-            
-            # ROI 개수에 맞게 quad_data 재생성
-            global quad_data
-            quad_data = create_quad_data(len(self.rois))
-            
+
             self.info_window.update_roi_count(len(self.rois))
             if len(self.rois) > 0:
                 self.start_button.move(50, 50)
@@ -219,39 +279,130 @@ class ROISelector:
 
     def draw_rois(self, frame):
         # 저장된 ROI 그리기
-        for roi, name in self.rois:
-            x1, y1, x2, y2 = roi
-            cv.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            cv.putText(frame, name, (x1+10, y1+20), 
-                      cv.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+        draw_roi_boxes(frame, self.rois)
 
         # 현재 그리고 는 ROI
         if self.drawing and self.current_roi:
             x1, y1, x2, y2 = self.current_roi
             cv.rectangle(frame, (x1, y1), (x2, y2), (255, 0, 0), 2)
 
-def mouse_callback(event, x, y, flags, param):
-    roi_selector = param
-    if event == cv.EVENT_LBUTTONDOWN:
-        roi_selector.start_roi(x, y)
-    elif event == cv.EVENT_MOUSEMOVE:
-        roi_selector.update_roi(x, y)
-    elif event == cv.EVENT_LBUTTONUP:
-        roi_selector.finish_roi()
+def draw_roi_boxes(frame, rois):
+    """ROI 영역과 이름 그리기"""
+    for roi, name in rois:
+        x1, y1, x2, y2 = roi
+        cv.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        cv.putText(frame, name, (x1+10, y1+20), 
+                  cv.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
 
 #-------------------------------------------
 # UI 클래스
 #-------------------------------------------
 
+class RoiStatusGrid:
+    """ROI 상태 격자 이미지
+
+    ROI 칸은 (상태, 칸 크기, ROI 번호)마다 한 번만 그려 캐시해 두고,
+    프레임마다 상태가 바뀐 칸만 격자 이미지에 복사합니다.
+    ROI 개수가 바뀌면 격자와 캐시를 다시 만듭니다.
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.pixmap = None
+        self.num_rois = 0
+        self.cols = self.cell_width = self.cell_height = 0
+        self.states = []
+        self.tiles = {}
+
+    def _layout(self, num_rois):
+        # 최대 3열 격자
+        self.num_rois = num_rois
+        self.cols = min(3, num_rois)
+        rows = (num_rois + self.cols - 1) // self.cols
+        self.cell_width = self.width // self.cols
+        self.cell_height = self.height // rows
+        self.states = [None] * num_rois
+        self.tiles.clear()
+        self.pixmap = QPixmap(self.width, self.height)
+        self.pixmap.fill(QColor(ROI_GRID_BACKGROUND))
+
+    def _tile(self, state, roi_idx):
+        key = (state, self.cell_width, self.cell_height, roi_idx)
+        tile = self.tiles.get(key)
+        if tile is not None:
+            return tile
+
+        w, h = self.cell_width, self.cell_height
+        color = QColor(ROI_TILE_COLORS[state])
+        tile = QPixmap(w, h)
+        tile.fill(QColor(ROI_GRID_BACKGROUND))
+        painter = QPainter(tile)
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # 그라데이션 둥근 사각형 (여백 추가)
+        gradient = QLinearGradient(0, 0, w, h)
+        gradient.setColorAt(0, color.lighter(120))
+        gradient.setColorAt(1, color)
+        painter.setBrush(QBrush(gradient))
+        painter.setPen(QPen(Qt.black, 2))
+        margin = 2
+        painter.drawRoundedRect(margin, margin, w - 2*margin, h - 2*margin, 10, 10)
+
+        # 텍스트 (주의 상태일 때는 검은색)
+        painter.setPen(Qt.black if state == "warning" else Qt.white)
+        painter.setFont(QFont("Arial", 8 if self.num_rois > 6 else 10, QFont.Bold))
+        painter.drawText(QRectF(0, h/3, w, h/2), Qt.AlignCenter, f"ROI {roi_idx+1}\n{ROI_TILE_LABELS[state]}")
+        painter.end()
+
+        self.tiles[key] = tile
+        return tile
+
+    def update(self, states):
+        """ROI별 상태 반영 (바뀐 칸이 있으면 True)"""
+        if len(states) != self.num_rois:
+            self._layout(len(states))
+        changed = [i for i, state in enumerate(states) if state != self.states[i]]
+        if not changed:
+            return False
+
+        painter = QPainter(self.pixmap)
+        for i in changed:
+            x = (i % self.cols) * self.cell_width
+            y = (i // self.cols) * self.cell_height
+            painter.drawPixmap(x, y, self._tile(states[i], i))
+            self.states[i] = states[i]
+        painter.end()
+        return True
+
 class StatusUI(QMainWindow):
-    """메인 모니터링 UI"""
+    """메인 모니터링 UI
+
+    영상 라벨의 마우스 입력(프레임 좌표로 변환)과 키 입력은 시그널로 전달합니다.
+    """
+    key_pressed = pyqtSignal(int)
+    mouse_pressed = pyqtSignal(int, int)
+    mouse_moved = pyqtSignal(int, int)
+    mouse_released = pyqtSignal(int, int)
+
     def __init__(self, roi_selector):
         super().__init__()
         self.roi_selector = roi_selector
+        self.view = ViewModel(UI_TEXT_REFRESH_RATE)
+        self.roi_grid = RoiStatusGrid(300, 250)
         self.initUI()
         self.status = "수업 중"
         self.current_frame = None
 
+        # 영상 표시 (처리 속도와 별개로 DISPLAY_REFRESH_RATE 주기로 갱신)
+        self.display_interval = 1.0 / DISPLAY_REFRESH_RATE if DISPLAY_REFRESH_RATE else 0.0
+        self.pending_frame = None
+        self.last_display = None
+        self.display_key = None    # (라벨 크기, 프레임 크기), 바뀔 때만 표시 크기 다시 계산
+        self.display_size = None
+        self.display_timer = QTimer(self)   # 새 프레임이 있을 때만 다음 갱신 시각에 한 번 실행
+        self.display_timer.setSingleShot(True)
+        self.display_timer.timeout.connect(self._display_due)
+
     def initUI(self):
         main_widget = QWidget()
         self.setCentralWidget(main_widget)
@@ -284,9 +435,24 @@ class StatusUI(QMainWindow):
             background-color: #1e1e1e;
             border-radius: 10px;
         """)
+        self.video_label.setAlignment(Qt.AlignCenter)
+        self.video_label.installEventFilter(self)   # ROI 선택용 마우스 입력
         video_layout.addWidget(self.video_label)
         layout.addWidget(video_frame, 2)
 
+        # 영상 위에 표시하는 FPS/단계별 지연 시간 (p 키로 전환)
+        self.profile_label = QLabel(self.video_label)
+        self.profile_label.setStyleSheet("""
+            font-family: 'Courier New', monospace;
+            font-size: 12px;
+            color: #00ff88;
+            background-color: rgba(0, 0, 0, 170);
+            border-radius: 5px;
+            padding: 6px;
+        """)
+        self.profile_label.move(10, 10)
+        self.profile_label.hide()
+
         # 오른쪽 레이아웃
         right_frame = QFrame()
         right_layout = QVBoxLayout(right_frame)
@@ -321,6 +487,7 @@ class StatusUI(QMainWindow):
             margin: 5px;
         """)
         status_layout.addWidget(self.status_message)
+        self.view.bind("status", self.status_message, STATUS_MESSAGE_STYLES)
         right_layout.addWidget(status_section)
 
         # 위치 현황 섹션
@@ -359,105 +526,122 @@ class StatusUI(QMainWindow):
         self.setGeometry(100, 100, 1400, 800)
         self.show()
 
+    def toggle_profile_overlay(self):
+        """FPS/단계별 지연 시간 표시 전환"""
+        self.profile_label.setVisible(not self.profile_label.isVisible())
+
+    def update_profile_overlay(self, lines):
+        if not self.profile_label.isVisible():
+            return
+        self.profile_label.setText("\n".join(lines))
+        self.profile_label.adjustSize()
+
     def update_frame(self, frame):
-        self.current_frame = frame
-        rgb_image = cv.cvtColor(frame, cv.COLOR_BGR2RGB)
-        h, w, ch = rgb_image.shape
-        bytes_per_line = ch * w
-        qt_image = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-
-        # QLabel 크기 가져오기
-        label_width = self.video_label.width()
-        label_height = self.video_label.height()
-
-        # 동영상 크기 비율에 맞차서 비디오를 중앙에 발침
-        scaled_pixmap = QPixmap.fromImage(qt_image).scaled(
-            label_width, label_height, Qt.KeepAspectRatio
-        )
+        """표시할 프레임 교체 (실제 그리기는 갱신 주기에 맞춰 refresh_display()에서)
 
-        # 비디오 프레임 앙 발침
-        self.video_label.setPixmap(scaled_pixmap)
-        self.video_label.setAlignment(Qt.AlignCenter)
+        Args:
+            frame: BGR 프레임 또는 표시할 때 프레임을 만드는 함수 (여러 카메라 영상 합치기 등)
+        """
+        self.pending_frame = frame
+        self._schedule_display()
 
-    def update_roi_status(self, person_present, drowsy_status):
-        # ROI 수에 맞게 그리드 계산
+    def _schedule_display(self):
+        if self.display_timer.isActive():
+            return
+        delay = 0.0
+        if self.last_display is not None:
+            delay = self.last_display + self.display_interval - time.monotonic()
+        self.display_timer.start(max(0, math.ceil(delay * 1000)))
+
+    def _display_due(self):
+        start = time.perf_counter()
+        if self.refresh_display():
+            PROFILER.record('update_frame', time.perf_counter() - start)
+        elif self.pending_frame is not None:
+            self._schedule_display()
+
+    def refresh_display(self, now=None):
+        """갱신 주기가 지났고 새 프레임이 있으면 화면에 표시 (표시했으면 True)"""
+        if self.pending_frame is None:
+            return False
+        now = time.monotonic() if now is None else now
+        if self.last_display is not None and now - self.last_display < self.display_interval:
+            return False
+        self.last_display = now
+        frame = self.pending_frame() if callable(self.pending_frame) else self.pending_frame
+        self.pending_frame = None
+        if frame is None:
+            return False
+        frame = np.ascontiguousarray(frame)
+        self.current_frame = frame
+
+        # BGR 버퍼를 그대로 감싸서 사용 (색상 변환 복사 없음)
+        h, w = frame.shape[:2]
+        qt_image = QImage(frame.data, w, h, frame.strides[0], QImage.Format_BGR888)
+
+        # 동영상 비율을 유지한 표시 크기는 라벨이나 프레임 크기가 바뀔 때만 계산
+        label_size = self.video_label.size()
+        key = (label_size.width(), label_size.height(), w, h)
+        if key != self.display_key:
+            self.display_key = key
+            self.display_size = QSize(w, h).scaled(label_size, Qt.KeepAspectRatio)
+        if self.display_size != qt_image.size():
+            qt_image = qt_image.scaled(self.display_size)
+
+        # QPixmap으로 복사한 뒤에는 프레임 버퍼를 참조하지 않음
+        self.video_label.setPixmap(QPixmap.fromImage(qt_image))
+        return True
+
+    def keyPressEvent(self, event):
+        text = event.text()
+        if text:
+            self.key_pressed.emit(ord(text[0].lower()))
+        else:
+            super().keyPressEvent(event)
+
+    def frame_position(self, pos):
+        """영상 라벨 위의 위치를 표시 중인 프레임 좌표로 변환 (표시한 프레임이 없으면 None)"""
+        if self.current_frame is None or self.display_size is None:
+            return None
+        h, w = self.current_frame.shape[:2]
+        rect = self.video_label.contentsRect()
+        left = rect.x() + (rect.width() - self.display_size.width()) / 2
+        top = rect.y() + (rect.height() - self.display_size.height()) / 2
+        x = (pos.x() - left) * w / self.display_size.width()
+        y = (pos.y() - top) * h / self.display_size.height()
+        return min(max(int(x), 0), w - 1), min(max(int(y), 0), h - 1)
+
+    def eventFilter(self, obj, event):
+        if obj is self.video_label and event.type() in (
+                QEvent.MouseButtonPress, QEvent.MouseMove, QEvent.MouseButtonRelease):
+            point = self.frame_position(event.pos())
+            if point is not None:
+                if event.type() == QEvent.MouseMove:
+                    self.mouse_moved.emit(*point)
+                elif event.button() == Qt.LeftButton:
+                    if event.type() == QEvent.MouseButtonPress:
+                        self.mouse_pressed.emit(*point)
+                    else:
+                        self.mouse_released.emit(*point)
+        return super().eventFilter(obj, event)
+
+    def update_roi_status(self, snapshot):
+        """ROI 상태 격자와 전체 현황 갱신 (snapshot: roi_state.RoiStateSnapshot)"""
         num_rois = len(self.roi_selector.rois)
         if num_rois == 0:
             return
-        
-        # ROI 표시를 위한 그리드 계산
-        cols = min(3, num_rois)  # 최대 3열
-        rows = (num_rois + cols - 1) // cols  # 행 수 계산
-        
-        # 각 ROI 칸의 크기 계산
-        cell_width = 300 // cols
-        cell_height = 250 // rows
-        
-        # ROI 상태 표시 영역 생성
-        roi_pixmap = QPixmap(300, 250)
-        roi_pixmap.fill(QColor("#2d2d2d"))
-        painter = QPainter(roi_pixmap)
-        painter.setRenderHint(QPainter.Antialiasing)
 
-        # 지정된 ROI 개수만큼만 처리
-        for i in range(num_rois):
-            # 주의 상태 확인
-            warning_state = False
-            if person_present[i] and quad_data[i]['head_down_duration'] >= HEAD_DOWN_WARNING_TIME:
-                warning_state = True
-
-            if drowsy_status[i]:
-                color = QColor("#ff4444")  # 빨간색 (졸음)
-                status = "졸음"
-            elif warning_state:
-                color = QColor("#ffff44")  # 노란색 (주의)
-                status = "주의"
-            elif person_present[i]:
-                color = QColor("#28a745")  # 초록색 (정상)
-                status = "정상"
-            else:
-                color = QColor("#666666")  # 회색 (부재)
-                status = ""
-
-            # ROI 위치 계산
-            row = i // cols
-            col = i % cols
-            x = col * cell_width
-            y = row * cell_height
-            
-            # 그라데이션 효과 추가
-            gradient = QLinearGradient(x, y, x + cell_width, y + cell_height)
-            gradient.setColorAt(0, color.lighter(120))
-            gradient.setColorAt(1, color)
-            
-            painter.setBrush(QBrush(gradient))
-            painter.setPen(QPen(Qt.black, 2))
-            
-            # 둥근 사각형으로 그리기 (여백 추가)
-            margin = 2
-            painter.drawRoundedRect(
-                x + margin, 
-                y + margin, 
-                cell_width - 2*margin, 
-                cell_height - 2*margin, 
-                10, 10
-            )
+        # ROI별 상태 (졸음/주의/정상/부재)
+        states = [ROI_TILE_STATES[code] for code in snapshot.state[:num_rois]]
 
-            # 텍스트 추가
-            painter.setPen(Qt.black if warning_state else Qt.white)  # 주의 상태일 때는 검은색 텍스트
-            font = QFont("Arial", 8 if num_rois > 6 else 10, QFont.Bold)
-            painter.setFont(font)
-            text_rect = QRectF(x, y + cell_height/3, cell_width, cell_height/2)
-            painter.drawText(text_rect, Qt.AlignCenter, f"ROI {i+1}\n{status}")
-
-        painter.end()
-        self.roi_label.setPixmap(roi_pixmap)
+        # 상태가 바뀐 칸만 다시 그림
+        if self.roi_grid.update(states):
+            self.roi_label.setPixmap(self.roi_grid.pixmap)
 
         # 전체 상태 정보 업데이트
-        total_people = sum(person_present[:num_rois])
-        drowsy_people = sum(drowsy_status[:num_rois])
-        warning_people = sum(1 for i in range(num_rois) if person_present[i] and 
-                            HEAD_DOWN_WARNING_TIME <= quad_data[i]['head_down_duration'] < HEAD_DOWN_DROWSY_TIME)
+        total_people = int(snapshot.present[:num_rois].sum())
+        drowsy_people = states.count("drowsy")
+        warning_people = states.count("warning")
         normal_people = total_people - drowsy_people - warning_people
 
         status_text = (
@@ -468,40 +652,14 @@ class StatusUI(QMainWindow):
             f"졸음: {drowsy_people}명"
         )
 
-        # 상태에 따른 스타일 설정
+        # 상태에 따른 스타일 설정 (바뀐 경우에만 적용)
         if drowsy_people > 0:
-            status_style = """
-                font-size: 22px;
-                font-weight: bold;
-                color: #ffffff;
-                background-color: #ff4444;
-                border-radius: 10px;
-                padding: 20px;
-                margin: 5px;
-            """
+            status_style = "drowsy"
         elif warning_people > 0:
-            status_style = """
-                font-size: 22px;
-                font-weight: bold;
-                color: #000000;
-                background-color: #ffff44;
-                border-radius: 10px;
-                padding: 20px;
-                margin: 5px;
-            """
+            status_style = "warning"
         else:
-            status_style = """
-                font-size: 22px;
-                font-weight: bold;
-                color: #ffffff;
-                background-color: #44aa44;
-                border-radius: 10px;
-                padding: 20px;
-                margin: 5px;
-            """
-
-        self.status_message.setStyleSheet(status_style)
-        self.status_message.setText(status_text)
+            status_style = "normal"
+        self.view.update("status", status_style, status_text)
 
     def closeEvent(self, event):
         QApplication.quit()
@@ -511,6 +669,7 @@ class InfoWindow(QMainWindow):
     """상세 정보 표시 UI"""
     def __init__(self):
         super().__init__()
+        self.view = ViewModel(UI_TEXT_REFRESH_RATE)
         self.initUI()
 
     def update_roi_count(self, count):
@@ -519,20 +678,14 @@ class InfoWindow(QMainWindow):
         for label in self.info_labels:
             label.setParent(None)
         self.info_labels.clear()
+        self.view.clear()
 
         # 새 레이블 생성
         for i in range(count):
-            label = QLabel(f"학생 {i+1}이 자리에 없습니다.")
+            label = QLabel()
             label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-            label.setStyleSheet("""
-                font-size: 20px;
-                font-weight: bold;
-                color: #888888;
-                background-color: #2d2d2d;
-                border-radius: 10px;
-                padding: 15px;
-                margin: 5px;
-            """)
+            self.view.bind(i, label, INFO_LABEL_STYLES)
+            self.view.update(i, "absent", f"학생 {i+1}이 자리에 없습니다.")
             self.scroll_layout.addWidget(label)
             self.info_labels.append(label)
 
@@ -597,19 +750,29 @@ class InfoWindow(QMainWindow):
         self.setGeometry(1550, 100, 600, 800)
         self.show()
 
-    def update_info(self, head_angle, head_direction, region):
-        # 상태 판단
+    def update_info(self, head_angle, head_direction, region, snapshot):
+        # 상태 판단 (snapshot: 같은 프레임의 roi_state.RoiStateSnapshot)
         status = "정상"
         details = []
-        
+        duration = float(snapshot.head_down_duration[region])
+
         # 머리 숙임 상태 확인
         if head_angle > HEAD_DOWN_ANGLE_THRESHOLD:
-            if quad_data[region]['head_down_duration'] >= HEAD_DOWN_DROWSY_TIME:
+            if duration >= HEAD_DOWN_DROWSY_TIME:
                 status = "졸음 감지"
-                details.append(f"머리 숙임 ({int(quad_data[region]['head_down_duration'])}초)")
-            elif quad_data[region]['head_down_duration'] >= HEAD_DOWN_WARNING_TIME:
+                details.append(f"머리 숙임 ({int(duration)}초)")
+            elif duration >= HEAD_DOWN_WARNING_TIME:
                 status = "주의"
-                details.append(f"머리 숙임 ({int(quad_data[region]['head_down_duration'])}초)")
+                details.append(f"머리 숙임 ({int(duration)}초)")
+
+        # 눈 감김 비율 확인
+        perclos = snapshot.perclos_value(region)
+        if perclos is not None and perclos >= PERCLOS_WARNING_THRESHOLD:
+            if perclos >= PERCLOS_DROWSY_THRESHOLD:
+                status = "졸음 감지"
+            elif status == "정상":
+                status = "주의"
+            details.append(f"눈 감김 ({perclos:.0%})")
         
         # 상태 정보 구성
         info_text = (
@@ -617,159 +780,174 @@ class InfoWindow(QMainWindow):
             f"{'─' * 40}\n"
             f"머리 각도 정보:\n"
             f"• Pitch: {int(head_angle)}° {'(머리 숙임)' if head_angle > HEAD_DOWN_ANGLE_THRESHOLD else ''}\n"
+            f"• PERCLOS: {'측정 중' if perclos is None else f'{perclos:.0%}'}\n"
             f"{'─' * 40}\n"
             f"현재 자세: {head_direction}\n"
             f"특이사항: {', '.join(details) if details else '없음'}\n"
-            f"지속시간: {quad_data[region]['head_down_duration']:.1f}초"
+            f"지속시간: {duration:.1f}초"
         )
         
-        # 상태별 스타일 설정
-        if status == "졸음 감지":
-            style = """
-                font-size: 20px;
-                font-weight: bold;
-                color: #ffffff;
-                background-color: #ff4444;
-                border-radius: 10px;
-                padding: 15px;
-                margin: 5px;
-            """
-        elif status == "주의":
-            style = """
-                font-size: 20px;
-                font-weight: bold;
-                color: #000000;
-                background-color: #ffff44;
-                border-radius: 10px;
-                padding: 15px;
-                margin: 5px;
-            """
-        else:
-            style = """
-                font-size: 20px;
-                font-weight: bold;
-                color: #ffffff;
-                background-color: #44aa44;
-                border-radius: 10px;
-                padding: 15px;
-                margin: 5px;
-            """
-        
-        # 스타일과 텍스트 적용
-        self.info_labels[region].setStyleSheet(style)
-        self.info_labels[region].setText(info_text)
+        # 스타일은 상태가 바뀔 때만, 텍스트는 UI_TEXT_REFRESH_RATE 주기로 적용
+        self.view.update(region, INFO_STATUS_STYLES[status], info_text)
 
     def reset_info(self, region):
-        self.info_labels[region].setText(
+        self.view.update(
+            region, "absent",
             f"▶ 학생 {region + 1}\n"
             f"{'─' * 40}\n"
             f"상태: 자리 비움\n"
             f"{'─' * 40}\n"
             f"특이사항: 없음"
         )
-        self.info_labels[region].setStyleSheet("""
-            font-size: 20px;
-            font-weight: bold;
-            color: #888888;
-            background-color: #2d2d2d;
-            border-radius: 10px;
-            padding: 15px;
-            margin: 5px;
-        """)
 
     def closeEvent(self, event):
         QApplication.quit()
         sys.exit(0)
 
-#-------------------------------------------
-# 처리 클래스
-#-------------------------------------------
+class ResultRelay(QObject):
+    """처리 스레드의 결과를 GUI 스레드로 전달 (queued signal)
 
-class QuadrantProcessor:
-    """ROI별 MediaPipe 처리기"""
-    def __init__(self, quadrant_id):
-        self.quadrant_id = quadrant_id
-        self.face_mesh = mp.solutions.face_mesh.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=MIN_DETECTION_CONFIDENCE,
-            min_tracking_confidence=MIN_TRACKING_CONFIDENCE,
-            static_image_mode=False
-        )
-        self.pose = mp.solutions.pose.Pose(
-            static_image_mode=False,
-            model_complexity=2,
-            smooth_landmarks=True,
-            enable_segmentation=False,
-            min_detection_confidence=MIN_DETECTION_CONFIDENCE,
-            min_tracking_confidence=MIN_TRACKING_CONFIDENCE
-        )
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_pose = mp.solutions.pose
-        self.head_down_duration = 0
+    전달 스레드가 source.get()으로 꺼낸 결과를 result 시그널로 보내며, 슬롯은 GUI 스레드의
+    Qt 이벤트 루프에서 실행됩니다. GUI가 아직 처리하지 않은 결과가 max_pending개면 전달을 멈추고
+    기다리므로 이벤트 큐에 결과가 쌓이지 않습니다.
+
+    Args:
+        max_pending: GUI 스레드에 넘겨 둘 최대 결과 수 (슬롯은 처리 후 done() 호출)
+    """
+    result = pyqtSignal(object)
+    finished = pyqtSignal()   # source의 입력이 끝났거나 처리 중 오류 (error 참고)
+
+    def __init__(self, max_pending):
+        super().__init__()
+        self.slots = threading.Semaphore(max_pending)
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.error = None
+
+    def start(self, source):
+        """source(get(timeout)/finished 제공, 예: Pipeline)의 결과 전달 시작"""
+        self.thread = threading.Thread(target=self._run, args=(source,), name="result-relay", daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self, source):
+        try:
+            while not self.stop_event.is_set():
+                item = source.get(timeout=RELAY_POLL_INTERVAL)
+                if item is None:
+                    if source.finished:
+                        break
+                    continue
+                while not self.slots.acquire(timeout=RELAY_POLL_INTERVAL):
+                    if self.stop_event.is_set():
+                        return
+                self.result.emit(item)
+        except Exception as e:
+            self.error = e
+        if not self.stop_event.is_set():
+            self.finished.emit()
+
+    @property
+    def stopped(self):
+        return self.stop_event.is_set()
+
+    def done(self):
+        """슬롯에서 결과 하나를 처리한 뒤 호출"""
+        self.slots.release()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
 
 #-------------------------------------------
 # 메인 함수
 #-------------------------------------------
 
-def detect_person_pose():
-    """메인 처리 함수"""
-    global roi_selector
-    
-    # MediaPipe 초기화
+def draw_landmark_array(image, landmarks, connections, color, thickness):
+    """(랜드마크 수, 4) 배열 형태의 랜드마크 그리기 (기록하지 않은 점은 NaN이므로 건너뜀)"""
+    h, w = image.shape[:2]
+    points = {}
+    for idx, (x, y) in enumerate(landmarks[:, :2]):
+        if not (np.isnan(x) or np.isnan(y)):
+            points[idx] = (int(x * w), int(y * h))
+    for start, end in connections:
+        if start in points and end in points:
+            cv.line(image, points[start], points[end], color, thickness)
+    for point in points.values():
+        cv.circle(image, point, thickness, color, -1)
+
+def draw_roi_results(frame, rois, results):
+    """ROI별 Face Mesh / Pose 랜드마크 그리기 (기록에서 재생한 배열 형태 포함)"""
     mp_face_mesh = mp.solutions.face_mesh
     mp_pose = mp.solutions.pose
     mp_drawing = mp.solutions.drawing_utils
+    for (roi, _), result in zip(rois, results):
+        x1, y1, x2, y2 = roi
+        roi_frame = frame[y1:y2, x1:x2]
+        if isinstance(result['face_landmarks'], np.ndarray):
+            # 배열 형태의 랜드마크 (기록에서 재생했거나 shared_frame 감지기)
+            draw_landmark_array(roi_frame, result['face_landmarks'], mp_face_mesh.FACEMESH_CONTOURS,
+                                (0, 255, 0), 1)
+        elif result['face_landmarks'] is not None:
+            # Face Mesh 랜드마크 그리기
+            mp_drawing.draw_landmarks(
+                roi_frame,
+                result['face_landmarks'],
+                mp_face_mesh.FACEMESH_CONTOURS,
+                mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=1, circle_radius=1),
+                mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=1)
+            )
+        if isinstance(result['pose_landmarks'], np.ndarray):
+            draw_landmark_array(roi_frame, result['pose_landmarks'], mp_pose.POSE_CONNECTIONS,
+                                (245, 66, 230), 2)
+        elif result['pose_landmarks'] is not None:
+            # Pose 랜드마크 그리기
+            mp_drawing.draw_landmarks(
+                roi_frame,
+                result['pose_landmarks'],
+                mp_pose.POSE_CONNECTIONS,
+                mp_drawing.DrawingSpec(color=(245,117,66), thickness=2, circle_radius=2),
+                mp_drawing.DrawingSpec(color=(245,66,230), thickness=2)
+            )
+
+def detect_person_pose(video_source=VIDEO_SOURCE):
+    """메인 처리 함수"""
+    global roi_selector
     
     info_window = InfoWindow()
     
     # ROI 선택기 초기화
     roi_selector = ROISelector(info_window)
     
-    # StatusUI 초기화 - 여기로 이동
+    # StatusUI 초기화 - ROI 선택도 메인 화면에서 진행
     ui = StatusUI(roi_selector)
     
-    cv.namedWindow("Pose Estimation")
-    cv.setMouseCallback("Pose Estimation", mouse_callback, roi_selector)
-    
     try:
-        # 비디오 캡처 초기화
-        video_path = "video3.mp4"
-        cap = cv.VideoCapture(video_path)
+        # 비디오 캡처 초기화 (별도 스레드에서 읽기)
+        cap = open_capture(video_source, CAPTURE_QUEUE_SIZE, CAPTURE_DROP_POLICY)
         if not cap.isOpened():
-            print(f"Error: Could not open video file: {video_path}")
+            print(f"Error: Could not open video source: {video_source}")
             return
 
         # 비디오 속성 설정
         original_width = int(cap.get(cv.CAP_PROP_FRAME_WIDTH))
         original_height = int(cap.get(cv.CAP_PROP_FRAME_HEIGHT))
-        fps = int(cap.get(cv.CAP_PROP_FPS))
-        frame_delay = int(1000/fps)
+        fps = int(cap.get(cv.CAP_PROP_FPS)) or 30  # 카메라는 FPS를 알려주지 않을 수 있음
+
+        # 프레임 시각 기준: 라이브 소스는 캡처 시각, 영상 파일은 영상 내 재생 위치
+        clock = create_clock(video_source, cap.get(cv.CAP_PROP_FPS), PLAYBACK_PACING)
 
         # 목표 크기 설정
-        target_height = 720
+        target_height = TARGET_FRAME_HEIGHT
         target_width = int(original_width * (target_height / original_height))
 
-        # 전체 화면 크기 설정
-        total_width = target_width + 600
-        total_height = max(target_height, 600)
-
-        # 비디오 저장 설정
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_path = f"output/output_video_{timestamp}.avi"
-        
-        # output 폴더가 없으면 생성
-        os.makedirs("output", exist_ok=True)
-        
-        # VideoWriter 설정 - 여기로 이동
-        fourcc = cv.VideoWriter_fourcc(*'XVID')
-        out = cv.VideoWriter(
-            output_path, 
-            fourcc, 
-            fps, 
-            (total_width, total_height),
-            True
-        )
+        # 결과 영상 녹화 (별도 스레드에서 인코딩, 첫 프레임을 저장할 때 파일 생성)
+        if RECORD_VIDEO:
+            recorder = VideoRecorder(
+                RECORD_DIR, fps, RECORD_RESOLUTION, RECORD_CODEC, RECORD_DECIMATION,
+                RECORD_QUEUE_SIZE, RECORD_DROP_POLICY, RECORD_SEGMENT_SECONDS
+            ).start()
 
         # 첫 프레임 읽기
         ret, first_frame = cap.read()
@@ -780,175 +958,453 @@ def detect_person_pose():
         # 프레임 크기 조정
         first_frame = cv.resize(first_frame, (target_width, target_height))
         
-        # ROI 선택 모드
-        print("ROI를 선택하세요. 선택 완료 후 시작 버튼을 누르세요.")
-        print("r: ROI 초기화, ESC: 종료")
-        selecting_roi = True
-        
-        while selecting_roi:
+        # 랜드마크 재생: ROI는 기록에서 불러오고 선택 단계 생략
+        if LANDMARK_REPLAY_DIR:
+            recording = LandmarkRecording(LANDMARK_REPLAY_DIR)
+            if recording.frame_size and tuple(recording.frame_size) != (target_width, target_height):
+                print(f"Error: 기록한 프레임 크기 {recording.frame_size}와 영상 크기가 다릅니다")
+                return
+            roi_selector.rois = recording.rois
+            info_window.update_roi_count(len(roi_selector.rois))
+            roi_selector.on_start_clicked()
+            print(f"랜드마크 기록을 재생합니다: {LANDMARK_REPLAY_DIR} ({len(recording)} 프레임)")
+        else:
+            # ROI 선택 모드
+            print("ROI를 선택하세요. 선택 완료 후 시작 버튼을 누르세요.")
+            print("r: ROI 초기화, s: ROI 레이아웃 저장, ESC: 종료")
+
+        # ROI 선택: 마우스/키 입력이나 ROI가 바뀔 때만 첫 프레임에 ROI를 다시 그림
+        selection = QEventLoop()
+
+        def redraw_selection():
             temp_frame = first_frame.copy()
             roi_selector.draw_rois(temp_frame)
-            cv.imshow("Pose Estimation", temp_frame)
+            ui.update_frame(temp_frame)
 
-            key = cv.waitKey(1) & 0xFF
+        def on_mouse_pressed(x, y):
+            roi_selector.start_roi(x, y)
+            redraw_selection()
+
+        def on_mouse_moved(x, y):
+            if roi_selector.drawing:
+                roi_selector.update_roi(x, y)
+                redraw_selection()
+
+        def on_mouse_released(x, y):
+            if roi_selector.drawing:
+                roi_selector.update_roi(x, y)
+                roi_selector.finish_roi()
+                redraw_selection()
+
+        def on_selection_key(key):
             if key == ord('r'):  # ROI 리셋
                 roi_selector.rois = []
                 roi_selector.start_button.hide()
                 info_window.update_roi_count(0)
+                redraw_selection()
                 print("ROI가 초기화되었습니다.")
+            elif key == ord('s') and roi_selector.rois:  # 헤드리스 모드용 레이아웃 저장
+                save_roi_layout(ROI_LAYOUT_PATH, roi_selector.rois, (target_width, target_height))
+                print(f"ROI 레이아웃이 저장되었습니다: {ROI_LAYOUT_PATH}")
             elif key == 27:  # ESC 키로 종료
-                return
-            
-            # 시작 버튼이 클릭되었는지 확인
-            if roi_selector.is_ready:
-                selecting_roi = False
-                quadrant_processors = [QuadrantProcessor(i) for i in range(len(roi_selector.rois))]
-                quad_data = create_quad_data(len(roi_selector.rois))
-            
-            app.processEvents()
-
-        # 메인 처리 루프
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                print("Video ended")
-                break
-
-            # 프레임 크기 조정
-            frame = cv.resize(frame, (target_width, target_height))
-            img_h, img_w = frame.shape[:2]
+                selection.quit()
+
+        selection_signals = [
+            (ui.mouse_pressed, on_mouse_pressed), (ui.mouse_moved, on_mouse_moved),
+            (ui.mouse_released, on_mouse_released), (ui.key_pressed, on_selection_key),
+            (roi_selector.start_button.clicked, selection.quit),
+        ]
+        if not roi_selector.is_ready:
+            for signal, slot in selection_signals:
+                signal.connect(slot)
+            redraw_selection()
+            selection.exec_()   # 시작 버튼 또는 ESC까지 Qt 이벤트 루프에서 대기
+            for signal, slot in selection_signals:
+                signal.disconnect(slot)
+        if not roi_selector.is_ready:
+            return
 
-            # 상태 변수 초기화
-            person_present = [False] * len(roi_selector.rois)
-            drowsy_status = [False] * len(roi_selector.rois)
+        # ROI 상태는 추론 단계에서만 갱신하고, 상태 창은 프레임마다 찍은 snapshot을 읽음
+        state_store = RoiStateStore(len(roi_selector.rois))
+        if LANDMARK_REPLAY_DIR:
+            detector = ReplayDetector(recording)
+        else:
+            detector = create_roi_detector(
+                INFERENCE_MODE, roi_selector.rois, (target_height, target_width, 3),
+                INFERENCE_WORKERS, DETECTION_CASCADE
+            )
+        roi_inference = RoiInference(
+            detector,
+            state_store, ADAPTIVE_INFERENCE, INFERENCE_RATE_POLICY,
+            LATENCY_TARGET_MS / 1000 if LATENCY_TARGET_MS else None,
+            MOTION_GATING, ANGLE_SMOOTHING
+        )
+        if EVENT_LOG_DIR:
+            event_log = EventLog(EVENT_LOG_DIR, len(roi_selector.rois))
+        if LANDMARK_RECORD_DIR:
+            landmark_recorder = LandmarkRecorder(
+                LANDMARK_RECORD_DIR, roi_selector.rois, fps, (target_width, target_height),
+                LANDMARK_RECORD_DTYPE, LANDMARK_RECORD_POINTS, source=str(video_source)
+            )
+        if INFERENCE_MODE == MODE_PROCESS_POOL and not LANDMARK_REPLAY_DIR:
+            print(f"ROI {len(roi_selector.rois)}개를 작업자 {roi_inference.detector.num_workers}개에 분산합니다.")
 
-            # ROI 그리기
+        # 디코딩 단계: 프레임 읽기 및 크기 조정
+        def decode_frame():
+            start = time.perf_counter()
+            ret, frame, frame_info = cap.read_frame()
+            if not ret:
+                return None
+            resize_start = time.perf_counter()
+            frame = cv.resize(frame, (target_width, target_height))
+            PROFILER.record('cap.read', resize_start - start)
+            PROFILER.record('resize', time.perf_counter() - resize_start)
+            return {'frame': frame, 'time': clock.tick(frame_info)}
+
+        # 추론 단계: ROI별 Face Mesh / Pose 처리 및 머리 숙임 상태 갱신
+        def infer_frame(item):
+            rois = roi_selector.rois
+            item['rois'] = rois
+            if rois is roi_inference.rois:
+                item['results'] = roi_inference.process(item['frame'], item['time'])
+                item['snapshot'] = roi_inference.states.snapshot()
+                if LANDMARK_RECORD_DIR:
+                    landmark_recorder.write(item['time'], roi_inference.last_detections)
+            else:
+                item['results'] = []  # ROI가 초기화됨
+                item['snapshot'] = None
+            return item
+
+        # 렌더링 단계: ROI 영역과 랜드마크 그리기
+        def draw_frame(item):
+            start = time.perf_counter()
+            frame = item['frame']
             roi_selector.draw_rois(frame)
-
-            # 각 ROI에 대해 처리
-            for roi_idx, (roi, roi_name) in enumerate(roi_selector.rois):
-                x1, y1, x2, y2 = roi
-                roi_frame = frame[y1:y2, x1:x2]
-                
-                if roi_frame.size == 0:
-                    continue
-
-                # RGB 변환
-                rgb_roi = cv.cvtColor(roi_frame, cv.COLOR_BGR2RGB)
-                rgb_roi.flags.writeable = False
-                
-                # 해당 ROI의 프로세서 사용
-                processor = quadrant_processors[roi_idx]
-                face_results = processor.face_mesh.process(rgb_roi)
-                pose_results = processor.pose.process(rgb_roi)
-                
-                rgb_roi.flags.writeable = True
-
-                # 사람 감지 로직
-                person_detected = False
-
-                # Face Mesh 감지 확인
-                if face_results and face_results.multi_face_landmarks:
-                    person_detected = True
-                    face_landmarks = face_results.multi_face_landmarks[0]
-                    # Face Mesh 랜드마크 그리기
-                    mp_drawing.draw_landmarks(
-                        roi_frame,
-                        face_landmarks,
-                        mp_face_mesh.FACEMESH_CONTOURS,
-                        mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=1, circle_radius=1),
-                        mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=1)
-                    )
-
-                # Pose 감지 확인
-                if pose_results.pose_landmarks:
-                    person_detected = True
-                    # Pose 랜드마크 그리기
-                    mp_drawing.draw_landmarks(
-                        roi_frame,
-                        pose_results.pose_landmarks,
-                        mp_pose.POSE_CONNECTIONS,
-                        mp_drawing.DrawingSpec(color=(245,117,66), thickness=2, circle_radius=2),
-                        mp_drawing.DrawingSpec(color=(245,66,230), thickness=2)
+            draw_roi_results(frame, item['rois'], item['results'])
+            PROFILER.record('draw_landmarks', time.perf_counter() - start)
+            return item
+
+        PROFILER.enabled = PROFILING
+        PROFILER.configure_snapshots(PROFILE_SNAPSHOT_DIR, PROFILE_SNAPSHOT_INTERVAL)
+        if PROFILE_OVERLAY:
+            ui.toggle_profile_overlay()
+
+        pipeline = Pipeline(
+            decode_frame,
+            [("inference", infer_frame), ("render", draw_frame)],
+            queue_size=PIPELINE_QUEUE_SIZE
+        ).start()
+
+        # 결과는 전달 스레드가 queued signal로 보내고, GUI 스레드는 Qt 이벤트 루프에서 대기
+        relay = ResultRelay(PIPELINE_QUEUE_SIZE)
+        main_loop = QEventLoop()
+
+        def show_result(item):
+            frame = item['frame']
+            results = item['results']
+
+            # 처리 도중 ROI가 초기화되었으면 이전 결과는 표시하지 않음
+            if item['snapshot'] is not None and item['rois'] is roi_selector.rois:
+                snapshot = item['snapshot']
+
+                # 정보 창 업데이트
+                start = time.perf_counter()
+                for roi_idx, result in enumerate(results):
+                    if not result['processed']:
+                        continue
+                    if not result['person_present']:
+                        # 사람이 감지되지 않은 경우 정보 초기화
+                        info_window.reset_info(roi_idx)
+                    elif result['head_angle'] is not None:
+                        info_window.update_info(
+                            result['head_angle'], result['head_direction'], roi_idx, snapshot
+                        )
+
+                status_start = time.perf_counter()
+                PROFILER.record('info_window', status_start - start)
+
+                # 상태 전환/표본 기록
+                if EVENT_LOG_DIR:
+                    event_log.update(
+                        item['time'],
+                        [snapshot.state_name(i) for i in range(len(results))],
+                        [result['head_angle'] for result in results],
+                        snapshot.head_down_duration,
+                        [result['perclos'] for result in results],
+                        [result['processed'] for result in results]
                     )
 
-                # 사람 감지 상태 업데이트
-                person_present[roi_idx] = person_detected
-
-                # 사람이 감지된 경우에만 상태 정보 업데이트
-                if person_detected:
-                    if pose_results.pose_landmarks:
-                        head_angle = calculate_head_angle(pose_results.pose_landmarks.landmark)
-                        
-                        # 머리 숙임 상태 처리
-                        if head_angle > HEAD_DOWN_ANGLE_THRESHOLD:
-                            if quad_data[roi_idx]['head_down_start'] is None:
-                                quad_data[roi_idx]['head_down_start'] = time.time()
-                            quad_data[roi_idx]['head_down_duration'] = time.time() - quad_data[roi_idx]['head_down_start']
-                            
-                            if quad_data[roi_idx]['head_down_duration'] >= HEAD_DOWN_DROWSY_TIME:
-                                drowsy_status[roi_idx] = True
-                                head_direction = "졸음 감지"
-                            elif quad_data[roi_idx]['head_down_duration'] >= HEAD_DOWN_WARNING_TIME:
-                                head_direction = f"주의 ({int(quad_data[roi_idx]['head_down_duration'])}초)"
-                            else:
-                                head_direction = f"머리 숙임 감지 ({int(quad_data[roi_idx]['head_down_duration'])}초)"
-                        else:
-                            quad_data[roi_idx]['head_down_start'] = None
-                            quad_data[roi_idx]['head_down_duration'] = 0
-                            head_direction = "정상"
-
-                        # 정보 창 업데이트
-                        info_window.update_info(head_angle, head_direction, roi_idx)
-                else:
-                    # 사람이 감지되지 않은 경우 정보 초기화
-                    info_window.reset_info(roi_idx)
-                    quad_data[roi_idx]['head_down_start'] = None
-                    quad_data[roi_idx]['head_down_duration'] = 0
-
-            # UI 업데이트
-            ui.update_roi_status(person_present, drowsy_status)
+                # UI 업데이트
+                ui.update_roi_status(snapshot)
+                PROFILER.record('update_roi_status', time.perf_counter() - status_start)
+            # 화면 표시는 DISPLAY_REFRESH_RATE 주기로 예약 (처리 속도와 별개)
             ui.update_frame(frame)
+            if RECORD_VIDEO:
+                recorder.write(frame)
+            PROFILER.tick_frame()
 
-            # 화면 표시
-            cv.imshow("Pose Estimation", frame)
+        def on_result(item):
+            if relay.stopped:
+                return
+            try:
+                show_result(item)
+            except Exception as e:
+                relay.error = e
+                main_loop.quit()
+            finally:
+                relay.done()
+
+        def on_finished():
+            if relay.error is None:
+                print("Video ended")
+            main_loop.quit()
+
+        # 단계별 큐 깊이 표시 (1초마다)
+        def on_stats():
+            depths = pipeline.queue_depths()
+            ui.setWindowTitle(
+                "학습 환경 모니터링 시스템 - 큐 " +
+                " / ".join(f"{name} {depth}" for name, depth in depths.items())
+            )
+            ui.update_profile_overlay(PROFILER.overlay_lines())
+            PROFILER.maybe_dump()
 
-            # 키 입력 처리
-            key = cv.waitKey(1) & 0xFF
+        # 갱신 주기 때문에 미뤄진 상태 창 텍스트 적용
+        def flush_views():
+            info_window.view.flush()
+            ui.view.flush()
+
+        # 키 입력 처리 (메인 화면 StatusUI)
+        def on_key(key):
             if key == ord('q') or key == 27:  # q 또는 ESC로 종료
                 print("종료 요청됨")
-                break
+                main_loop.quit()
             elif key == ord('r'):  # r키로 ROI 초기화
                 roi_selector.rois = []
                 roi_selector.start_button.hide()
                 roi_selector.is_ready = False
                 info_window.update_roi_count(0)
                 print("ROI가 초기화되었습니다.")
-
-            # PyQt 이벤트 처리
-            app.processEvents()
+            elif key == ord('p'):  # p키로 FPS/단계별 지연 시간 표시 전환
+                ui.toggle_profile_overlay()
+                ui.update_profile_overlay(PROFILER.overlay_lines())
+
+        relay.result.connect(on_result)
+        relay.finished.connect(on_finished)
+        ui.key_pressed.connect(on_key)
+        stats_timer = QTimer()
+        stats_timer.timeout.connect(on_stats)
+        stats_timer.start(1000)
+        flush_timer = QTimer()
+        flush_timer.timeout.connect(flush_views)
+        if UI_TEXT_REFRESH_RATE:
+            flush_timer.start(int(1000 / UI_TEXT_REFRESH_RATE))
+
+        relay.start(pipeline)
+        main_loop.exec_()   # 영상 끝, 종료 키, 처리 오류까지 대기
+        stats_timer.stop()
+        flush_timer.stop()
+        relay.stop()
+        ui.key_pressed.disconnect(on_key)
+        if relay.error is not None:
+            raise relay.error
 
     except Exception as e:
         print(f"Error in detect_person_pose: {e}")
         raise e
     finally:
         # 리소스 해제
+        if 'relay' in locals():
+            relay.stop()
+        if 'pipeline' in locals():
+            pipeline.stop()
         if 'cap' in locals():
+            capture_stats = cap.stats()
+            print(f"캡처 통계 - 읽음: {capture_stats['frames_read']}, 버림: {capture_stats['frames_dropped']}")
             cap.release()
-        if 'out' in locals():
-            out.release()
-        if 'quadrant_processors' in locals():
-            for processor in quadrant_processors:
-                processor.face_mesh.close()
-                processor.pose.close()
-        cv.destroyAllWindows()
-        
+        if 'landmark_recorder' in locals():
+            landmark_recorder.close()
+            print(f"랜드마크 기록 저장: {LANDMARK_RECORD_DIR} ({landmark_recorder.stats()['frames']} 프레임)")
+        if 'event_log' in locals():
+            event_log.close()
+            print(f"상태 기록 저장: {EVENT_LOG_DIR} ({event_log.stats()['records']}건)")
+        if 'recorder' in locals():
+            recorder.close()
+            record_stats = recorder.stats()
+            if record_stats['error']:
+                print(f"녹화 오류: {record_stats['error']}")
+            print(f"녹화 - 저장: {record_stats['frames_written']}, 버림: {record_stats['frames_dropped']}, "
+                  f"파일: {', '.join(record_stats['files']) or '없음'}")
+        if PROFILER.enabled and PROFILER.frames:
+            snapshot = PROFILER.dump()
+            if snapshot is not None:
+                print(f"단계별 지연 시간 저장: {PROFILE_SNAPSHOT_DIR}")
+        if 'roi_inference' in locals():
+            skip_ratios = roi_inference.skip_ratios()
+            if skip_ratios is not None:
+                print("ROI별 추론 생략 비율: " + ", ".join(f"{ratio:.0%}" for ratio in skip_ratios))
+            motion_skip_ratios = roi_inference.motion_skip_ratios()
+            if motion_skip_ratios is not None:
+                print("ROI별 움직임 없음 생략 비율: " + ", ".join(f"{ratio:.0%}" for ratio in motion_skip_ratios))
+            stage_stats = roi_inference.stage_stats()
+            print(
+                f"감지 단계 - Pose 실행 {stage_stats['pose_run_rate']:.0%} (적중 {stage_stats['pose_hit_rate']:.0%}), "
+                f"얼굴 모델 실행 {stage_stats['face_run_rate']:.0%} (적중 {stage_stats['face_hit_rate']:.0%})"
+            )
+            roi_inference.close()
+
         # PyQt 창 닫기
         if 'ui' in locals():
             ui.close()
         if 'info_window' in locals():
             info_window.close()
 
+def monitor_streams(streams=MULTI_STREAMS):
+    """여러 카메라를 한 화면에서 모니터링 (ROI는 스트림별 레이아웃 파일에서 불러옴)"""
+    info_window = InfoWindow()
+    try:
+        monitor = MultiStreamMonitor(
+            streams, INFERENCE_MODE, INFERENCE_WORKERS, PLAYBACK_PACING, ADAPTIVE_INFERENCE,
+            MOTION_GATING, ANGLE_SMOOTHING, cascade=DETECTION_CASCADE
+        )
+    except (IOError, ValueError) as e:
+        print(f"Error: {e}")
+        return
+
+    # 상태 창은 모든 스트림의 ROI를 하나의 격자로 표시 (이름은 "스트림/ROI")
+    ui = StatusUI(monitor)
+    info_window.update_roi_count(len(monitor.rois))
+    for stream in monitor.streams:
+        print(f"{stream.name}: {stream.source} - ROI {len(stream.rois)}개, "
+              f"목표 {stream.fps_target or '제한 없음'} FPS")
+
+    event_logs = None
+    if EVENT_LOG_DIR:
+        event_logs = [EventLog(os.path.join(EVENT_LOG_DIR, stream.name), len(stream.rois))
+                      for stream in monitor.streams]
+
+    PROFILER.enabled = PROFILING
+    PROFILER.configure_snapshots(PROFILE_SNAPSHOT_DIR, PROFILE_SNAPSHOT_INTERVAL)
+    if PROFILE_OVERLAY:
+        ui.toggle_profile_overlay()
+
+    # 스트림별 마지막 처리 프레임 (화면에 표시할 때만 격자 한 장으로 합침)
+    frames = [None] * len(monitor.streams)
+
+    def compose_frames():
+        return tile_frames(frames)
+
+    relay = ResultRelay(PIPELINE_QUEUE_SIZE)
+    main_loop = QEventLoop()
+
+    def show_result(item):
+        stream = monitor.streams[item['stream']]
+        snapshot = item['snapshot']
+        results = item['results']
+
+        # 정보 창 업데이트 (전체 ROI 번호 기준)
+        for roi_idx, result in enumerate(results):
+            region = stream.offset + roi_idx
+            if not result['processed']:
+                continue
+            if not result['person_present']:
+                info_window.reset_info(region)
+            elif result['head_angle'] is not None:
+                info_window.update_info(result['head_angle'], result['head_direction'], region, snapshot)
+
+        # 상태 전환/표본 기록 (스트림별 폴더)
+        if event_logs is not None:
+            states = snapshot.view(stream.offset, stream.offset + len(stream.rois))
+            event_logs[item['stream']].update(
+                item['time'],
+                [states.state_name(i) for i in range(len(results))],
+                [result['head_angle'] for result in results],
+                states.head_down_duration,
+                [result['perclos'] for result in results],
+                [result['processed'] for result in results]
+            )
+
+        ui.update_roi_status(snapshot)
+        frame = item['frame']
+        draw_roi_boxes(frame, stream.rois)
+        draw_roi_results(frame, stream.rois, results)
+        cv.putText(frame, stream.name, (10, frame.shape[0] - 15),
+                   cv.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+        frames[item['stream']] = frame
+        ui.update_frame(compose_frames)
+        PROFILER.tick_frame()
+
+    def on_result(item):
+        if relay.stopped:
+            return
+        try:
+            show_result(item)
+        except Exception as e:
+            relay.error = e
+            main_loop.quit()
+        finally:
+            relay.done()
+
+    def on_finished():
+        if relay.error is None:
+            print("모든 스트림이 끝났습니다")
+        main_loop.quit()
+
+    # 스트림별 처리 FPS/지연 표시 (1초마다)
+    def on_stats():
+        metrics = monitor.metrics()
+        ui.setWindowTitle(
+            "학습 환경 모니터링 시스템 - " +
+            " / ".join(f"{m['name']} {m['fps']:.1f}FPS {m['lag_ms']:.0f}ms" for m in metrics)
+        )
+        ui.update_profile_overlay(monitor.metric_lines() + PROFILER.overlay_lines())
+
+    def flush_views():
+        info_window.view.flush()
+        ui.view.flush()
+
+    def on_key(key):
+        if key == ord('q') or key == 27:
+            print("종료 요청됨")
+            main_loop.quit()
+        elif key == ord('p'):
+            ui.toggle_profile_overlay()
+            ui.update_profile_overlay(monitor.metric_lines() + PROFILER.overlay_lines())
+
+    relay.result.connect(on_result)
+    relay.finished.connect(on_finished)
+    ui.key_pressed.connect(on_key)
+    stats_timer = QTimer()
+    stats_timer.timeout.connect(on_stats)
+    flush_timer = QTimer()
+    flush_timer.timeout.connect(flush_views)
+    monitor.start()
+    try:
+        stats_timer.start(1000)
+        if UI_TEXT_REFRESH_RATE:
+            flush_timer.start(int(1000 / UI_TEXT_REFRESH_RATE))
+        relay.start(monitor)
+        main_loop.exec_()   # 모든 스트림 끝, 종료 키, 처리 오류까지 대기
+        if relay.error is not None:
+            raise relay.error
+    finally:
+        stats_timer.stop()
+        flush_timer.stop()
+        relay.stop()
+        for line in monitor.metric_lines():
+            print(line)
+        monitor.stop()
+        if event_logs is not None:
+            for event_log in event_logs:
+                event_log.close()
+            print(f"상태 기록 저장: {EVENT_LOG_DIR}")
+        if PROFILER.enabled and PROFILER.frames:
+            snapshot = PROFILER.dump()
+            if snapshot is not None:
+                print(f"단계별 지연 시간 저장: {PROFILE_SNAPSHOT_DIR}")
+        ui.close()
+        info_window.close()
+
 #-------------------------------------------
 # 프로그램 시작점
 #-------------------------------------------
@@ -958,11 +1414,14 @@ if __name__ == "__main__":
     
     # 전역 변수 초기화
     roi_selector = None
-    quad_data = {}
     frame_count = 0
+    structured_log.configure(LOG_LEVEL, LOG_SAMPLE_EVERY, LOG_PATH)
     
     try:
-        detect_person_pose()
+        if MULTI_STREAMS:
+            monitor_streams(MULTI_STREAMS)
+        else:
+            detect_person_pose(sys.argv[1] if len(sys.argv) > 1 else VIDEO_SOURCE)
     except Exception as e:
         print(f"Error: {e}")
     finally:
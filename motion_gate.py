@@ -0,0 +1,112 @@
+"""
+움직임 기반 ROI 추론 생략
+- 고정 카메라에서는 대부분의 자리가 연속 프레임 사이에 거의 변하지 않음
+- ROI를 작은 회색조 영상으로 줄여 마지막 추론 때의 영상과 블록 단위로 비교
+- 의미 있는 변화가 없으면 MediaPipe를 건너뛰고 마지막 감지 결과(랜드마크, 머리 각도)를 재사용
+- 변화가 없어도 최대 재사용 시간이 지나면 다시 추론
+"""
+
+import cv2 as cv
+import numpy as np
+
+from detection import EMPTY_DETECTION
+
+MOTION_SAMPLE_SIZE = 32      # 비교용 축소 영상 크기 (정사각형, 픽셀)
+MOTION_BLOCKS = 4            # 축소 영상을 나누는 블록 수 (가로/세로)
+MOTION_THRESHOLD = 6.0       # 블록 평균 밝기 차이가 이 값 이상이면 변화로 판단 (0~255)
+MOTION_MAX_STALENESS = 2.0   # 변화가 없어도 다시 추론하는 최대 간격 (초)
+
+
+def roi_signature(roi_frame):
+    """ROI 영상을 비교용 작은 회색조 영상으로 변환"""
+    small = cv.resize(roi_frame, (MOTION_SAMPLE_SIZE, MOTION_SAMPLE_SIZE), interpolation=cv.INTER_AREA)
+    return cv.cvtColor(small, cv.COLOR_BGR2GRAY).astype(np.int16)
+
+def motion_score(signature, reference):
+    """두 축소 영상의 블록별 평균 밝기 차이 중 최댓값
+
+    전체 평균 대신 블록 최댓값을 사용하여 머리만 움직이는 작은 변화도 놓치지 않습니다.
+    """
+    block = MOTION_SAMPLE_SIZE // MOTION_BLOCKS
+    diff = np.abs(signature - reference)
+    return diff.reshape(MOTION_BLOCKS, block, MOTION_BLOCKS, block).mean(axis=(1, 3)).max()
+
+
+class MotionGate:
+    """ROI별 변화 여부로 추론 대상을 줄이는 게이트
+
+    사용 순서:
+        active = gate.select(frame, now, active)
+        detections = gate.merge(detector.detect(frame, active))
+
+    Args:
+        rois: [((x1, y1, x2, y2), name), ...] 형태의 ROI 목록
+        threshold: 변화로 판단할 블록 평균 밝기 차이
+        max_staleness: 변화가 없어도 다시 추론하는 최대 간격 (초)
+    """
+    def __init__(self, rois, threshold=MOTION_THRESHOLD, max_staleness=MOTION_MAX_STALENESS):
+        self.rois = rois
+        self.threshold = threshold
+        self.max_staleness = max_staleness
+
+        # 마지막으로 추론한 시점의 축소 영상과 감지 결과
+        self.references = [None] * len(rois)
+        self.refreshed_at = [None] * len(rois)
+        self.cached = [None] * len(rois)
+
+        # 통계
+        self.run_counts = [0] * len(rois)
+        self.skip_counts = [0] * len(rois)
+
+    def select(self, frame, now, active=None):
+        """이번 프레임에 추론할 ROI 목록 반환
+
+        Args:
+            frame: 전체 프레임
+            now: 현재 시각 (초)
+            active: 이미 정해진 추론 대상 (None이면 모든 ROI)
+        """
+        selected = []
+        for roi_idx, ((x1, y1, x2, y2), _) in enumerate(self.rois):
+            if active is not None and not active[roi_idx]:
+                selected.append(False)
+                continue
+            roi_frame = frame[y1:y2, x1:x2]
+            if roi_frame.size == 0:
+                selected.append(True)
+                continue
+
+            signature = roi_signature(roi_frame)
+            reference = self.references[roi_idx]
+            run = (
+                reference is None or self.cached[roi_idx] is None or
+                now - self.refreshed_at[roi_idx] >= self.max_staleness or
+                motion_score(signature, reference) >= self.threshold
+            )
+            if run:
+                self.references[roi_idx] = signature
+                self.refreshed_at[roi_idx] = now
+                self.run_counts[roi_idx] += 1
+            else:
+                self.skip_counts[roi_idx] += 1
+            selected.append(run)
+        return selected
+
+    def merge(self, detections):
+        """건너뛴 ROI(None)를 마지막 감지 결과로 채우고(reused=True), 새 감지 결과는 저장"""
+        merged = []
+        for roi_idx, detection in enumerate(detections):
+            if detection is None:
+                cached = self.cached[roi_idx]
+                detection = dict(cached, reused=True) if cached is not None else EMPTY_DETECTION
+            else:
+                self.cached[roi_idx] = detection
+            merged.append(detection)
+        return merged
+
+    def skip_ratios(self):
+        """ROI별 변화 없음으로 추론을 생략한 비율"""
+        return [
+            skips / (runs + skips) if runs + skips else 0.0
+            for runs, skips in zip(self.run_counts, self.skip_counts)
+        ]
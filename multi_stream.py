@@ -0,0 +1,575 @@
+"""
+다중 카메라 모니터링
+- 여러 영상 소스(카메라 번호, 스트림 URL, 영상 파일)를 한 프로세스에서 처리
+- 소스마다 ROI 레이아웃, 캡처/디코딩 스레드, 감지기를 따로 두고 추론은 하나의 스케줄러 스레드가 담당
+- 스트림별 목표 FPS와 가중치에 따라 추론 시간을 공평하게 배분 (느린 스트림이 다른 스트림을 굶기지 않음)
+- 모든 스트림의 ROI 상태는 하나의 RoiStateStore에 두고 스트림마다 view()로 나눠 사용
+- 스트림별 처리 FPS, 지연(프레임 준비 → 결과), 건너뛴 프레임 수, 추론 시간 점유율 집계
+
+사용 예:
+    python multi_stream.py --stream 0 rois_front.json 10 --stream rtsp://cam2/stream rois_back.json 5
+    python multi_stream.py --stream video1.mp4 rois1.json --stream video2.mp4 rois2.json --duration 60
+"""
+
+import argparse
+import collections
+import json
+import math
+import os
+import queue
+import sys
+import threading
+import time
+
+import cv2 as cv
+import numpy as np
+
+from AngleBuffer import SMOOTH_MEAN, SMOOTHING_MODES
+from capture import open_capture, is_live_source, parse_source
+from detection import CASCADE_OFF, CASCADE_MODES, resize_to_target
+from headless import ResultCollector
+from inference import create_roi_detector, RoiInference, MODE_SEQUENTIAL, MODE_SHARED_FRAME, INFERENCE_MODES
+from media_clock import create_clock, PACE_REALTIME, PACING_MODES
+from pipeline import Pipeline, PipelineError
+from roi_layout import load_roi_layout
+from roi_state import RoiStateStore
+import structured_log
+
+STREAM_QUEUE_SIZE = 1       # 스트림별 디코딩 단계 출력 큐 크기
+RESULT_QUEUE_SIZE = 8       # 추론 스레드가 넘겨 둘 최대 결과 수
+IDLE_WAIT = 0.005           # 처리할 수 있는 프레임이 없을 때 대기 시간 (초)
+METRICS_WINDOW = 2.0        # 처리 FPS 계산 구간 (초)
+LAG_EMA_ALPHA = 0.2         # 평균 지연 지수 이동 평균 계수
+REPORT_INTERVAL = 5.0       # 헤드리스 실행 시 스트림별 통계 출력 간격 (초)
+
+
+class FairShareScheduler:
+    """스트림별 목표 FPS와 가중치에 따른 추론 순서 결정
+
+    스트림마다 (사용한 추론 시간 / 가중치)를 가상 시간으로 누적하고, 목표 FPS 간격이 지났고
+    프레임이 준비된 스트림 중 가상 시간이 가장 작은 스트림을 먼저 처리합니다 (start-time fair queuing).
+    한동안 프레임이 없던 스트림은 현재 가상 시간에서 다시 시작하므로 밀린 몫을 한꺼번에 가져가지 않습니다.
+
+    Args:
+        fps_targets: 스트림별 목표 FPS (None이면 제한 없음)
+        weights: 스트림별 가중치 (None이면 모두 1)
+    """
+    def __init__(self, fps_targets, weights=None):
+        self.intervals = [1.0 / fps if fps else 0.0 for fps in fps_targets]
+        self.weights = list(weights) if weights is not None else [1.0] * len(fps_targets)
+        self.finish_tags = [0.0] * len(fps_targets)   # 스트림별 가상 완료 시각
+        self.next_due = [0.0] * len(fps_targets)      # 목표 FPS 기준 다음 처리 가능 시각
+        self.virtual_time = 0.0
+
+    def _start_tag(self, idx):
+        return max(self.finish_tags[idx], self.virtual_time)
+
+    def select(self, ready, now):
+        """다음에 처리할 스트림 번호 (처리할 수 있는 스트림이 없으면 None)
+
+        Args:
+            ready: 스트림별 프레임 준비 여부
+            now: 현재 시각 (time.monotonic)
+        """
+        best = None
+        for idx, is_ready in enumerate(ready):
+            if not is_ready or now < self.next_due[idx]:
+                continue
+            if best is None or self._start_tag(idx) < self._start_tag(best):
+                best = idx
+        return best
+
+    def charge(self, idx, started, seconds):
+        """처리한 스트림의 추론 시간 반영
+
+        Args:
+            started: 처리를 시작한 시각 (time.monotonic)
+            seconds: 추론에 걸린 시간 (초)
+        """
+        start_tag = self._start_tag(idx)
+        self.virtual_time = start_tag
+        self.finish_tags[idx] = start_tag + seconds / self.weights[idx]
+        # 늦어진 만큼은 최대 한 간격까지만 따라잡음 (몰아서 처리하지 않음)
+        interval = self.intervals[idx]
+        self.next_due[idx] = max(self.next_due[idx], started - interval) + interval
+
+
+class StreamMetrics:
+    """스트림별 처리 통계 (추론 스레드가 기록하고 다른 스레드는 snapshot()으로 읽음)"""
+    def __init__(self, window=METRICS_WINDOW):
+        self.window = window
+        self.lock = threading.Lock()
+        self.frames = 0
+        self.skipped = 0          # 목표 FPS/배분 때문에 추론하지 않고 넘긴 프레임 수
+        self.busy_seconds = 0.0   # 누적 추론 시간
+        self.lag_avg = None
+        self.lag_max = 0.0
+        self.recent = collections.deque()   # 최근 처리 완료 시각
+
+    def record(self, finished_at, lag, busy):
+        """처리한 프레임 하나 반영 (lag: 프레임 준비부터 결과까지 걸린 시간)"""
+        with self.lock:
+            self.frames += 1
+            self.busy_seconds += busy
+            self.lag_avg = lag if self.lag_avg is None else self.lag_avg + LAG_EMA_ALPHA * (lag - self.lag_avg)
+            self.lag_max = max(self.lag_max, lag)
+            self.recent.append(finished_at)
+            self._trim(finished_at)
+
+    def skip(self):
+        with self.lock:
+            self.skipped += 1
+
+    def _trim(self, now):
+        while self.recent and self.recent[0] < now - self.window:
+            self.recent.popleft()
+
+    def snapshot(self, now=None):
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            self._trim(now)
+            return {
+                'frames': self.frames,
+                'skipped': self.skipped,
+                'fps': len(self.recent) / self.window,
+                'lag_ms': (self.lag_avg or 0.0) * 1000,
+                'lag_max_ms': self.lag_max * 1000,
+                'busy_seconds': self.busy_seconds,
+            }
+
+
+class VideoStream:
+    """영상 소스 하나와 ROI 레이아웃, 디코딩 스레드, 처리 통계
+
+    Args:
+        index: 스트림 번호
+        source: 영상 파일 경로, 카메라 번호 또는 스트림 URL
+        layout: ROI 레이아웃 파일 (.json / .yaml)
+        fps: 목표 처리 FPS (None이면 제한 없음)
+        weight: 추론 시간 배분 가중치
+        name: 스트림 이름 (None이면 cam1, cam2, ...)
+        pacing: 영상 파일 처리 속도 (media_clock.PACING_MODES)
+
+    라이브 소스와 실시간 재생 영상은 추론 차례를 기다리는 동안 새 프레임이 오면 이전 프레임을 버리고
+    항상 최신 프레임을 처리합니다. 최대 속도(fast) 재생은 프레임을 버리지 않습니다.
+    """
+    def __init__(self, index, source, layout, fps=None, weight=1.0, name=None, pacing=PACE_REALTIME):
+        self.index = index
+        self.source = source
+        self.layout = layout
+        self.name = name or f"cam{index + 1}"
+        self.fps_target = fps
+        self.weight = weight
+        self.live = is_live_source(parse_source(source))
+
+        self.cap = open_capture(source)
+        if not self.cap.isOpened():
+            raise IOError(f"Could not open video source: {source}")
+        self.fps = self.cap.get(cv.CAP_PROP_FPS) or 30.0
+        ret, frame, frame_info = self.cap.read_frame()
+        if not ret:
+            self.cap.release()
+            raise IOError(f"Could not read first frame: {source}")
+
+        frame = resize_to_target(frame)
+        self.frame_shape = frame.shape
+        img_h, img_w = frame.shape[:2]
+        self.rois = load_roi_layout(layout, frame_size=(img_w, img_h))
+        self.clock = create_clock(source, self.fps, pacing)
+        self.drop_stale = self.live or pacing == PACE_REALTIME
+        # 라이브 소스의 첫 프레임은 모델을 불러오는 동안 오래되므로 버림
+        self.first = [] if self.live else [(frame, frame_info)]
+
+        self.offset = 0           # 전체 ROI 목록에서 이 스트림 ROI의 시작 위치
+        self.inference = None     # MultiStreamMonitor가 연결하는 RoiInference
+        self.pipeline = None
+        self.pending = None       # 추론 차례를 기다리는 프레임
+        self.last_time = None     # 마지막으로 처리한 프레임 시각
+        self.metrics = StreamMetrics()
+
+    def _decode(self):
+        if self.first:
+            frame, frame_info = self.first.pop()
+        else:
+            ret, frame, frame_info = self.cap.read_frame()
+            if not ret:
+                return None
+            frame = resize_to_target(frame)
+        frame_time = self.clock.tick(frame_info)
+        # 지연 기준: 라이브 소스는 캡처 시각, 영상 파일은 재생 속도에 맞춰 프레임이 준비된 시각
+        ready_at = frame_info['captured_at'] if self.live else time.monotonic()
+        return {'index': frame_info['index'], 'frame': frame, 'time': frame_time, 'ready_at': ready_at}
+
+    def start(self):
+        self.pipeline = Pipeline(self._decode, [], queue_size=STREAM_QUEUE_SIZE).start()
+        return self
+
+    def poll(self):
+        """디코딩된 프레임을 pending으로 가져옴 (준비된 프레임이 있으면 True)"""
+        while self.pending is None or self.drop_stale:
+            item = self.pipeline.get(timeout=0)
+            if item is None:
+                break
+            if self.pending is not None:
+                self.metrics.skip()
+            self.pending = item
+        return self.pending is not None
+
+    def take(self):
+        item, self.pending = self.pending, None
+        return item
+
+    @property
+    def finished(self):
+        return self.pipeline is not None and self.pipeline.finished and self.pending is None
+
+    def close(self):
+        if self.pipeline is not None:
+            self.pipeline.stop()
+        self.cap.release()
+        if self.inference is not None:
+            self.inference.close()
+
+
+class MultiStreamMonitor:
+    """여러 스트림을 하나의 추론 스레드에서 공평하게 처리
+
+    결과는 get()으로 꺼내며, 각 결과는 스트림 번호('stream'), 프레임('frame'), 프레임 시각('time'),
+    ROI별 결과('results'), 전체 ROI 상태 snapshot('snapshot')을 담은 딕셔너리입니다.
+
+    Args:
+        streams: 스트림 설정 목록 [{'source', 'layout', 'fps', 'weight', 'name'}, ...] (fps 이하 생략 가능)
+        mode: 추론 실행 방식 (inference.INFERENCE_MODES, 스트림마다 감지기 생성)
+        workers: process_pool 작업자 수
+        pacing: 영상 파일 처리 속도 (media_clock.PACING_MODES)
+        adaptive: True면 ROI 상태에 따라 추론 주기 조절
+        motion_gate: True면 변화가 없는 ROI는 추론을 생략하고 마지막 결과 재사용
+        smoothing: 머리 각도 평활화 방식 (None이면 사용 안 함)
+        eye_closure: True면 눈 감김 비율(PERCLOS)도 주의/졸음 판단에 사용
+        cascade: 감지 단계 설정 (detection.CASCADE_MODES)
+        pose_config: Pose 모델 설정 (None이면 DEFAULT_POSE_CONFIG)
+        drop_results: True면 결과를 꺼내 가지 않을 때 오래된 결과부터 버림 (GUI), False면 추론 대기 (기록)
+    """
+    def __init__(self, streams, mode=MODE_SEQUENTIAL, workers=None, pacing=PACE_REALTIME, adaptive=False,
+                 motion_gate=False, smoothing=SMOOTH_MEAN, eye_closure=True, cascade=CASCADE_OFF,
+                 pose_config=None, drop_results=True):
+        if not streams:
+            raise ValueError("No streams configured")
+        self.streams = []
+        try:
+            for idx, spec in enumerate(streams):
+                self.streams.append(VideoStream(idx, pacing=pacing, **spec))
+
+            # 모든 스트림의 ROI를 하나의 저장소에 두고 스트림마다 구간을 나눠 사용
+            self.rois = []   # 전체 ROI 목록 (이름은 "스트림/ROI")
+            for stream in self.streams:
+                stream.offset = len(self.rois)
+                self.rois.extend((roi, f"{stream.name}/{name}") for roi, name in stream.rois)
+            self.states = RoiStateStore(len(self.rois))
+            for stream in self.streams:
+                detector = create_roi_detector(mode, stream.rois, stream.frame_shape, workers, cascade, pose_config)
+                stream.inference = RoiInference(
+                    detector, self.states.view(stream.offset, stream.offset + len(stream.rois)), adaptive,
+                    motion_gate=motion_gate, smoothing=smoothing, eye_closure=eye_closure,
+                    pose_config=pose_config
+                )
+        except Exception:
+            for stream in self.streams:
+                stream.close()
+            raise
+
+        self.scheduler = FairShareScheduler(
+            [stream.fps_target for stream in self.streams], [stream.weight for stream in self.streams]
+        )
+        self.results = queue.Queue(maxsize=RESULT_QUEUE_SIZE)
+        self.drop_results = drop_results
+        self.results_dropped = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="multi-stream-inference", daemon=True)
+        self.done = False
+        self.error = None
+        self.started_at = None
+
+    def start(self):
+        for stream in self.streams:
+            stream.start()
+        self.started_at = time.monotonic()
+        self.thread.start()
+        return self
+
+    def _run(self):
+        try:
+            while not self.stop_event.is_set():
+                ready = [stream.poll() for stream in self.streams]
+                if all(stream.finished for stream in self.streams):
+                    break
+                started = time.monotonic()
+                idx = self.scheduler.select(ready, started)
+                if idx is None:
+                    time.sleep(IDLE_WAIT)
+                    continue
+
+                stream = self.streams[idx]
+                item = stream.take()
+                start = time.perf_counter()
+                results = stream.inference.process(item['frame'], item['time'])
+                busy = time.perf_counter() - start
+                finished_at = time.monotonic()
+                self.scheduler.charge(idx, started, busy)
+                stream.metrics.record(finished_at, finished_at - item['ready_at'], busy)
+
+                # 상태별 누적 시간은 이전에 처리한 프레임부터의 영상 시간으로 계산 (건너뛴 프레임 포함)
+                item['seconds'] = 1.0 / stream.fps if stream.last_time is None else item['time'] - stream.last_time
+                stream.last_time = item['time']
+                item.update(stream=idx, results=results, snapshot=self.states.snapshot())
+                self._publish(item)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+
+    def _publish(self, item):
+        if self.drop_results:
+            while True:
+                try:
+                    self.results.put_nowait(item)
+                    return
+                except queue.Full:
+                    try:
+                        self.results.get_nowait()
+                        self.results_dropped += 1
+                    except queue.Empty:
+                        pass
+        while not self.stop_event.is_set():
+            try:
+                self.results.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def get(self, timeout=None):
+        """처리 결과 하나 반환 (시간 초과 또는 모든 스트림이 끝나면 None)"""
+        try:
+            return self.results.get(timeout=timeout)
+        except queue.Empty:
+            if self.error is not None:
+                raise PipelineError(f"multi-stream inference failed: {self.error}") from self.error
+            return None
+
+    @property
+    def finished(self):
+        return self.done and self.results.empty()
+
+    def metrics(self, now=None):
+        """스트림별 처리 통계
+
+        Returns:
+            list: 스트림별 딕셔너리 (name, fps_target, fps, frames, skipped, capture_dropped,
+                lag_ms, lag_max_ms, share: 전체 추론 시간 중 이 스트림이 사용한 비율)
+        """
+        now = time.monotonic() if now is None else now
+        snapshots = [stream.metrics.snapshot(now) for stream in self.streams]
+        total_busy = sum(snapshot['busy_seconds'] for snapshot in snapshots)
+        metrics = []
+        for stream, snapshot in zip(self.streams, snapshots):
+            metrics.append(dict(
+                snapshot,
+                name=stream.name,
+                fps_target=stream.fps_target,
+                capture_dropped=stream.cap.stats()['frames_dropped'],
+                share=snapshot['busy_seconds'] / total_busy if total_busy else 0.0,
+            ))
+        return metrics
+
+    def metric_lines(self, now=None):
+        """스트림별 통계 표시용 문자열"""
+        lines = []
+        for m in self.metrics(now):
+            target = f"{m['fps_target']:g}" if m['fps_target'] else "-"
+            lines.append(
+                f"{m['name']:<8} {m['fps']:5.1f}/{target} FPS  지연 {m['lag_ms']:4.0f}ms "
+                f"(최대 {m['lag_max_ms']:.0f})  점유 {m['share']:4.0%}  건너뜀 {m['skipped']}"
+            )
+        return lines
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread.is_alive():
+            self.thread.join(timeout=5.0)
+        for stream in self.streams:
+            stream.close()
+
+
+def tile_frames(frames):
+    """스트림별 프레임을 격자 한 장으로 합침 (아직 프레임이 없는 칸은 검은색)"""
+    shapes = [frame.shape for frame in frames if frame is not None]
+    if not shapes:
+        return None
+    cell_h = max(shape[0] for shape in shapes)
+    cell_w = max(shape[1] for shape in shapes)
+    columns = math.ceil(math.sqrt(len(frames)))
+    rows = math.ceil(len(frames) / columns)
+    mosaic = np.zeros((rows * cell_h, columns * cell_w, 3), dtype=np.uint8)
+    for idx, frame in enumerate(frames):
+        if frame is None:
+            continue
+        y, x = (idx // columns) * cell_h, (idx % columns) * cell_w
+        h, w = frame.shape[:2]
+        mosaic[y:y + h, x:x + w] = frame
+    return mosaic
+
+
+def run_multi_stream(streams, output_dir, duration=None, mode=MODE_SEQUENTIAL, workers=None,
+                     pacing=PACE_REALTIME, adaptive=False, motion_gate=False, smoothing=SMOOTH_MEAN,
+                     eye_closure=True, cascade=CASCADE_OFF, pose_complexity=None, events_dir=None,
+                     report_interval=REPORT_INTERVAL):
+    """여러 스트림을 GUI 없이 처리하고 스트림별 결과 저장
+
+    결과는 output_dir/<스트림 이름>/ 아래에 headless.py와 같은 형식(ROI별 CSV)으로,
+    스트림별 처리 통계는 output_dir/summary.json에 저장합니다.
+
+    Args:
+        streams: 스트림 설정 목록 (MultiStreamMonitor 참고)
+        output_dir: 결과 저장 폴더
+        duration: 실행 시간 (초, None이면 모든 스트림이 끝날 때까지, 라이브 소스는 Ctrl+C로 종료)
+        events_dir: 상태 전환/머리 각도 표본 기록 폴더 (스트림별 하위 폴더, None이면 기록 안 함)
+        report_interval: 스트림별 통계 출력 간격 (초, None이면 출력 안 함)
+
+    Returns:
+        dict: 처리 요약 정보
+    """
+    pose_config = None if pose_complexity is None else {'model_complexity': pose_complexity}
+    monitor = MultiStreamMonitor(streams, mode, workers, pacing, adaptive, motion_gate, smoothing,
+                                 eye_closure, cascade, pose_config, drop_results=False)
+    collectors = [
+        ResultCollector(
+            os.path.join(output_dir, stream.name), [name for _, name in stream.rois], stream.fps,
+            os.path.join(events_dir, stream.name) if events_dir else None
+        )
+        for stream in monitor.streams
+    ]
+
+    monitor.start()
+    last_report = time.monotonic()
+    try:
+        while True:
+            item = monitor.get(timeout=0.1)
+            now = time.monotonic()
+            if item is None and monitor.finished:
+                break
+            if duration is not None and now - monitor.started_at >= duration:
+                break
+            if item is not None:
+                stream = monitor.streams[item['stream']]
+                states = item['snapshot'].view(stream.offset, stream.offset + len(stream.rois))
+                collectors[item['stream']].add(item['index'], item['time'], item['results'], states,
+                                               item['seconds'])
+            if report_interval and now - last_report >= report_interval:
+                last_report = now
+                print("\n".join(monitor.metric_lines(now)))
+    except KeyboardInterrupt:
+        print("종료 요청됨")
+    finally:
+        elapsed = time.monotonic() - monitor.started_at
+        metrics = monitor.metrics()
+        monitor.stop()
+        for collector in collectors:
+            collector.close()
+
+    summary = {
+        "elapsed_seconds": round(elapsed, 3),
+        "streams": [
+            {
+                "name": stream.name,
+                "source": str(stream.source),
+                "layout": stream.layout,
+                "fps_target": stream.fps_target,
+                "weight": stream.weight,
+                "frames": m['frames'],
+                "processing_fps": round(m['frames'] / elapsed, 2) if elapsed > 0 else 0.0,
+                "skipped_frames": m['skipped'],
+                "capture_dropped": m['capture_dropped'],
+                "lag_ms": round(m['lag_ms'], 1),
+                "lag_max_ms": round(m['lag_max_ms'], 1),
+                "inference_share": round(m['share'], 3),
+                "rois": collector.state_summary(),
+            }
+            for stream, m, collector in zip(monitor.streams, metrics, collectors)
+        ],
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
+
+
+def parse_stream_spec(values):
+    """--stream SOURCE LAYOUT [FPS [WEIGHT]] 값을 스트림 설정으로 변환"""
+    if not 2 <= len(values) <= 4:
+        raise ValueError("--stream은 SOURCE LAYOUT [FPS [WEIGHT]] 형식입니다")
+    spec = {'source': values[0], 'layout': values[1]}
+    if len(values) > 2:
+        spec['fps'] = float(values[2]) or None
+    if len(values) > 3:
+        spec['weight'] = float(values[3])
+    return spec
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="여러 카메라/영상의 졸음 상태를 한 프로세스에서 분석합니다.")
+    parser.add_argument("--stream", action="append", nargs="+", required=True,
+                        metavar="SOURCE LAYOUT [FPS [WEIGHT]]",
+                        help="영상 소스, ROI 레이아웃, 목표 처리 FPS(0: 제한 없음), 추론 시간 가중치 (스트림마다 반복)")
+    parser.add_argument("--output", default="output/multi_stream", help="결과 저장 폴더")
+    parser.add_argument("--duration", type=float, default=None, help="실행 시간 (초)")
+    parser.add_argument("--mode", choices=INFERENCE_MODES, default=MODE_SEQUENTIAL, help="추론 실행 방식")
+    parser.add_argument("--workers", type=int, default=None, help="process_pool 작업자 수")
+    parser.add_argument("--pacing", choices=PACING_MODES, default=PACE_REALTIME,
+                        help="영상 파일 처리 속도 (realtime: 재생 속도, 밀리면 최신 프레임만 처리 / fast: 모든 프레임)")
+    parser.add_argument("--adaptive", action="store_true", help="ROI 상태에 따라 추론 주기 조절")
+    parser.add_argument("--motion-gate", action="store_true",
+                        help="변화가 없는 ROI는 추론을 생략하고 마지막 결과 재사용")
+    parser.add_argument("--smoothing", choices=SMOOTHING_MODES + ("off",), default=SMOOTH_MEAN,
+                        help="머리 각도 평활화 방식 (off: 사용 안 함)")
+    parser.add_argument("--no-eye-closure", action="store_true",
+                        help="눈 감김 비율(PERCLOS)을 주의/졸음 판단에 사용하지 않음")
+    parser.add_argument("--cascade", choices=CASCADE_MODES, default=CASCADE_OFF,
+                        help="Pose를 먼저 실행하고 부족할 때만 얼굴 모델 실행")
+    parser.add_argument("--pose-complexity", type=int, choices=(0, 1, 2), default=None,
+                        help="Pose 모델 복잡도 (기본: 2)")
+    parser.add_argument("--events", default=None, metavar="DIR",
+                        help="ROI 상태 전환/머리 각도 표본 기록 폴더 (스트림별 하위 폴더)")
+    parser.add_argument("--report-interval", type=float, default=REPORT_INTERVAL,
+                        help="스트림별 처리 FPS/지연 출력 간격 (초, 0: 출력 안 함)")
+    parser.add_argument("--log-level", choices=structured_log.LEVELS, default="info", help="로그 수준")
+    args = parser.parse_args(argv)
+    try:
+        args.streams = [parse_stream_spec(values) for values in args.stream]
+    except ValueError as e:
+        parser.error(str(e))
+    if args.mode == MODE_SHARED_FRAME and args.cascade != CASCADE_OFF:
+        parser.error(f"{MODE_SHARED_FRAME} 모드는 얼굴을 전체 프레임에서 먼저 찾으므로 --cascade와 함께 사용할 수 없습니다")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    structured_log.configure(args.log_level)
+    smoothing = None if args.smoothing == "off" else args.smoothing
+    try:
+        summary = run_multi_stream(args.streams, args.output, args.duration, args.mode, args.workers,
+                                   args.pacing, args.adaptive, args.motion_gate, smoothing,
+                                   not args.no_eye_closure, args.cascade, args.pose_complexity,
+                                   args.events, args.report_interval)
+    except (IOError, ValueError, RuntimeError) as e:
+        print(f"Error: {e}")
+        return 1
+    for stream in summary["streams"]:
+        print(f"{stream['name']}: {stream['frames']} 프레임, {stream['processing_fps']} FPS, "
+              f"평균 지연 {stream['lag_ms']}ms, 추론 점유 {stream['inference_share']:.0%}")
+    print(f"결과 저장 위치: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
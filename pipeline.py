@@ -0,0 +1,147 @@
+"""
+단계별 병렬 처리 파이프라인
+- 디코딩 → 추론 → 렌더링 단계를 각각의 스레드에서 실행
+- 단계 사이는 크기가 제한된 큐로 연결하여 메모리와 지연을 제한
+- 정상 상태 처리 속도가 전체 단계 합이 아니라 가장 느린 단계에 맞춰짐
+"""
+
+import queue
+import threading
+import time
+
+_END = object()        # 입력이 끝났음을 알리는 표시
+_POLL_INTERVAL = 0.1   # 종료 요청 확인 주기 (초)
+
+
+class PipelineError(RuntimeError):
+    """파이프라인 단계에서 발생한 예외"""
+
+
+class PipelineStage:
+    """입력 큐에서 항목을 꺼내 처리한 뒤 출력 큐로 넘기는 단계"""
+    def __init__(self, name, func, input_queue, output_queue, stop_event):
+        self.name = name
+        self.func = func
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.stop_event = stop_event
+        self.error = None
+
+        # 통계
+        self.items_processed = 0
+        self.busy_time = 0.0
+
+        self.thread = threading.Thread(target=self._run, name=f"Pipeline-{name}", daemon=True)
+
+    def _next_item(self):
+        """입력 항목 반환 (입력 큐가 없으면 func가 직접 생성하는 소스 단계)"""
+        if self.input_queue is None:
+            return None
+        while not self.stop_event.is_set():
+            try:
+                return self.input_queue.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _put(self, item):
+        while not self.stop_event.is_set():
+            try:
+                self.output_queue.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        try:
+            while not self.stop_event.is_set():
+                item = self._next_item()
+                if item is _END:
+                    break
+
+                start = time.perf_counter()
+                if self.input_queue is None:
+                    result = self.func()
+                    if result is None:
+                        break
+                else:
+                    result = self.func(item)
+                self.busy_time += time.perf_counter() - start
+                self.items_processed += 1
+
+                if result is not None and not self._put(result):
+                    return
+        except Exception as e:
+            self.error = e
+        self._put(_END)
+
+    def stats(self):
+        avg_ms = self.busy_time / self.items_processed * 1000 if self.items_processed else 0.0
+        return {"processed": self.items_processed, "avg_ms": round(avg_ms, 2)}
+
+
+class Pipeline:
+    """소스 함수와 처리 단계 목록으로 구성된 파이프라인
+
+    Args:
+        source: 인자 없이 호출되어 다음 항목을 반환하는 함수 (None이면 입력 끝)
+        stages: [(이름, 함수), ...] 순서대로 실행할 처리 단계
+        queue_size: 단계 사이 큐의 최대 크기
+        source_name: 소스 단계 이름
+
+    마지막 단계의 결과는 get()으로 호출 스레드(예: GUI 스레드)에서 꺼냅니다.
+    """
+    def __init__(self, source, stages, queue_size=2, source_name="decode"):
+        self.stop_event = threading.Event()
+        self.finished = False
+        self.stages = []
+
+        input_queue = None
+        for name, func in [(source_name, source)] + list(stages):
+            output_queue = queue.Queue(maxsize=queue_size)
+            self.stages.append(PipelineStage(name, func, input_queue, output_queue, self.stop_event))
+            input_queue = output_queue
+        self.output_queue = input_queue
+
+    def start(self):
+        for stage in self.stages:
+            stage.thread.start()
+        return self
+
+    def get(self, timeout=None):
+        """마지막 단계 결과 반환
+
+        Returns:
+            처리된 항목. 시간 초과 또는 입력이 끝나면 None (끝난 경우 finished가 True)
+        """
+        if self.finished:
+            return None
+        try:
+            item = self.output_queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if item is _END:
+            self.finished = True
+            for stage in self.stages:
+                if stage.error is not None:
+                    raise PipelineError(f"{stage.name} stage failed: {stage.error}") from stage.error
+            return None
+        return item
+
+    def queue_depths(self):
+        """단계별 출력 큐에 쌓인 항목 수"""
+        return {stage.name: stage.output_queue.qsize() for stage in self.stages}
+
+    def stats(self):
+        """단계별 처리 수, 평균 처리 시간, 큐 깊이"""
+        return {
+            stage.name: dict(stage.stats(), queue_depth=stage.output_queue.qsize())
+            for stage in self.stages
+        }
+
+    def stop(self):
+        """모든 단계 종료"""
+        self.stop_event.set()
+        for stage in self.stages:
+            stage.thread.join(timeout=2.0)
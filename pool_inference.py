@@ -0,0 +1,229 @@
+"""
+프로세스 풀 기반 ROI 추론
+- ROI를 여러 작업 프로세스에 나누어 배치 (작업자당 ROI 묶음 하나)
+- 각 작업자는 자신이 맡은 ROI의 QuadrantProcessor만 생성
+- 프레임은 공유 메모리로 전달하여 전체 프레임을 피클링하지 않음
+- 랜드마크 결과는 ROI 순서대로 메인 프로세스에 반환
+"""
+
+import multiprocessing as mproc
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+from detection import CASCADE_OFF, EMPTY_DETECTION, QuadrantProcessor
+
+WORKER_START_TIMEOUT = 120  # 작업자 모델 초기화 대기 시간 (초)
+RESULT_TIMEOUT = 30         # 프레임 하나의 결과 대기 시간 (초)
+CONFIG_TIMEOUT = 120        # Pose 모델 교체 응답 대기 시간 (초, 모델 생성 포함)
+
+
+def default_worker_count(num_rois):
+    """ROI 수와 CPU 코어 수에 맞는 작업자 수 (메인 프로세스용 코어 하나는 남김)"""
+    cores = os.cpu_count() or 1
+    return max(1, min(num_rois, cores - 1))
+
+def shard_rois(rois, num_workers):
+    """ROI를 면적 기준으로 작업자에게 고르게 분배
+
+    Returns:
+        list: 작업자별 [(roi_idx, (x1, y1, x2, y2)), ...] 목록
+    """
+    shards = [[] for _ in range(num_workers)]
+    loads = [0] * num_workers
+    by_area = sorted(
+        enumerate(rois),
+        key=lambda item: (item[1][0][2] - item[1][0][0]) * (item[1][0][3] - item[1][0][1]),
+        reverse=True
+    )
+    for roi_idx, (roi, _) in by_area:
+        target = loads.index(min(loads))
+        shards[target].append((roi_idx, tuple(roi)))
+        loads[target] += max(0, (roi[2] - roi[0]) * (roi[3] - roi[1]))
+    for shard in shards:
+        shard.sort()
+    return [shard for shard in shards if shard]
+
+
+def _serialize(detection):
+    """감지 결과의 랜드마크를 바이트로 변환 (프로세스 간 전달용)"""
+    serialized = dict(detection)
+    for key in ('face_landmarks', 'pose_landmarks'):
+        if serialized[key] is not None:
+            serialized[key] = serialized[key].SerializeToString()
+    return serialized
+
+def _deserialize(serialized):
+    detection = dict(serialized)
+    for key in ('face_landmarks', 'pose_landmarks'):
+        if detection[key] is not None:
+            detection[key] = landmark_pb2.NormalizedLandmarkList.FromString(detection[key])
+    return detection
+
+
+def _worker_main(worker_id, shm_name, frame_shape, shard, cascade, pose_config, task_queue, result_queue):
+    """작업자 프로세스: 공유 메모리의 프레임에서 맡은 ROI만 처리"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frame = None
+    processors = {}
+    try:
+        frame = np.ndarray(frame_shape, dtype=np.uint8, buffer=shm.buf)
+        processors = {roi_idx: QuadrantProcessor(roi_idx, cascade, pose_config) for roi_idx, _ in shard}
+        result_queue.put(("ready", worker_id, None))
+
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            if task[0] == "config":
+                # Pose 모델 설정 변경 (모델을 불러오지 못하면 기존 모델로 계속 처리하고 오류를 응답)
+                _, roi_idx, pose_config = task
+                error = None
+                try:
+                    processors[roi_idx].set_pose_config(pose_config)
+                except (OSError, RuntimeError) as e:
+                    error = f"{type(e).__name__}: {e}"
+                result_queue.put(("config", worker_id, error))
+                continue
+            _, seq, active = task
+
+            detections = []
+            for roi_idx, (x1, y1, x2, y2) in shard:
+                if active is not None and roi_idx not in active:
+                    continue
+                roi_frame = frame[y1:y2, x1:x2]
+                if roi_frame.size == 0:
+                    detections.append((roi_idx, EMPTY_DETECTION))
+                    continue
+                detection = processors[roi_idx].detect(roi_frame)
+                detections.append((roi_idx, _serialize(detection)))
+            result_queue.put((seq, worker_id, detections))
+    except Exception as e:
+        result_queue.put(("error", worker_id, f"{type(e).__name__}: {e}"))
+    finally:
+        for processor in processors.values():
+            processor.close()
+        del frame
+        shm.close()
+
+
+class ShardedInferencePool:
+    """ROI 묶음을 작업 프로세스에 나누어 추론하는 풀
+
+    detect(frame)은 detection.detect_rois()와 같은 형태의 결과를 반환합니다.
+
+    Args:
+        rois: [((x1, y1, x2, y2), name), ...] 형태의 ROI 목록
+        frame_shape: 처리할 프레임 크기 (height, width, 3)
+        num_workers: 작업자 수 (None이면 CPU 코어 수에 맞춤)
+        cascade: 작업자 QuadrantProcessor의 감지 단계 설정
+        pose_config: 작업자 QuadrantProcessor의 처음 Pose 모델 설정 (None이면 DEFAULT_POSE_CONFIG)
+    """
+    def __init__(self, rois, frame_shape, num_workers=None, cascade=CASCADE_OFF, pose_config=None):
+        self.rois = rois
+        self.frame_shape = tuple(frame_shape)
+        if num_workers is None:
+            num_workers = default_worker_count(len(rois))
+        self.shards = shard_rois(rois, max(1, num_workers))
+        self.roi_worker = {
+            roi_idx: worker_id
+            for worker_id, shard in enumerate(self.shards) for roi_idx, _ in shard
+        }
+        self.seq = 0
+
+        self.shm = shared_memory.SharedMemory(create=True, size=int(np.prod(self.frame_shape)))
+        self.frame_buffer = np.ndarray(self.frame_shape, dtype=np.uint8, buffer=self.shm.buf)
+
+        # Qt나 캡처 스레드가 있는 프로세스에서 fork는 안전하지 않으므로 spawn 사용
+        ctx = mproc.get_context("spawn")
+        self.result_queue = ctx.Queue()
+        self.task_queues = []
+        self.workers = []
+        for worker_id, shard in enumerate(self.shards):
+            task_queue = ctx.Queue()
+            worker = ctx.Process(
+                target=_worker_main,
+                args=(worker_id, self.shm.name, self.frame_shape, shard, cascade,
+                      pose_config, task_queue, self.result_queue),
+                name=f"ROIWorker-{worker_id}",
+                daemon=True
+            )
+            worker.start()
+            self.task_queues.append(task_queue)
+            self.workers.append(worker)
+
+        # 모든 작업자의 모델 초기화 완료 대기
+        try:
+            for _ in self.workers:
+                self._get_result(WORKER_START_TIMEOUT)
+        except Exception:
+            self.close()
+            raise
+
+    @property
+    def num_workers(self):
+        return len(self.workers)
+
+    def _get_result(self, timeout):
+        try:
+            message = self.result_queue.get(timeout=timeout)
+        except Exception:
+            raise RuntimeError("ROI worker did not respond in time")
+        if message[0] == "error":
+            raise RuntimeError(f"ROI worker {message[1]} failed: {message[2]}")
+        return message
+
+    def detect(self, frame, active=None):
+        """프레임의 모든 ROI 감지 (ROI 순서대로 결과 반환, active에서 제외된 ROI는 None)"""
+        if frame.shape != self.frame_shape:
+            raise ValueError(f"Frame shape {frame.shape} does not match pool shape {self.frame_shape}")
+
+        # 모든 작업자가 이전 프레임 처리를 마친 뒤에만 공유 메모리를 덮어씀
+        np.copyto(self.frame_buffer, frame)
+        self.seq += 1
+        active_set = None
+        if active is not None:
+            active_set = frozenset(i for i, flag in enumerate(active) if flag)
+        for task_queue in self.task_queues:
+            task_queue.put(("detect", self.seq, active_set))
+
+        detections = [None] * len(self.rois)
+        for _ in self.workers:
+            seq, _, worker_detections = self._get_result(RESULT_TIMEOUT)
+            if seq != self.seq:
+                raise RuntimeError(f"Out-of-order result: expected {self.seq}, got {seq}")
+            for roi_idx, serialized in worker_detections:
+                detections[roi_idx] = _deserialize(serialized)
+        return detections
+
+    def set_pose_config(self, roi_idx, pose_config):
+        """ROI를 맡은 작업자에게 Pose 모델 설정 변경 요청 (적용될 때까지 대기)
+
+        작업자가 새 모델을 만들지 못하면 기존 모델을 유지하고 RuntimeError를 발생시킵니다
+        (다른 감지 모드와 같이 RoiInference가 지연 시간 제어기의 단계를 되돌림).
+        """
+        self.task_queues[self.roi_worker[roi_idx]].put(("config", roi_idx, dict(pose_config)))
+        kind, worker_id, error = self._get_result(CONFIG_TIMEOUT)
+        if kind != "config":
+            raise RuntimeError(f"Unexpected reply from ROI worker {worker_id}: {kind}")
+        if error is not None:
+            raise RuntimeError(f"ROI worker {worker_id} could not load Pose model: {error}")
+
+    def close(self):
+        """작업자 종료 및 공유 메모리 해제"""
+        if self.shm is None:
+            return
+        for task_queue in self.task_queues:
+            task_queue.put(None)
+        for worker in self.workers:
+            worker.join(timeout=5.0)
+            if worker.is_alive():
+                worker.terminate()
+        self.workers = []
+        self.task_queues = []
+        self.frame_buffer = None
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
@@ -0,0 +1,209 @@
+"""
+처리 단계별 지연 시간 측정
+- 단계별, ROI별 지연 시간을 로그 간격 히스토그램에 누적 (기록 비용이 작고 메모리 고정)
+- p50/p95/p99, 평균, 최대값과 처리 FPS 제공
+- 주기적으로 CSV/JSON 스냅샷 저장 (교실별 하드웨어 규모 산정용)
+
+사용 예:
+    from profiler import PROFILER
+    start = time.perf_counter()
+    ...
+    PROFILER.record("resize", time.perf_counter() - start)
+"""
+
+import csv
+import json
+import math
+import os
+import time
+
+HIST_MIN = 1e-5        # 히스토그램 최소 구간 (초, 이보다 짧으면 첫 칸)
+HIST_GROWTH = 1.05     # 구간 경계 증가 비율 (백분위 오차 약 5%)
+HIST_BUCKETS = 300     # 구간 수 (약 10us ~ 20초)
+
+SNAPSHOT_INTERVAL = 10.0   # 스냅샷 저장 간격 (초)
+FPS_WINDOW = 1.0           # FPS 계산 간격 (초)
+
+_INV_LOG_GROWTH = 1.0 / math.log(HIST_GROWTH)
+_BUCKET_UPPER = [HIST_MIN * HIST_GROWTH ** i for i in range(HIST_BUCKETS)]
+
+SNAPSHOT_FIELDS = ["time", "stage", "roi", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+
+
+class LatencyHistogram:
+    """로그 간격 구간으로 지연 시간 분포를 누적하는 히스토그램"""
+    def __init__(self):
+        self.counts = [0] * HIST_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        if seconds > HIST_MIN:
+            index = min(int(math.log(seconds / HIST_MIN) * _INV_LOG_GROWTH) + 1, HIST_BUCKETS - 1)
+        else:
+            index = 0
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """백분위 값 (초, 해당 구간의 상한)"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return min(_BUCKET_UPPER[index], self.max)
+        return self.max
+
+    def summary(self):
+        """밀리초 단위 요약"""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50) * 1000, 3),
+            "p95_ms": round(self.percentile(0.95) * 1000, 3),
+            "p99_ms": round(self.percentile(0.99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class Profiler:
+    """단계별/ROI별 지연 시간 히스토그램 모음
+
+    Args:
+        enabled: False면 record()가 바로 반환
+    """
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.stages = {}      # 단계 이름 -> LatencyHistogram
+        self.roi_stages = {}  # (단계 이름, ROI 번호) -> LatencyHistogram
+
+        # FPS
+        self.frames = 0
+        self.fps = 0.0
+        self.fps_frames = 0
+        self.fps_started = None
+
+        # 스냅샷
+        self.snapshot_dir = None
+        self.snapshot_interval = SNAPSHOT_INTERVAL
+        self.last_snapshot = None
+
+    def record(self, stage, seconds, roi=None):
+        """단계 지연 시간 기록 (roi를 지정하면 ROI별로도 기록)"""
+        if not self.enabled:
+            return
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages.setdefault(stage, LatencyHistogram())
+        histogram.record(seconds)
+        if roi is not None:
+            key = (stage, roi)
+            histogram = self.roi_stages.get(key)
+            if histogram is None:
+                histogram = self.roi_stages.setdefault(key, LatencyHistogram())
+            histogram.record(seconds)
+
+    def record_detection(self, roi_idx, detection):
+        """감지 결과에 담긴 ROI별 단계 시간 기록"""
+        if not self.enabled or detection is None:
+            return
+        if detection['pose_ran'] or detection['face_ran']:
+            self.record("roi_inference", detection['latency'], roi_idx)
+        for stage, seconds in (detection.get('stage_times') or {}).items():
+            self.record(stage, seconds, roi_idx)
+
+    def tick_frame(self, now=None):
+        """표시한 프레임 수를 세어 FPS 갱신"""
+        if not self.enabled:
+            return
+        now = time.monotonic() if now is None else now
+        self.frames += 1
+        self.fps_frames += 1
+        if self.fps_started is None:
+            self.fps_started = now
+        elif now - self.fps_started >= FPS_WINDOW:
+            self.fps = self.fps_frames / (now - self.fps_started)
+            self.fps_started = now
+            self.fps_frames = 0
+
+    def snapshot(self):
+        """현재까지의 단계별/ROI별 요약"""
+        return {
+            "time": round(time.time(), 3),
+            "frames": self.frames,
+            "fps": round(self.fps, 2),
+            "stages": {stage: histogram.summary() for stage, histogram in list(self.stages.items())},
+            "rois": [
+                dict(stage=stage, roi=roi, **histogram.summary())
+                for (stage, roi), histogram in sorted(list(self.roi_stages.items()))
+            ],
+        }
+
+    def overlay_lines(self, max_stages=10):
+        """화면 표시용 FPS와 단계별 p50/p95 (p95가 큰 순서)"""
+        lines = [f"FPS {self.fps:5.1f}   (p50 / p95 / p99 ms)"]
+        stages = sorted(list(self.stages.items()), key=lambda item: -item[1].percentile(0.95))
+        for stage, histogram in stages[:max_stages]:
+            summary = histogram.summary()
+            lines.append(
+                f"{stage:<18} {summary['p50_ms']:7.2f} {summary['p95_ms']:7.2f} {summary['p99_ms']:7.2f}"
+            )
+        return lines
+
+    def configure_snapshots(self, directory, interval=SNAPSHOT_INTERVAL):
+        """주기적 스냅샷 저장 폴더와 간격 지정 (directory가 None이면 저장 안 함)"""
+        self.snapshot_dir = directory
+        self.snapshot_interval = interval
+        self.last_snapshot = time.monotonic()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def maybe_dump(self, now=None):
+        """스냅샷 간격이 지났으면 저장"""
+        if not self.enabled or not self.snapshot_dir:
+            return
+        now = time.monotonic() if now is None else now
+        if now - self.last_snapshot >= self.snapshot_interval:
+            self.last_snapshot = now
+            self.dump()
+
+    def dump(self, directory=None):
+        """스냅샷을 JSON(최신 값 덮어쓰기)과 CSV(시간별 누적 행 추가)로 저장"""
+        directory = directory or self.snapshot_dir
+        if not directory:
+            return None
+        os.makedirs(directory, exist_ok=True)
+        snapshot = self.snapshot()
+        with open(os.path.join(directory, "profile.json"), "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=2)
+
+        csv_path = os.path.join(directory, "profile.csv")
+        write_header = not os.path.exists(csv_path)
+        with open(csv_path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=SNAPSHOT_FIELDS)
+            if write_header:
+                writer.writeheader()
+            for stage, summary in snapshot["stages"].items():
+                writer.writerow(dict(time=snapshot["time"], stage=stage, roi="", **summary))
+            for row in snapshot["rois"]:
+                writer.writerow(dict(time=snapshot["time"], **row))
+        return snapshot
+
+    def reset(self):
+        self.stages = {}
+        self.roi_stages = {}
+        self.frames = 0
+        self.fps = 0.0
+        self.fps_frames = 0
+        self.fps_started = None
+
+
+# 프로그램 전체에서 공유하는 프로파일러
+PROFILER = Profiler()
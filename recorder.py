@@ -0,0 +1,197 @@
+"""
+결과 영상 녹화 모듈
+- 랜드마크/ROI가 그려진 프레임을 별도 스레드에서 인코딩하여 처리 루프와 분리
+- 크기가 제한된 큐 사용, 인코딩이 밀리면 정책에 따라 프레임을 버리거나 대기 (capture의 DROP_POLICIES)
+- 코덱, 저장 해상도, N프레임마다 1프레임만 저장하는 간격 지정
+- 긴 수업은 일정 길이마다 새 파일로 나누어 저장
+
+사용 예:
+    recorder = VideoRecorder("output", fps=30, segment_seconds=600).start()
+    recorder.write(frame)   # 프레임은 이후 수정하지 않아야 함 (복사하지 않고 큐에 보관)
+    recorder.close()
+"""
+
+import collections
+import os
+import threading
+import time
+from datetime import datetime
+
+import cv2 as cv
+
+from capture import DROP_OLDEST, DROP_NEWEST, DROP_POLICIES
+from structured_log import LOG
+
+RECORD_CODEC = "XVID"          # FourCC 코덱
+RECORD_QUEUE_SIZE = 8          # 인코딩 대기 최대 프레임 수
+RECORD_FILE_PREFIX = "output_video"
+
+
+class VideoRecorder:
+    """스레드 기반 영상 녹화기
+
+    Args:
+        output_dir: 저장 폴더
+        fps: 입력 프레임 FPS
+        resolution: 저장 해상도 (width, height), None이면 첫 프레임 크기
+        codec: FourCC 코덱 문자열
+        decimation: N프레임마다 1프레임만 저장 (저장 영상 FPS는 fps / N)
+        queue_size: 인코딩 대기 최대 프레임 수
+        drop_policy: 큐가 가득 찼을 때의 정책 (DROP_OLDEST / DROP_NEWEST / BLOCK)
+        segment_seconds: 파일을 나누는 영상 길이 (초), None이면 한 파일로 저장
+        prefix: 파일 이름 앞부분 (뒤에 시작 시각과 구간 번호가 붙음)
+    """
+    def __init__(self, output_dir, fps, resolution=None, codec=RECORD_CODEC, decimation=1,
+                 queue_size=RECORD_QUEUE_SIZE, drop_policy=DROP_OLDEST, segment_seconds=None,
+                 prefix=RECORD_FILE_PREFIX):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        if decimation < 1:
+            raise ValueError("decimation must be at least 1")
+        if len(codec) != 4:
+            raise ValueError(f"Codec must be a FourCC string: {codec}")
+
+        self.output_dir = output_dir
+        self.fps = fps / decimation
+        self.resolution = tuple(resolution) if resolution else None
+        self.codec = codec
+        self.decimation = decimation
+        self.queue_size = queue_size
+        self.drop_policy = drop_policy
+        self.segment_frames = max(1, int(round(segment_seconds * self.fps))) if segment_seconds else None
+        self.base_name = f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+        self.frames = collections.deque()
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+        self.writer = None
+        self.segment_written = 0
+        self.error = None
+
+        # 통계
+        self.frames_submitted = 0
+        self.frames_skipped = 0      # 저장 간격 때문에 건너뛴 프레임
+        self.frames_dropped = 0      # 큐가 가득 차서 버린 프레임
+        self.frames_written = 0
+        self.encode_time = 0.0
+        self.paths = []
+
+    def start(self):
+        """인코딩 스레드 시작"""
+        if self.thread is not None:
+            return self
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.running = True
+        self.thread = threading.Thread(target=self._encoder, name="VideoRecorder", daemon=True)
+        self.thread.start()
+        return self
+
+    def write(self, frame):
+        """프레임을 인코딩 큐에 추가 (저장 대상이 아니거나 버렸으면 False)"""
+        index = self.frames_submitted
+        self.frames_submitted += 1
+        if index % self.decimation:
+            self.frames_skipped += 1
+            return False
+
+        with self.condition:
+            if not self.running:
+                return False
+            if len(self.frames) >= self.queue_size:
+                if self.drop_policy == DROP_OLDEST:
+                    self.frames.popleft()
+                    self.frames_dropped += 1
+                elif self.drop_policy == DROP_NEWEST:
+                    self.frames_dropped += 1
+                    return False
+                else:
+                    while self.running and len(self.frames) >= self.queue_size:
+                        self.condition.wait()
+                    if not self.running:
+                        return False
+            self.frames.append(frame)
+            self.condition.notify_all()
+        return True
+
+    def _encoder(self):
+        while True:
+            with self.condition:
+                while self.running and not self.frames:
+                    self.condition.wait()
+                if not self.frames:
+                    break
+                frame = self.frames.popleft()
+                self.condition.notify_all()
+
+            start = time.perf_counter()
+            try:
+                self._encode(frame)
+            except (IOError, cv.error) as e:
+                self.error = str(e)
+                LOG.error("recorder_failed", error=self.error)
+                with self.condition:
+                    self.running = False
+                    self.frames.clear()
+                    self.condition.notify_all()
+                break
+            self.encode_time += time.perf_counter() - start
+        self._close_writer()
+
+    def _encode(self, frame):
+        if self.resolution is None:
+            self.resolution = (frame.shape[1], frame.shape[0])
+        if (frame.shape[1], frame.shape[0]) != self.resolution:
+            frame = cv.resize(frame, self.resolution)
+
+        if self.writer is None or (self.segment_frames and self.segment_written >= self.segment_frames):
+            self._open_segment()
+        self.writer.write(frame)
+        self.segment_written += 1
+        self.frames_written += 1
+
+    def _open_segment(self):
+        self._close_writer()
+        if self.segment_frames:
+            name = f"{self.base_name}_{len(self.paths) + 1:03d}.avi"
+        else:
+            name = f"{self.base_name}.avi"
+        path = os.path.join(self.output_dir, name)
+        writer = cv.VideoWriter(path, cv.VideoWriter_fourcc(*self.codec), self.fps, self.resolution, True)
+        if not writer.isOpened():
+            raise IOError(f"Could not open video writer: {path} ({self.codec})")
+        self.writer = writer
+        self.segment_written = 0
+        self.paths.append(path)
+        LOG.info("recorder_segment", path=path, resolution=list(self.resolution), fps=self.fps)
+
+    def _close_writer(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+
+    def queue_depth(self):
+        return len(self.frames)
+
+    def stats(self):
+        return {
+            "frames_submitted": self.frames_submitted,
+            "frames_skipped": self.frames_skipped,
+            "frames_dropped": self.frames_dropped,
+            "frames_written": self.frames_written,
+            "encode_ms": round(self.encode_time / self.frames_written * 1000, 3) if self.frames_written else 0.0,
+            "files": list(self.paths),
+            "error": self.error,
+        }
+
+    def close(self, timeout=None):
+        """큐에 남은 프레임을 모두 저장하고 종료"""
+        if self.thread is None:
+            return
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        self.thread.join(timeout)
+        self.thread = None
@@ -0,0 +1,85 @@
+"""
+ROI 레이아웃 저장/불러오기
+- JSON 또는 YAML 파일로 ROI 좌표 저장
+- 저장 당시 프레임 크기를 함께 기록하여 해상도가 다르면 좌표를 비율에 맞게 변환
+"""
+
+import json
+import os
+
+try:
+    import yaml
+except ImportError:  # YAML은 선택 사항
+    yaml = None
+
+
+def _is_yaml(path):
+    return os.path.splitext(path)[1].lower() in (".yaml", ".yml")
+
+def normalize_roi(roi):
+    """(x1, y1, x2, y2) 좌표를 좌상단/우하단 순서로 정렬"""
+    x1, y1, x2, y2 = (int(v) for v in roi)
+    return (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+
+def save_roi_layout(path, rois, frame_size):
+    """ROI 레이아웃을 파일로 저장
+
+    Args:
+        path: 저장할 파일 경로 (.json / .yaml / .yml)
+        rois: [((x1, y1, x2, y2), name), ...] 형태의 ROI 목록
+        frame_size: ROI 좌표 기준 프레임 크기 (width, height)
+    """
+    layout = {
+        "frame_size": [int(frame_size[0]), int(frame_size[1])],
+        "rois": [
+            {"name": name, "rect": list(normalize_roi(roi))}
+            for roi, name in rois
+        ],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        if _is_yaml(path):
+            if yaml is None:
+                raise RuntimeError("YAML 레이아웃을 저장하려면 PyYAML이 필요합니다.")
+            yaml.safe_dump(layout, f, allow_unicode=True, sort_keys=False)
+        else:
+            json.dump(layout, f, ensure_ascii=False, indent=2)
+
+def load_roi_layout(path, frame_size=None):
+    """파일에서 ROI 레이아웃 불러오기
+
+    Args:
+        path: 레이아웃 파일 경로 (.json / .yaml / .yml)
+        frame_size: 실제 처리할 프레임 크기 (width, height).
+            지정하면 저장 당시 크기와 비교하여 좌표를 변환
+
+    Returns:
+        list: [((x1, y1, x2, y2), name), ...] 형태의 ROI 목록
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if _is_yaml(path):
+            if yaml is None:
+                raise RuntimeError("YAML 레이아웃을 읽으려면 PyYAML이 필요합니다.")
+            layout = yaml.safe_load(f)
+        else:
+            layout = json.load(f)
+
+    if not layout or not layout.get("rois"):
+        raise ValueError(f"ROI 레이아웃이 비어 있습니다: {path}")
+
+    scale_x = scale_y = 1.0
+    saved_size = layout.get("frame_size")
+    if frame_size is not None and saved_size:
+        scale_x = frame_size[0] / saved_size[0]
+        scale_y = frame_size[1] / saved_size[1]
+
+    rois = []
+    for i, entry in enumerate(layout["rois"]):
+        x1, y1, x2, y2 = entry["rect"]
+        roi = normalize_roi((x1 * scale_x, y1 * scale_y, x2 * scale_x, y2 * scale_y))
+        if frame_size is not None:
+            # 프레임 밖으로 벗어난 좌표 보정
+            w, h = frame_size
+            roi = (max(0, min(roi[0], w)), max(0, min(roi[1], h)),
+                   max(0, min(roi[2], w)), max(0, min(roi[3], h)))
+        rois.append((roi, entry.get("name", f"ROI_{i + 1}")))
+    return rois
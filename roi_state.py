@@ -0,0 +1,186 @@
+"""
+ROI 상태 저장소
+- ROI별 머리 숙임 시작 시각/지속 시간, 상태 코드, 마지막 관측 시각, 머리 각도, PERCLOS를 미리 할당한 NumPy 배열로 보관
+- 머리 숙임 타이머와 상태 분류를 모든 ROI에 대해 한 번의 배열 연산으로 갱신
+- 추론 스레드가 갱신하고, UI/기록은 같은 시점의 복사본(snapshot)을 읽어 값이 섞이지 않음
+- view()로 저장소 일부를 공유하는 저장소를 만들어 여러 카메라의 ROI를 하나의 저장소에 둘 수 있음
+
+사용 예:
+    store = RoiStateStore(num_rois)
+    store.update(now, processed, present, head_angles, perclos)   # analyze_detections에서 호출
+    snapshot = store.snapshot()                                  # UI 스레드로 전달
+"""
+
+import threading
+
+import numpy as np
+
+from detection import (
+    HEAD_DOWN_ANGLE_THRESHOLD, HEAD_DOWN_WARNING_TIME, HEAD_DOWN_DROWSY_TIME,
+    PERCLOS_WARNING_THRESHOLD, PERCLOS_DROWSY_THRESHOLD,
+    STATE_ABSENT, STATE_NORMAL, STATE_WARNING, STATE_DROWSY
+)
+
+# 상태 코드 (event_log.STATE_NAMES와 같은 순서)
+CODE_ABSENT, CODE_NORMAL, CODE_WARNING, CODE_DROWSY = range(4)
+CODE_STATES = [STATE_ABSENT, STATE_NORMAL, STATE_WARNING, STATE_DROWSY]   # classify_roi_state() 결과 문자열
+
+# 배열 이름과 초기값
+FIELDS = (
+    ("head_down_start", np.float64, np.nan),   # 머리 숙임 시작 시각 (숙이지 않았으면 NaN)
+    ("head_down_duration", np.float64, 0.0),   # 머리 숙임 지속 시간 (초)
+    ("head_angle", np.float64, np.nan),        # 상태 판단에 사용한 마지막 머리 각도 (평활화 값)
+    ("perclos", np.float64, np.nan),           # 최근 눈 감은 시간 비율 (표본이 부족하면 NaN)
+    ("last_seen", np.float64, np.nan),         # 사람이 마지막으로 감지된 시각
+    ("present", np.bool_, False),              # 마지막 관측에서 사람 유무
+    ("state", np.uint8, CODE_ABSENT),          # 상태 코드 (CODE_*)
+)
+
+
+def classify_states(present, durations, perclos, warning_time=HEAD_DOWN_WARNING_TIME,
+                    drowsy_time=HEAD_DOWN_DROWSY_TIME):
+    """classify_roi_state()를 배열로 계산
+
+    Args:
+        present: 사람 유무 배열
+        durations: 머리 숙임 지속 시간 배열 (초)
+        perclos: 눈 감은 시간 비율 배열 (없으면 NaN)
+
+    Returns:
+        np.ndarray: CODE_* 상태 코드 (uint8)
+    """
+    with np.errstate(invalid='ignore'):
+        drowsy = (durations >= drowsy_time) | (perclos >= PERCLOS_DROWSY_THRESHOLD)
+        warning = (durations >= warning_time) | (perclos >= PERCLOS_WARNING_THRESHOLD)
+    codes = np.where(drowsy, CODE_DROWSY, np.where(warning, CODE_WARNING, CODE_NORMAL))
+    return np.where(present, codes, CODE_ABSENT).astype(np.uint8)
+
+
+class RoiStateSnapshot:
+    """한 시점의 ROI 상태 복사본 (읽기 전용으로 사용)
+
+    Attributes:
+        time: 마지막 갱신 시각 (갱신 전이면 None)
+        version: 갱신 횟수
+        FIELDS의 각 이름: ROI별 배열
+    """
+    def __init__(self, arrays, time, version):
+        for name, array in arrays.items():
+            setattr(self, name, array)
+        self.time = time
+        self.version = version
+
+    def __len__(self):
+        return len(self.state)
+
+    def state_name(self, roi_idx):
+        """classify_roi_state()와 같은 상태 문자열 (부재는 빈 문자열)"""
+        return CODE_STATES[self.state[roi_idx]]
+
+    def perclos_value(self, roi_idx):
+        """PERCLOS (표본이 부족하면 None)"""
+        perclos = self.perclos[roi_idx]
+        return None if np.isnan(perclos) else float(perclos)
+
+    def view(self, start, stop):
+        """ROI start ~ stop-1 구간의 snapshot (복사하지 않음, 카메라별 결과 기록 등)"""
+        arrays = {name: getattr(self, name)[start:stop] for name, _, _ in FIELDS}
+        return RoiStateSnapshot(arrays, self.time, self.version)
+
+
+class RoiStateStore:
+    """ROI 상태 배열 저장소
+
+    Args:
+        num_rois: ROI 개수
+        angle_threshold: 머리 숙임 판단 각도 (도)
+        warning_time: '주의' 판단 머리 숙임 지속 시간 (초)
+        drowsy_time: '졸음' 판단 머리 숙임 지속 시간 (초)
+    """
+    def __init__(self, num_rois, angle_threshold=HEAD_DOWN_ANGLE_THRESHOLD,
+                 warning_time=HEAD_DOWN_WARNING_TIME, drowsy_time=HEAD_DOWN_DROWSY_TIME):
+        self.angle_threshold = angle_threshold
+        self.warning_time = warning_time
+        self.drowsy_time = drowsy_time
+        self.arrays = {name: np.full(num_rois, initial, dtype=dtype) for name, dtype, initial in FIELDS}
+        for name, array in self.arrays.items():
+            setattr(self, name, array)
+        self.lock = threading.Lock()
+        self.time = None
+        self.version = 0
+
+    def __len__(self):
+        return len(self.state)
+
+    def view(self, start, stop):
+        """ROI start ~ stop-1 구간을 공유하는 저장소 (카메라별 ROI 구간 등)
+
+        배열과 잠금은 원래 저장소와 공유하므로 원래 저장소의 snapshot()에 바로 반영됩니다.
+        """
+        view = RoiStateStore.__new__(RoiStateStore)
+        view.angle_threshold = self.angle_threshold
+        view.warning_time = self.warning_time
+        view.drowsy_time = self.drowsy_time
+        view.arrays = {name: array[start:stop] for name, array in self.arrays.items()}
+        for name, array in view.arrays.items():
+            setattr(view, name, array)
+        view.lock = self.lock
+        view.time = None
+        view.version = 0
+        return view
+
+    def update(self, now, processed, present, head_angles, perclos=None):
+        """이번 프레임의 관측으로 머리 숙임 타이머와 상태 갱신 (모든 ROI 한 번에)
+
+        처리하지 않은 ROI는 이전 값을 유지합니다.
+
+        Args:
+            now: 현재 시각 (초)
+            processed: ROI별 처리 여부
+            present: ROI별 사람 유무
+            head_angles: ROI별 머리 각도 (Pose가 없으면 NaN, 이 경우 타이머는 그대로 유지)
+            perclos: ROI별 PERCLOS (None이면 사용하지 않음, 표본이 부족하면 NaN)
+        """
+        processed = np.asarray(processed, dtype=bool)
+        present = np.asarray(present, dtype=bool) & processed
+        head_angles = np.asarray(head_angles, dtype=float)
+        has_angle = present & ~np.isnan(head_angles)
+        with np.errstate(invalid='ignore'):
+            down = has_angle & (head_angles > self.angle_threshold)
+        absent = processed & ~present
+        reset = absent | (has_angle & ~down)
+
+        with self.lock:
+            # 머리 숙임 타이머: 정상 자세나 부재면 초기화, 숙이고 있으면 시작 시각 기준으로 지속 시간 계산
+            self.head_down_start[reset] = np.nan
+            self.head_down_duration[reset] = 0.0
+            started = down & np.isnan(self.head_down_start)
+            self.head_down_start[started] = now
+            self.head_down_duration[down] = now - self.head_down_start[down]
+
+            self.head_angle[has_angle] = head_angles[has_angle]
+            self.head_angle[absent] = np.nan
+            if perclos is not None:
+                self.perclos[processed] = np.asarray(perclos, dtype=float)[processed]
+            self.perclos[absent] = np.nan
+            self.present[processed] = present[processed]
+            self.last_seen[present] = now
+            self.state[processed] = classify_states(
+                present, self.head_down_duration, self.perclos, self.warning_time, self.drowsy_time
+            )[processed]
+            self.time = now
+            self.version += 1
+
+    def reset(self, rois=None):
+        """ROI 상태 초기화 (None이면 전체)"""
+        index = slice(None) if rois is None else rois
+        with self.lock:
+            for name, dtype, initial in FIELDS:
+                self.arrays[name][index] = initial
+
+    def snapshot(self):
+        """현재 상태의 복사본 (다른 스레드에서 읽어도 값이 섞이지 않음)"""
+        with self.lock:
+            return RoiStateSnapshot(
+                {name: array.copy() for name, array in self.arrays.items()}, self.time, self.version
+            )
@@ -0,0 +1,111 @@
+"""
+상태 기반 ROI 추론 주기 조절
+- ROI의 현재 상태(부재/정상/머리 숙임/주의/졸음)에 따라 추론 주기 결정
+- 정상 자세나 빈 자리는 낮은 주기로, 머리를 숙인 자리는 매 프레임 추론
+- 건너뛴 프레임은 마지막 감지 결과를 재사용하므로 머리 숙임 타이머는 계속 현재 시각 기준으로 갱신됨
+"""
+
+import numpy as np
+
+from detection import EMPTY_DETECTION
+from roi_state import CODE_WARNING, CODE_DROWSY
+
+# 스케줄러 상태
+SCHED_ABSENT = "absent"        # 사람 없음
+SCHED_NORMAL = "normal"        # 정상 자세
+SCHED_HEAD_DOWN = "head_down"  # 머리 숙임 (주의 시간 전)
+SCHED_WARNING = "warning"      # 주의
+SCHED_DROWSY = "drowsy"        # 졸음
+
+# 상태별 추론 주기 (Hz, None이면 매 프레임)
+DEFAULT_RATE_POLICY = {
+    SCHED_ABSENT: 1.0,
+    SCHED_NORMAL: 2.0,
+    SCHED_HEAD_DOWN: None,
+    SCHED_WARNING: None,
+    SCHED_DROWSY: None,
+}
+
+
+def schedule_state(result, states, roi_idx):
+    """ROI 결과와 상태 저장소(roi_state.RoiStateStore)의 값으로 스케줄러 상태 결정"""
+    if not result['person_present']:
+        return SCHED_ABSENT
+    roi_state = states.state[roi_idx]
+    if roi_state == CODE_DROWSY:
+        return SCHED_DROWSY
+    if roi_state == CODE_WARNING:
+        return SCHED_WARNING
+    if not np.isnan(states.head_down_start[roi_idx]):
+        return SCHED_HEAD_DOWN
+    return SCHED_NORMAL
+
+
+class AdaptiveScheduler:
+    """ROI별 추론 여부를 상태에 따라 결정하는 스케줄러
+
+    사용 순서:
+        active = scheduler.select(now)
+        detections = scheduler.merge(detector.detect(frame, active))
+        results = analyze_detections(detections, states, now)
+        scheduler.update(results, states)
+
+    Args:
+        num_rois: ROI 개수
+        rate_policy: 상태별 추론 주기 딕셔너리 (Hz, None이면 매 프레임). 지정하지 않은 상태는 기본값 사용
+    """
+    def __init__(self, num_rois, rate_policy=None):
+        self.rate_policy = dict(DEFAULT_RATE_POLICY)
+        if rate_policy:
+            self.rate_policy.update(rate_policy)
+
+        self.states = [SCHED_ABSENT] * num_rois
+        self.last_run = [None] * num_rois
+        self.cached = [None] * num_rois
+
+        # 통계
+        self.run_counts = [0] * num_rois
+        self.skip_counts = [0] * num_rois
+
+    def select(self, now):
+        """이번 프레임에 추론할 ROI 목록 반환"""
+        active = []
+        for roi_idx, state in enumerate(self.states):
+            rate = self.rate_policy.get(state)
+            last_run = self.last_run[roi_idx]
+            run = (
+                rate is None or last_run is None or self.cached[roi_idx] is None or
+                now - last_run >= 1.0 / rate
+            )
+            if run:
+                self.last_run[roi_idx] = now
+                self.run_counts[roi_idx] += 1
+            else:
+                self.skip_counts[roi_idx] += 1
+            active.append(run)
+        return active
+
+    def merge(self, detections):
+        """건너뛴 ROI(None)를 마지막 감지 결과로 채우고(reused=True), 새 감지 결과는 저장"""
+        merged = []
+        for roi_idx, detection in enumerate(detections):
+            if detection is None:
+                cached = self.cached[roi_idx]
+                detection = dict(cached, reused=True) if cached is not None else EMPTY_DETECTION
+            else:
+                self.cached[roi_idx] = detection
+            merged.append(detection)
+        return merged
+
+    def update(self, results, states):
+        """분석 결과와 ROI 상태 저장소로 ROI별 스케줄러 상태 갱신"""
+        for roi_idx, result in enumerate(results):
+            if result['processed']:
+                self.states[roi_idx] = schedule_state(result, states, roi_idx)
+
+    def skip_ratios(self):
+        """ROI별 추론 생략 비율"""
+        return [
+            skips / (runs + skips) if runs + skips else 0.0
+            for runs, skips in zip(self.run_counts, self.skip_counts)
+        ]
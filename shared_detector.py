@@ -0,0 +1,206 @@
+"""
+전체 프레임 공용 감지기
+- ROI마다 Face Mesh를 두는 대신 전체 프레임에 다중 얼굴 Face Mesh 한 번 실행
+- 감지된 얼굴을 포함하는 ROI에 배정
+- Pose는 얼굴이 있거나 직전에 사람이 있던 ROI에서만 실행
+- 빈 자리는 공용 정지 영상 모드 Pose 하나로 주기적으로만 확인하여 ROI별 모델을 만들지 않음
+- 얼굴 랜드마크는 프레임마다 한 번 배열로 변환하고, ROI 좌표 변환은 배열 연산으로 처리
+"""
+
+import time
+
+import cv2 as cv
+import mediapipe as mp
+import numpy as np
+
+from detection import (
+    MIN_DETECTION_CONFIDENCE, MIN_TRACKING_CONFIDENCE, NOSE_TIP_INDEX, EMPTY_DETECTION,
+    DEFAULT_POSE_CONFIG, LANDMARK_X, LANDMARK_Y, LANDMARK_Z, create_pose, landmarks_to_array
+)
+from profiler import PROFILER
+
+EMPTY_SEAT_POSE_INTERVAL = 15  # 얼굴도 사람도 없는 ROI에서 Pose를 다시 확인하는 간격 (프레임)
+
+
+def roi_area(roi):
+    x1, y1, x2, y2 = roi
+    return max(0, x2 - x1) * max(0, y2 - y1)
+
+def assign_faces_to_rois(face_centers, rois):
+    """얼굴 중심 좌표를 포함하는 ROI에 얼굴 배정
+
+    여러 ROI가 겹치면 가장 작은 ROI에, 한 ROI에 얼굴이 여러 개면 ROI 중심에 가장 가까운 얼굴을 배정합니다.
+
+    Args:
+        face_centers: [(x, y), ...] 픽셀 좌표
+        rois: [((x1, y1, x2, y2), name), ...] 형태의 ROI 목록
+
+    Returns:
+        list: ROI별 배정된 얼굴 번호 (없으면 None)
+    """
+    assigned = [None] * len(rois)
+    best_dist = [None] * len(rois)
+    for face_idx, (fx, fy) in enumerate(face_centers):
+        candidates = [
+            roi_idx for roi_idx, ((x1, y1, x2, y2), _) in enumerate(rois)
+            if x1 <= fx < x2 and y1 <= fy < y2
+        ]
+        if not candidates:
+            continue
+        roi_idx = min(candidates, key=lambda i: roi_area(rois[i][0]))
+        x1, y1, x2, y2 = rois[roi_idx][0]
+        dist = (fx - (x1 + x2) / 2) ** 2 + (fy - (y1 + y2) / 2) ** 2
+        if best_dist[roi_idx] is None or dist < best_dist[roi_idx]:
+            assigned[roi_idx] = face_idx
+            best_dist[roi_idx] = dist
+    return assigned
+
+def to_roi_landmarks(face_array, roi, frame_w, frame_h):
+    """전체 프레임 기준 정규화 좌표를 ROI 기준 정규화 좌표로 변환
+
+    Args:
+        face_array: (랜드마크 수, 4) 배열 [x, y, z, visibility] (landmarks_to_array 형식)
+
+    Returns:
+        np.ndarray: ROI 기준 좌표의 새 배열 (visibility는 그대로)
+    """
+    x1, y1, x2, y2 = roi
+    roi_w, roi_h = x2 - x1, y2 - y1
+    converted = face_array.copy()
+    converted[:, LANDMARK_X] = (face_array[:, LANDMARK_X] * frame_w - x1) / roi_w
+    converted[:, LANDMARK_Y] = (face_array[:, LANDMARK_Y] * frame_h - y1) / roi_h
+    converted[:, LANDMARK_Z] = face_array[:, LANDMARK_Z] * frame_w / roi_w
+    return converted
+
+
+class SharedFrameDetector:
+    """전체 프레임 다중 얼굴 Face Mesh + 필요한 ROI에만 Pose 실행
+
+    detect(frame)은 detection.detect_rois()와 같은 형태의 결과를 반환합니다.
+
+    Args:
+        rois: [((x1, y1, x2, y2), name), ...] 형태의 ROI 목록
+        max_num_faces: 감지할 최대 얼굴 수 (None이면 ROI 수)
+        pose_config: Pose 모델 설정 (None이면 DEFAULT_POSE_CONFIG)
+    """
+    def __init__(self, rois, max_num_faces=None, pose_config=None):
+        self.rois = rois
+        self.face_mesh = mp.solutions.face_mesh.FaceMesh(
+            max_num_faces=max_num_faces or len(rois),
+            refine_landmarks=True,
+            min_detection_confidence=MIN_DETECTION_CONFIDENCE,
+            min_tracking_confidence=MIN_TRACKING_CONFIDENCE,
+            static_image_mode=False
+        )
+        # ROI별 (추적) Pose는 사람이 확인된 ROI에서 처음 필요할 때 생성
+        self.poses = [None] * len(rois)
+        self.pose_configs = [dict(DEFAULT_POSE_CONFIG, **(pose_config or {})) for _ in rois]
+        # 빈 자리 확인용 공용 Pose (추적 상태가 필요 없으므로 정지 영상 모드)
+        self.probe_pose = create_pose(pose_config, static_image_mode=True)
+        self.was_present = [False] * len(rois)
+        self.frame_index = 0
+
+        # 통계
+        self.pose_calls = 0
+        self.pose_skips = 0
+
+    def _pose(self, roi_idx):
+        if self.poses[roi_idx] is None:
+            self.poses[roi_idx] = create_pose(self.pose_configs[roi_idx])
+        return self.poses[roi_idx]
+
+    def set_pose_config(self, roi_idx, pose_config):
+        """ROI의 Pose 모델 설정 변경 (이미 생성된 모델은 새 모델을 만든 뒤 교체, 실패하면 기존 모델 유지)"""
+        config = dict(self.pose_configs[roi_idx], **pose_config)
+        if config == self.pose_configs[roi_idx]:
+            return
+        if self.poses[roi_idx] is not None:
+            pose = create_pose(config)
+            self.poses[roi_idx].close()
+            self.poses[roi_idx] = pose
+        self.pose_configs[roi_idx] = config
+
+    def detect(self, frame, active=None):
+        """프레임의 모든 ROI 감지 (ROI 순서대로 결과 반환, active에서 제외된 ROI는 None)"""
+        frame_h, frame_w = frame.shape[:2]
+        start = time.perf_counter()
+        rgb_frame = cv.cvtColor(frame, cv.COLOR_BGR2RGB)
+        rgb_frame.flags.writeable = False
+        face_start = time.perf_counter()
+        face_results = self.face_mesh.process(rgb_frame)
+        # 전체 프레임 단계는 ROI에 속하지 않으므로 바로 기록
+        PROFILER.record('cvtColor', face_start - start)
+        PROFILER.record('face_mesh.process', time.perf_counter() - face_start)
+
+        # 모든 얼굴의 랜드마크를 한 번에 배열로 변환 (ROI별 protobuf를 새로 만들지 않음)
+        faces = face_results.multi_face_landmarks or []
+        face_arrays = landmarks_to_array(faces)
+        face_centers = [
+            (face[NOSE_TIP_INDEX, LANDMARK_X] * frame_w, face[NOSE_TIP_INDEX, LANDMARK_Y] * frame_h)
+            for face in face_arrays
+        ]
+        assigned = assign_faces_to_rois(face_centers, self.rois)
+        probe_empty = self.frame_index % EMPTY_SEAT_POSE_INTERVAL == 0
+        self.frame_index += 1
+
+        detections = []
+        for roi_idx, (roi, _) in enumerate(self.rois):
+            if active is not None and not active[roi_idx]:
+                detections.append(None)
+                continue
+            x1, y1, x2, y2 = roi
+            if roi_area(roi) == 0:
+                detections.append(EMPTY_DETECTION)
+                continue
+            # 얼굴 모델은 전체 프레임에서 이미 실행됨
+            detection = dict(EMPTY_DETECTION, processed=True, face_ran=True)
+            detections.append(detection)
+
+            face_idx = assigned[roi_idx]
+            if face_idx is not None:
+                detection['face_landmarks'] = to_roi_landmarks(face_arrays[face_idx], roi, frame_w, frame_h)
+                detection['face_detected'] = True
+
+            # 얼굴이 있거나 직전에 사람이 있었으면(엎드림 가능) ROI 전용 Pose,
+            # 빈 자리는 확인 주기에만 공용 Pose 실행
+            if face_idx is not None or self.was_present[roi_idx]:
+                pose = self._pose(roi_idx)
+            elif probe_empty:
+                pose = self.probe_pose
+            else:
+                pose = None
+
+            if pose is not None:
+                start = time.perf_counter()
+                rgb_roi = np.ascontiguousarray(rgb_frame[y1:y2, x1:x2])
+                pose_results = pose.process(rgb_roi)
+                detection['latency'] = time.perf_counter() - start
+                detection['stage_times'] = {'pose.process': detection['latency']}
+                detection['pose_ran'] = True
+                self.pose_calls += 1
+                if pose_results.pose_landmarks:
+                    detection['pose_landmarks'] = pose_results.pose_landmarks
+            else:
+                self.pose_skips += 1
+
+            self.was_present[roi_idx] = (
+                detection['face_detected'] or detection['pose_landmarks'] is not None
+            )
+        return detections
+
+    def stats(self):
+        """Pose 실행/생략 횟수와 생성된 Pose 모델 수"""
+        return {
+            "pose_calls": self.pose_calls,
+            "pose_skips": self.pose_skips,
+            "pose_models": sum(pose is not None for pose in self.poses),
+        }
+
+    def close(self):
+        """MediaPipe 리소스 해제"""
+        self.face_mesh.close()
+        self.probe_pose.close()
+        for pose in self.poses:
+            if pose is not None:
+                pose.close()
+        self.poses = [None] * len(self.rois)
@@ -0,0 +1,169 @@
+"""
+구조화 로그
+- 처리 루프에서 stdout에 직접 쓰지 않도록 로그 레코드를 메모리 링 버퍼에 저장
+- 별도 스레드가 주기적으로 버퍼를 비워 JSON Lines 형식으로 기록
+- 수치 값은 문자열로 만들지 않고 필드로 보관하여 나중에 분석 가능
+- 수준(level) 이하 로그는 즉시 버리고, 디버그 로그는 이벤트별 표본 추출 가능
+
+사용 예:
+    from structured_log import LOG
+    if LOG.debug_enabled:   # 비활성화 시 필드 계산 자체를 건너뜀
+        LOG.debug("head_angle", roi=0, head_angle=angle)
+"""
+
+import atexit
+import collections
+import json
+import sys
+import threading
+import time
+
+# 로그 수준
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR}
+LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+
+RING_SIZE = 10000        # 기록 대기 중인 최대 레코드 수 (넘치면 오래된 레코드부터 버림)
+FLUSH_INTERVAL = 0.5     # 기록 스레드가 버퍼를 비우는 간격 (초)
+
+
+def parse_level(level):
+    """"debug"/"info"/... 문자열 또는 수준 숫자를 수준 숫자로 변환"""
+    if isinstance(level, str):
+        if level.lower() not in LEVELS:
+            raise ValueError(f"Unknown log level: {level}")
+        return LEVELS[level.lower()]
+    return level
+
+
+class StructuredLogger:
+    """링 버퍼와 기록 스레드를 사용하는 구조화 로거
+
+    Args:
+        level: 기록할 최소 수준
+        sample_every: 디버그 레코드를 이벤트별로 N개 중 1개만 기록 (1이면 모두 기록)
+        path: JSON Lines 파일 경로 (None이면 stderr)
+        ring_size: 링 버퍼 크기
+        flush_interval: 기록 스레드가 버퍼를 비우는 간격 (초)
+    """
+    def __init__(self, level=INFO, sample_every=1, path=None, ring_size=RING_SIZE,
+                 flush_interval=FLUSH_INTERVAL):
+        self.ring_size = ring_size
+        self.flush_interval = flush_interval
+        self.buffer = collections.deque(maxlen=ring_size)
+        self.sample_counts = collections.Counter()
+        self.write_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.file = None
+
+        # 통계
+        self.records_logged = 0
+        self.records_dropped = 0
+
+        self.configure(level, sample_every, path)
+
+    def configure(self, level=None, sample_every=None, path=None):
+        """수준, 표본 추출 간격, 기록 위치 변경"""
+        if level is not None:
+            self.level = parse_level(level)
+            # 처리 루프에서 필드 계산 전에 확인하는 값
+            self.debug_enabled = self.level <= DEBUG
+        if sample_every is not None:
+            self.sample_every = max(1, int(sample_every))
+        if path is not None:
+            with self.write_lock:
+                if self.file is not None:
+                    self.file.close()
+                self.file = open(path, "a", encoding="utf-8")
+
+    def log(self, level, event, **fields):
+        """레코드를 링 버퍼에 추가 (기록은 별도 스레드에서 진행)"""
+        if level < self.level:
+            return
+        if level == DEBUG and self.sample_every > 1:
+            count = self.sample_counts[event]
+            self.sample_counts[event] = count + 1
+            if count % self.sample_every:
+                return
+        if len(self.buffer) == self.ring_size:
+            self.records_dropped += 1
+        self.buffer.append((time.time(), level, event, fields))
+        self.records_logged += 1
+        if self.thread is None:
+            self._start()
+
+    def debug(self, event, **fields):
+        self.log(DEBUG, event, **fields)
+
+    def info(self, event, **fields):
+        self.log(INFO, event, **fields)
+
+    def warning(self, event, **fields):
+        self.log(WARNING, event, **fields)
+
+    def error(self, event, **fields):
+        self.log(ERROR, event, **fields)
+
+    def _start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._writer, name="StructuredLogWriter", daemon=True)
+        self.thread.start()
+
+    def _writer(self):
+        while not self.stop_event.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        """버퍼의 레코드를 모두 기록"""
+        lines = []
+        while self.buffer:
+            try:
+                timestamp, level, event, fields = self.buffer.popleft()
+            except IndexError:
+                break
+            record = {"time": round(timestamp, 6), "level": LEVEL_NAMES.get(level, level), "event": event}
+            record.update(fields)
+            # NumPy 수치 등은 float로 변환
+            lines.append(json.dumps(record, ensure_ascii=False, default=float))
+        if not lines:
+            return
+        with self.write_lock:
+            stream = self.file or sys.stderr
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+
+    def recent(self):
+        """아직 기록되지 않은 레코드 목록 (시각, 수준, 이벤트, 필드)"""
+        return list(self.buffer)
+
+    def stats(self):
+        return {"records_logged": self.records_logged, "records_dropped": self.records_dropped}
+
+    def close(self):
+        """기록 스레드 종료 및 남은 레코드 기록"""
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join(timeout=2.0)
+            self.thread = None
+        self.flush()
+        with self.write_lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+# 프로그램 전체에서 공유하는 로거
+LOG = StructuredLogger()
+atexit.register(LOG.close)
+
+
+def configure(level=None, sample_every=None, path=None):
+    """공유 로거 설정 변경"""
+    LOG.configure(level, sample_every, path)
+    return LOG
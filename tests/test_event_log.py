@@ -0,0 +1,64 @@
+"""
+이벤트 기록의 상태 구간 조회(intervals) 테스트
+"""
+
+import pytest
+
+from detection import STATE_ABSENT, STATE_NORMAL, STATE_WARNING, STATE_DROWSY
+from event_log import ABSENT_NAME, EventLog, EventStore
+
+
+def write_session(directory, states_by_time, end):
+    """ROI 1개의 (시각, 상태) 목록을 기록하고 end 시각에 종료 레코드 추가 (time_offset 0 → 기록 시각 = now)"""
+    log = EventLog(directory, 1, sample_interval=None, time_offset=0)
+    for now, state in states_by_time:
+        log.update(now, [state], [None], [0.0], [None])
+    log.close(end)
+
+
+@pytest.fixture
+def store(tmp_path):
+    directory = str(tmp_path / "events")
+    write_session(directory, [(0, STATE_NORMAL), (10, STATE_WARNING), (20, STATE_NORMAL),
+                              (25, STATE_WARNING), (26, STATE_WARNING)], end=30)
+    return EventStore(directory)
+
+
+def test_transitions_open_and_close_intervals(store):
+    assert store.intervals(0, STATE_WARNING) == [(10.0, 20.0), (25.0, 30.0)]
+    assert store.intervals(0, STATE_NORMAL) == [(0.0, 10.0), (20.0, 25.0)]
+    assert store.intervals(0, STATE_DROWSY) == []
+
+
+def test_range_start_inside_interval(store):
+    # 범위 안 첫 레코드가 전환이면 직전 상태가 범위 시작부터 이어진 것으로 봄
+    assert store.intervals(0, STATE_WARNING, start=15) == [(15.0, 20.0), (25.0, 30.0)]
+    assert store.intervals(0, STATE_NORMAL, start=5, end=12) == [(5.0, 10.0)]
+
+
+def test_range_end_inside_interval(store):
+    # 범위 뒤에도 기록이 있으면 범위 끝에서 자름
+    assert store.intervals(0, STATE_WARNING, end=15) == [(10.0, 15.0)]
+    assert store.intervals(0, STATE_WARNING, start=12, end=18) == []
+    assert store.intervals(0, STATE_NORMAL, start=12, end=18) == []
+
+
+def test_end_record_closes_interval_across_sessions(tmp_path):
+    directory = str(tmp_path / "events")
+    write_session(directory, [(0, STATE_WARNING)], end=10)
+    write_session(directory, [(100, STATE_WARNING), (110, STATE_ABSENT)], end=120)
+    store = EventStore(directory)
+
+    # 기록이 없던 10~100초는 어느 상태로도 보지 않음
+    assert store.intervals(0, STATE_WARNING) == [(0.0, 10.0), (100.0, 110.0)]
+    assert store.intervals(0, ABSENT_NAME) == [(110.0, 120.0)]
+    assert store.intervals(0, STATE_WARNING, start=50) == [(100.0, 110.0)]
+
+
+def test_unclosed_log_ends_at_last_record(tmp_path):
+    directory = str(tmp_path / "events")
+    log = EventLog(directory, 1, sample_interval=None, time_offset=0)
+    log.update(0, [STATE_NORMAL], [None], [0.0], [None])
+    log.update(5, [STATE_DROWSY], [None], [0.0], [None])
+    log.flush()   # 비정상 종료: 종료 레코드 없음
+    assert EventStore(directory).intervals(0, STATE_DROWSY) == [(5.0, 5.0)]
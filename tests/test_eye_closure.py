@@ -0,0 +1,85 @@
+"""
+눈 감김(PERCLOS) 관측 시간 기준 테스트
+"""
+
+import numpy as np
+
+from detection import LANDMARK_X, LANDMARK_Y, LANDMARK_VISIBILITY, LEFT_EYE_POINTS, RIGHT_EYE_POINTS
+from eye_closure import PERCLOS_MIN_COVERAGE, PERCLOS_WINDOW, PERCLOS_BINS, EyeClosureEngine
+
+ROIS = [((0, 0, 100, 100), "A")]
+BIN_WIDTH = PERCLOS_WINDOW / PERCLOS_BINS
+OPEN = 0.02     # 눈 윤곽 위/아래 점의 중심선과의 거리
+CLOSED = 0.002
+
+
+def make_face(opening):
+    """눈 윤곽점만 채운 (478, 4) Face Mesh 배열 (나머지는 NaN)"""
+    face = np.full((478, 4), np.nan)
+    for points, left in ((LEFT_EYE_POINTS, 0.55), (RIGHT_EYE_POINTS, 0.35)):
+        # 순서: 끝점, 위 3개, 반대쪽 끝점, 아래 3개 (역순)
+        xs = [left + k * 0.025 for k in (0, 1, 2, 3, 4, 3, 2, 1)]
+        ys = [0.5, 0.5 - opening, 0.5 - opening, 0.5 - opening, 0.5, 0.5 + opening, 0.5 + opening, 0.5 + opening]
+        face[points, LANDMARK_X] = xs
+        face[points, LANDMARK_Y] = ys
+        face[points, LANDMARK_VISIBILITY] = 1.0
+    return face
+
+
+def test_perclos_waits_for_coverage_time():
+    eyes = EyeClosureEngine(ROIS)
+    open_face, closed_face = make_face(OPEN), make_face(CLOSED)
+    closed_frames = 0
+    for frame_idx in range(300):
+        now = frame_idx / 10
+        closed = frame_idx % 2 == 1
+        closed_frames += closed
+        _, perclos = eyes.update([closed_face if closed else open_face], now)
+        covered_bins = int(now // BIN_WIDTH) + 1
+        if covered_bins * BIN_WIDTH < PERCLOS_MIN_COVERAGE:
+            assert np.isnan(perclos[0]), now
+        else:
+            assert perclos[0] == closed_frames / (frame_idx + 1), now
+
+
+def test_many_frames_in_short_time_are_not_enough():
+    eyes = EyeClosureEngine(ROIS)
+    closed_face = make_face(CLOSED)
+    eyes.update([make_face(OPEN)], 0.0)
+    for frame_idx in range(1, 2000):
+        _, perclos = eyes.update([closed_face], frame_idx / 200)   # 10초 동안 2000프레임
+    assert np.isnan(perclos[0])
+
+
+def test_coverage_expires_with_window():
+    eyes = EyeClosureEngine(ROIS)
+    face = make_face(OPEN)
+    for frame_idx in range(250):
+        _, perclos = eyes.update([face], frame_idx / 10)
+    assert perclos[0] == 0.0
+
+    # 오래된 칸이 계산 구간을 벗어나면 관측 시간이 다시 부족해짐
+    _, perclos = eyes.update([face], 25.0 + PERCLOS_WINDOW - 10)
+    assert np.isnan(perclos[0])
+
+
+def test_reused_detections_are_not_sampled():
+    eyes = EyeClosureEngine(ROIS)
+    open_face, closed_face = make_face(OPEN), make_face(CLOSED)
+    for frame_idx in range(300):
+        closed = frame_idx % 2 == 1
+        ear, perclos = eyes.update([closed_face if closed else open_face], frame_idx / 10,
+                                   fresh=np.array([not closed]))
+        assert not np.isnan(ear[0])
+    assert perclos[0] == 0.0
+    assert eyes.total_counts.sum() == 150
+
+
+def test_reset_clears_coverage():
+    eyes = EyeClosureEngine(ROIS)
+    face = make_face(OPEN)
+    for frame_idx in range(250):
+        eyes.update([face], frame_idx / 10)
+    eyes.reset([0])
+    _, perclos = eyes.update([face], 25.0)
+    assert np.isnan(perclos[0])
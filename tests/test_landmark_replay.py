@@ -0,0 +1,108 @@
+"""
+임계값 비교(ThresholdSweep)와 기록 재생(RoiInference + ReplayDetector) 결과 일치 테스트
+"""
+
+import numpy as np
+import pytest
+
+from AngleBuffer import SMOOTH_MEAN, SMOOTH_MEDIAN, SMOOTH_ONE_EURO
+from detection import EMPTY_DETECTION, HEAD_POSE_INDICES, LANDMARK_Y, LANDMARK_VISIBILITY
+from inference import RoiInference
+from landmark_replay import LandmarkRecorder, LandmarkRecording, ReplayDetector, ThresholdSweep
+from roi_state import RoiStateStore
+from test_eye_closure import CLOSED, OPEN, make_face
+
+FPS = 30.0
+NUM_FRAMES = 3000
+ROIS = [((0, 0, 100, 100), "A"), ((100, 0, 200, 100), "B"), ((200, 0, 300, 100), "C")]
+SHOULDER_Y = 0.7
+
+
+def make_pose(nose_y, visibility=0.9):
+    """머리/어깨 5개 점만 채운 (33, 4) Pose 배열"""
+    pose = np.full((33, 4), np.nan)
+    nose, left_shoulder, right_shoulder, left_ear, right_ear = HEAD_POSE_INDICES
+    pose[HEAD_POSE_INDICES, 0] = 0.5
+    pose[HEAD_POSE_INDICES, 2] = 0.0
+    pose[[nose, left_ear, right_ear], LANDMARK_Y] = [nose_y, nose_y - 0.02, nose_y - 0.02]
+    pose[[left_shoulder, right_shoulder], LANDMARK_Y] = SHOULDER_Y
+    pose[HEAD_POSE_INDICES, LANDMARK_VISIBILITY] = visibility
+    return pose
+
+
+def synthetic_detections(rng, frame_idx):
+    """ROI별 감지 결과 (A: 머리 숙임 구간, B: 눈 감김/재사용/부재, C: 처리 생략/낮은 가시성)"""
+    now = frame_idx / FPS
+    detections = []
+
+    down = 10 <= now < 85
+    nose_y = (0.74 if down else 0.5) + rng.normal(0, 0.015)
+    if rng.random() < 0.1:
+        detections.append(dict(EMPTY_DETECTION, processed=True, face_detected=True))   # Pose 놓침
+    else:
+        detections.append(dict(EMPTY_DETECTION, processed=True, face_detected=True, pose_landmarks=make_pose(nose_y)))
+
+    if 60 <= now < 64:
+        detections.append(dict(EMPTY_DETECTION, processed=True))   # 자리 비움
+    else:
+        closed = rng.random() < (0.5 if now > 30 else 0.1)
+        detections.append(dict(
+            EMPTY_DETECTION, processed=True, face_detected=True,
+            pose_landmarks=make_pose(0.55 + rng.normal(0, 0.05)),
+            face_landmarks=make_face(CLOSED if closed else OPEN),
+            reused=bool(rng.random() < 0.3),
+        ))
+
+    if rng.random() < 0.4:
+        detections.append(EMPTY_DETECTION)   # 추론 주기 조절로 생략
+    else:
+        visibility = 0.1 if rng.random() < 0.05 else 0.9
+        detections.append(dict(
+            EMPTY_DETECTION, processed=True, face_detected=True,
+            pose_landmarks=make_pose(0.6 + rng.normal(0, 0.08), visibility),
+        ))
+    return detections
+
+
+@pytest.fixture(scope="module")
+def recording(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp("landmarks"))
+    rng = np.random.default_rng(0)
+    recorder = LandmarkRecorder(directory, ROIS, FPS, frame_size=(300, 100))
+    for frame_idx in range(NUM_FRAMES):
+        recorder.write(frame_idx / FPS, synthetic_detections(rng, frame_idx))
+    recorder.close()
+    return LandmarkRecording(directory)
+
+
+def replay_states(recording, smoothing, eye_closure):
+    """헤드리스 재생과 같은 방식으로 프레임별 ROI 상태 코드 계산"""
+    states = RoiStateStore(len(recording.rois))
+    roi_inference = RoiInference(ReplayDetector(recording), states, smoothing=smoothing, eye_closure=eye_closure)
+    codes = np.empty((len(recording), len(recording.rois)), dtype=np.uint8)
+    for frame_idx in range(len(recording)):
+        roi_inference.process(None, float(recording.times[frame_idx]))
+        codes[frame_idx] = states.state
+    roi_inference.close()
+    return codes
+
+
+@pytest.mark.parametrize("smoothing", [SMOOTH_MEAN, SMOOTH_MEDIAN, SMOOTH_ONE_EURO, None])
+@pytest.mark.parametrize("eye_closure", [True, False])
+def test_sweep_matches_replay(recording, smoothing, eye_closure):
+    expected = replay_states(recording, smoothing, eye_closure)
+    codes = ThresholdSweep(recording, smoothing, eye_closure).evaluate()
+
+    # 처리하지 않은 프레임은 재생에서는 이전 상태를 유지하고 비교에서는 부재로 보므로 제외
+    processed = ThresholdSweep(recording, smoothing, eye_closure=False).processed
+    assert processed.sum() < processed.size
+    np.testing.assert_array_equal(codes[processed], expected[processed])
+    assert len(np.unique(expected[processed])) == 4   # 부재/정상/주의/졸음이 모두 나타나는 기록
+
+
+def test_sweep_thresholds_change_states(recording):
+    sweep = ThresholdSweep(recording)
+    strict = sweep.evaluate(angle_threshold=5, warning_time=5)
+    loose = sweep.evaluate(angle_threshold=30, warning_time=30)
+    assert (strict >= loose).all()
+    assert (strict > loose).any()
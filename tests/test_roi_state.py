@@ -0,0 +1,97 @@
+"""
+ROI 상태 분류와 머리 숙임 타이머 테스트
+"""
+
+import numpy as np
+
+from detection import (
+    HEAD_DOWN_ANGLE_THRESHOLD, HEAD_DOWN_WARNING_TIME, HEAD_DOWN_DROWSY_TIME,
+    PERCLOS_WARNING_THRESHOLD, PERCLOS_DROWSY_THRESHOLD
+)
+from roi_state import CODE_ABSENT, CODE_NORMAL, CODE_WARNING, CODE_DROWSY, RoiStateStore, classify_states
+
+DOWN = HEAD_DOWN_ANGLE_THRESHOLD + 5.0
+UP = HEAD_DOWN_ANGLE_THRESHOLD - 5.0
+
+
+def test_classify_states_duration_edges():
+    durations = np.array([
+        0.0, HEAD_DOWN_WARNING_TIME - 0.01, HEAD_DOWN_WARNING_TIME,
+        HEAD_DOWN_DROWSY_TIME - 0.01, HEAD_DOWN_DROWSY_TIME, HEAD_DOWN_DROWSY_TIME
+    ])
+    present = np.array([True, True, True, True, True, False])
+    perclos = np.full(len(durations), np.nan)
+    codes = classify_states(present, durations, perclos)
+    assert codes.tolist() == [
+        CODE_NORMAL, CODE_NORMAL, CODE_WARNING, CODE_WARNING, CODE_DROWSY, CODE_ABSENT
+    ]
+    assert codes.dtype == np.uint8
+
+
+def test_classify_states_perclos_edges():
+    perclos = np.array([
+        np.nan, PERCLOS_WARNING_THRESHOLD - 0.01, PERCLOS_WARNING_THRESHOLD,
+        PERCLOS_DROWSY_THRESHOLD - 0.01, PERCLOS_DROWSY_THRESHOLD
+    ])
+    present = np.ones(len(perclos), dtype=bool)
+    codes = classify_states(present, np.zeros(len(perclos)), perclos)
+    assert codes.tolist() == [CODE_NORMAL, CODE_NORMAL, CODE_WARNING, CODE_WARNING, CODE_DROWSY]
+
+
+def test_store_head_down_timer_transitions():
+    store = RoiStateStore(1)
+    for now, expected in [
+        (0.0, CODE_NORMAL),
+        (HEAD_DOWN_WARNING_TIME - 0.5, CODE_NORMAL),
+        (HEAD_DOWN_WARNING_TIME, CODE_WARNING),
+        (HEAD_DOWN_DROWSY_TIME, CODE_DROWSY),
+    ]:
+        store.update(now, [True], [True], [DOWN])
+        assert store.state[0] == expected, now
+    assert store.head_down_duration[0] == HEAD_DOWN_DROWSY_TIME
+
+    # 정상 자세가 되면 타이머 초기화
+    store.update(HEAD_DOWN_DROWSY_TIME + 1, [True], [True], [UP])
+    assert store.state[0] == CODE_NORMAL
+    assert store.head_down_duration[0] == 0.0
+    assert np.isnan(store.head_down_start[0])
+
+
+def test_store_keeps_timer_without_pose_or_processing():
+    store = RoiStateStore(2)
+    store.update(0.0, [True, True], [True, True], [DOWN, DOWN])
+
+    # Pose가 없으면(NaN) 타이머는 유지, 처리하지 않은 ROI는 이전 값 유지
+    store.update(HEAD_DOWN_WARNING_TIME, [True, False], [True, False], [np.nan, np.nan])
+    assert store.head_down_duration.tolist() == [0.0, 0.0]
+    assert store.state.tolist() == [CODE_NORMAL, CODE_NORMAL]
+    assert store.present.tolist() == [True, True]
+
+    store.update(HEAD_DOWN_WARNING_TIME + 1, [True, True], [True, True], [DOWN, DOWN])
+    assert store.head_down_duration.tolist() == [HEAD_DOWN_WARNING_TIME + 1] * 2
+    assert store.state.tolist() == [CODE_WARNING, CODE_WARNING]
+
+
+def test_store_absent_resets_timer():
+    store = RoiStateStore(1)
+    store.update(0.0, [True], [True], [DOWN])
+    store.update(HEAD_DOWN_WARNING_TIME, [True], [True], [DOWN])
+    assert store.state[0] == CODE_WARNING
+
+    store.update(HEAD_DOWN_WARNING_TIME + 1, [True], [False], [np.nan], perclos=[0.5])
+    assert store.state[0] == CODE_ABSENT
+    assert store.head_down_duration[0] == 0.0
+    assert np.isnan(store.perclos[0])
+
+    # 다시 나타나면 처음부터 시간을 잼
+    store.update(HEAD_DOWN_WARNING_TIME + 2, [True], [True], [DOWN])
+    assert store.head_down_duration[0] == 0.0
+    assert store.state[0] == CODE_NORMAL
+
+
+def test_store_perclos_drives_state():
+    store = RoiStateStore(1)
+    store.update(0.0, [True], [True], [UP], perclos=[PERCLOS_DROWSY_THRESHOLD])
+    assert store.state[0] == CODE_DROWSY
+    store.update(1.0, [True], [True], [UP], perclos=[np.nan])
+    assert store.state[0] == CODE_NORMAL
@@ -0,0 +1,59 @@
+"""
+AngleBuffer.SignalBuffer 평활화 테스트
+"""
+
+import numpy as np
+
+from AngleBuffer import SignalBuffer, SMOOTH_MEAN, SMOOTH_MEDIAN
+
+
+def _random_signals(rng, frames, num_rois, num_signals):
+    values = rng.uniform(-90, 90, size=(frames, num_rois, num_signals))
+    values[rng.random(values.shape) < 0.3] = np.nan   # 관측이 없는 값
+    return values
+
+
+def _window_reference(history, size, reducer):
+    """ROI/신호별로 관측된 최근 size개 값에 reducer를 적용한 기준값"""
+    expected = np.full(history[0].shape, np.nan)
+    stacked = np.array(history)
+    for roi, signal in np.ndindex(expected.shape):
+        observed = stacked[:, roi, signal]
+        observed = observed[~np.isnan(observed)]
+        if len(observed):
+            expected[roi, signal] = reducer(observed[-size:])
+    return expected
+
+
+def test_mean_matches_numpy_window():
+    rng = np.random.default_rng(0)
+    size = 5
+    buffer = SignalBuffer(4, num_signals=3, size=size, mode=SMOOTH_MEAN)
+    history = []
+    for values in _random_signals(rng, 500, 4, 3):
+        history.append(values)
+        smoothed = buffer.update(values)
+        np.testing.assert_allclose(smoothed, _window_reference(history, size, np.mean), rtol=1e-9, atol=1e-9)
+
+
+def test_median_matches_numpy_window():
+    rng = np.random.default_rng(1)
+    size = 4
+    buffer = SignalBuffer(3, num_signals=2, size=size, mode=SMOOTH_MEDIAN)
+    history = []
+    for values in _random_signals(rng, 200, 3, 2):
+        history.append(values)
+        smoothed = buffer.update(values)
+        np.testing.assert_allclose(smoothed, _window_reference(history, size, np.median))
+
+
+def test_reset_clears_only_selected_rois():
+    buffer = SignalBuffer(2, num_signals=1, size=3)
+    buffer.update([[10.0], [20.0]])
+    buffer.update([[30.0], [40.0]])
+    buffer.reset([0])
+    assert np.isnan(buffer.smoothed[0, 0])
+
+    smoothed = buffer.update([[50.0], [60.0]])
+    assert smoothed[0, 0] == 50.0
+    assert smoothed[1, 0] == 40.0
@@ -0,0 +1,119 @@
+"""
+상태 창 라벨 갱신 관리 (view-model)
+- 라벨별 마지막 스타일과 텍스트를 기억하여 바뀐 내용만 Qt 위젯에 전달
+- 스타일 시트는 상태가 바뀔 때만 적용 (setStyleSheet는 스타일 재해석/재적용 비용이 큼)
+- 텍스트는 상태가 그대로면 TEXT_REFRESH_RATE 주기로만 갱신하고, 미뤄진 텍스트는 flush()에서 적용
+- Qt에 의존하지 않으므로 setStyleSheet()/setText()를 제공하는 어떤 객체에도 사용 가능
+
+사용 예:
+    view = ViewModel()
+    view.bind(0, label, {"normal": NORMAL_STYLE, "drowsy": DROWSY_STYLE})
+    view.update(0, "normal", text)   # 프레임마다 호출해도 바뀐 내용만 반영
+    view.flush()                     # 메인 루프에서 주기적으로 호출
+"""
+
+import time
+
+TEXT_REFRESH_RATE = 5.0   # 상태가 그대로일 때 텍스트 갱신 주기 (Hz)
+
+
+class LabelBinding:
+    """라벨 하나의 마지막 표시 상태
+
+    Args:
+        label: setStyleSheet()/setText()를 제공하는 위젯
+        styles: 상태 이름 -> 스타일 시트 문자열
+        text_interval: 상태가 그대로일 때 텍스트 최소 갱신 간격 (초)
+    """
+    def __init__(self, label, styles, text_interval):
+        self.label = label
+        self.styles = styles
+        self.text_interval = text_interval
+        self.style = None        # 마지막으로 적용한 상태 이름
+        self.text = None         # 마지막으로 적용한 텍스트
+        self.text_time = None    # 마지막 텍스트 적용 시각
+        self.pending = None      # 간격 때문에 미뤄진 텍스트
+
+    def update(self, style, text, now):
+        """상태와 텍스트 갱신
+
+        Returns:
+            tuple: (스타일 적용 여부, 텍스트 적용 여부)
+        """
+        if style != self.style:
+            # 상태 전환은 텍스트와 함께 바로 반영
+            self.label.setStyleSheet(self.styles[style])
+            self.style = style
+            return True, self._set_text(text, now)
+        if text == self.text:
+            self.pending = None
+            return False, False
+        if self.text_time is not None and now - self.text_time < self.text_interval:
+            self.pending = text
+            return False, False
+        return False, self._set_text(text, now)
+
+    def flush(self, now):
+        """미뤄진 텍스트가 있고 간격이 지났으면 적용"""
+        if self.pending is not None and now - self.text_time >= self.text_interval:
+            return self._set_text(self.pending, now)
+        return False
+
+    def _set_text(self, text, now):
+        self.pending = None
+        if text == self.text:
+            return False
+        self.label.setText(text)
+        self.text = text
+        self.text_time = now
+        return True
+
+
+class ViewModel:
+    """여러 라벨의 바뀐 내용만 반영하는 갱신 관리자
+
+    Args:
+        text_rate: 상태가 그대로일 때 텍스트 갱신 주기 (Hz, None이면 제한 없음)
+    """
+    def __init__(self, text_rate=TEXT_REFRESH_RATE):
+        self.text_interval = 1.0 / text_rate if text_rate else 0.0
+        self.bindings = {}
+
+        # 통계
+        self.updates = 0
+        self.style_updates = 0
+        self.text_updates = 0
+
+    def bind(self, key, label, styles):
+        """라벨 등록 (같은 key의 이전 라벨은 대체)"""
+        self.bindings[key] = LabelBinding(label, styles, self.text_interval)
+
+    def unbind(self, key):
+        self.bindings.pop(key, None)
+
+    def clear(self):
+        self.bindings.clear()
+
+    def update(self, key, style, text, now=None):
+        """라벨의 상태와 텍스트 갱신 (바뀐 내용만 위젯에 전달)"""
+        binding = self.bindings.get(key)
+        if binding is None:
+            return
+        now = time.monotonic() if now is None else now
+        style_changed, text_changed = binding.update(style, text, now)
+        self.updates += 1
+        self.style_updates += style_changed
+        self.text_updates += text_changed
+
+    def flush(self, now=None):
+        """간격 때문에 미뤄진 텍스트 적용"""
+        now = time.monotonic() if now is None else now
+        for binding in self.bindings.values():
+            self.text_updates += binding.flush(now)
+
+    def stats(self):
+        return {
+            "updates": self.updates,
+            "style_updates": self.style_updates,
+            "text_updates": self.text_updates,
+        }